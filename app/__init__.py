@@ -3,6 +3,7 @@ from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
 from app.configs.config import configurations
+from app.common.shutdown import on_shutdown
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -35,15 +36,34 @@ def configure_user(app: Flask, db: SQLAlchemy):
     from app.services.user import UserService
     from app.controllers.user import UserController
     from app.handlers.user import UserHandler
+    from app.common.graph import FollowGraphStore
 
     # Configuring auth
     user_repository = UserRepository(db)
-    user_service = UserService(user_repository)
+    user_service = UserService(user_repository, FollowGraphStore(app))
     user_controller = UserController(user_service)
     user_handler = UserHandler(user_controller)
     app.register_blueprint(user_handler.blueprint, url_prefix="/user")
 
 
+def configure_jobs(app: Flask, db: SQLAlchemy):
+    from app.repositories.job import JobRepository
+    from app.services.job import JobService
+    from app.controllers.job import JobController
+    from app.handlers.job import JobHandler
+
+    # Configuring jobs, services register their job handlers on
+    # app.extensions["jobs"]
+    job_repository = JobRepository(db)
+    job_service = JobService(app, job_repository)
+    app.extensions["jobs"] = job_service
+    # WSGI servers recycle workers by exiting them, drain running jobs first
+    on_shutdown(app, job_service.shutdown)
+    job_controller = JobController(job_service)
+    job_handler = JobHandler(job_controller)
+    app.register_blueprint(job_handler.blueprint)
+
+
 def configure_song(app: Flask, db: SQLAlchemy):
     from app.models.song import Song
     from app.repositories.song import SongRepository
@@ -57,7 +77,9 @@ def configure_song(app: Flask, db: SQLAlchemy):
 
     # Configuring song
     song_repository = SongRepository(db)
-    song_service = SongService(app, song_repository, upload_file)
+    song_service = SongService(
+        app, song_repository, upload_file, app.extensions["jobs"]
+    )
     song_controller = SongController(song_service)
     song_handler = SongHandler(song_controller)
     app.register_blueprint(song_handler.blueprint, url_prefix="/song")
@@ -76,12 +98,91 @@ def configure_playlist(app: Flask, db: SQLAlchemy):
     # Configuring playlist
     playlist_repository = PlaylistRepository(db)
     song_repository = SongRepository(db)
-    playlist_service = PlaylistService(playlist_repository, song_repository)
+    playlist_service = PlaylistService(
+        playlist_repository, song_repository, app.extensions["jobs"]
+    )
     playlist_controller = PlaylistController(playlist_service)
     playlist_handler = PlaylistHandler(playlist_controller)
     app.register_blueprint(playlist_handler.blueprint, url_prefix="/playlist")
 
 
+def configure_batch(app: Flask, db: SQLAlchemy):
+    from app.repositories.user import UserRepository
+    from app.services.batch import BatchService
+    from app.controllers.batch import BatchController
+    from app.handlers.batch import BatchHandler
+
+    # Configuring batch
+    user_repository = UserRepository(db)
+    batch_service = BatchService(app, user_repository)
+    batch_controller = BatchController(batch_service)
+    batch_handler = BatchHandler(batch_controller)
+    app.register_blueprint(batch_handler.blueprint, url_prefix="/batch")
+
+
+def configure_analytics(app: Flask, db: SQLAlchemy):
+    from app.repositories.analytics import AnalyticsRepository
+    from app.repositories.play import PlayRepository
+    from app.services.analytics import AnalyticsService
+    from app.controllers.analytics import AnalyticsController
+    from app.handlers.analytics import AnalyticsHandler
+
+    # Configuring analytics
+    analytics_repository = AnalyticsRepository(db)
+    analytics_service = AnalyticsService(analytics_repository, PlayRepository(db))
+    analytics_controller = AnalyticsController(analytics_service)
+    analytics_handler = AnalyticsHandler(analytics_controller)
+    app.register_blueprint(analytics_handler.blueprint, url_prefix="/analytics")
+
+
+def configure_export(app: Flask, db: SQLAlchemy):
+    from app.repositories.export import ExportRepository
+    from app.services.export import ExportService
+    from app.controllers.export import ExportController
+    from app.handlers.export import ExportHandler
+
+    # Configuring export
+    export_repository = ExportRepository(db)
+    export_service = ExportService(app, export_repository)
+    export_controller = ExportController(export_service)
+    export_handler = ExportHandler(export_controller)
+    app.register_blueprint(export_handler.blueprint)
+
+
+def configure_play(app: Flask, db: SQLAlchemy):
+    from app.repositories.play import PlayRepository
+    from app.repositories.song import SongRepository
+    from app.services.play import PlayService
+    from app.controllers.play import PlayController
+    from app.handlers.play import PlayHandler
+
+    # Configuring play
+    play_repository = PlayRepository(db)
+    song_repository = SongRepository(db)
+    play_service = PlayService(app, play_repository, song_repository)
+    # Plays still buffered when the process exits are written out
+    on_shutdown(app, play_service.shutdown)
+    play_controller = PlayController(play_service)
+    play_handler = PlayHandler(play_controller)
+    app.register_blueprint(play_handler.blueprint, url_prefix="/play")
+
+
+def configure_outbox(app: Flask, db: SQLAlchemy):
+    from app.repositories.outbox import OutboxRepository
+    from app.services.outbox import OutboxService
+    from app.controllers.outbox import OutboxController
+    from app.handlers.outbox import OutboxHandler
+
+    # Configuring outbox, in-process consumers add sinks to
+    # app.extensions["outbox"]
+    outbox_repository = OutboxRepository(db)
+    outbox_service = OutboxService(app, outbox_repository)
+    app.extensions["outbox"] = outbox_service
+    outbox_controller = OutboxController(outbox_service)
+    outbox_handler = OutboxHandler(outbox_controller)
+    app.register_blueprint(outbox_handler.blueprint)
+
+
 def create_app(environment="development"):
     app = Flask(__name__)
     app.config.from_object(configurations[environment])
@@ -92,8 +193,14 @@ def create_app(environment="development"):
 
     configure_auth(app, db)
     configure_user(app, db)
+    configure_jobs(app, db)
     configure_song(app, db)
     configure_playlist(app, db)
+    configure_batch(app, db)
+    configure_analytics(app, db)
+    configure_export(app, db)
+    configure_play(app, db)
+    configure_outbox(app, db)
 
     @app.errorhandler(404)
     def resource_not_found():
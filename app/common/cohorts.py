@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+from typing import Sequence
+
+from app.common.graph import NUMPY_REQUIRED
+
+try:
+    import numpy as np
+except ImportError:  # only the cohort job needs numpy
+    np = None
+
+EPOCH = date(1970, 1, 1)
+
+
+def to_days(values: Sequence[date]):
+    """
+    Days since the epoch of dates or datetimes, NaT-free: None becomes -1
+    """
+    return np.fromiter(
+        (-1 if value is None else (_as_date(value) - EPOCH).days for value in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+
+
+def _as_date(value) -> date:
+    return value.date() if hasattr(value, "date") else value
+
+
+class CohortMatrix:
+    """
+    Weekly signup cohorts x weeks since signup, built up a chunk of users at
+    a time. Weeks start on the Monday of the week holding start; a user is
+    retained in week k of their cohort when any activity of theirs falls k
+    weeks after their signup week, signing up counting as week 0.
+    """
+
+    def __init__(self, start: date, end: date) -> None:
+        if np is None:
+            raise RuntimeError(NUMPY_REQUIRED)
+
+        self.start = start - timedelta(days=start.weekday())
+        self.weeks = (end - self.start).days // 7 + 1
+        self._first_day = (self.start - EPOCH).days
+        self.sizes = np.zeros(self.weeks, dtype=np.int64)
+        self.retained = np.zeros((self.weeks, self.weeks), dtype=np.int64)
+
+    def _week(self, days):
+        return np.floor_divide(days - self._first_day, 7)
+
+    def add(self, user_ids, signup_days, activity_user_ids, activity_days) -> None:
+        """
+        Fold in a chunk of users, given as sorted ids with their signup days,
+        together with every activity (user id, day) of those users
+        """
+        if len(user_ids) == 0:
+            return
+
+        cohorts = self._week(signup_days)
+        in_range = (cohorts >= 0) & (cohorts < self.weeks)
+        self.sizes += np.bincount(cohorts[in_range], minlength=self.weeks)
+
+        positions = np.searchsorted(user_ids, activity_user_ids)
+        positions = np.minimum(positions, len(user_ids) - 1)
+        known = (user_ids[positions] == activity_user_ids) & (activity_days >= 0)
+        positions = np.concatenate([np.arange(len(user_ids)), positions[known]])
+        weeks = np.concatenate([cohorts, self._week(activity_days[known])])
+
+        valid = (
+            in_range[positions] & (weeks >= cohorts[positions]) & (weeks < self.weeks)
+        )
+        # A user active several times in a week is retained once
+        keys = np.unique(positions[valid] * self.weeks + weeks[valid])
+        positions, weeks = keys // self.weeks, keys % self.weeks
+        cells = cohorts[positions] * self.weeks + (weeks - cohorts[positions])
+        self.retained += np.bincount(cells, minlength=self.weeks**2).reshape(
+            self.weeks, self.weeks
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "cohorts": [
+                {
+                    "week": (self.start + timedelta(weeks=week)).isoformat(),
+                    "size": int(self.sizes[week]),
+                    "retained": self.retained[week, : self.weeks - week].tolist(),
+                }
+                for week in range(self.weeks)
+            ]
+        }
+
+    def add_rows(self, users: Sequence[tuple], logins: Sequence[tuple]) -> None:
+        """
+        add() from (id, created_at, last_login) user rows sorted by id and
+        (user_id, day) login rows, last_login counting as activity too
+        """
+        user_ids = np.fromiter((user[0] for user in users), np.int64, len(users))
+        logged_in = [user for user in users if user[2] is not None]
+        self.add(
+            user_ids,
+            to_days([user[1] for user in users]),
+            np.fromiter(
+                (row[0] for rows in (logins, logged_in) for row in rows),
+                np.int64,
+                len(logins) + len(logged_in),
+            ),
+            np.concatenate(
+                [
+                    to_days([login[1] for login in logins]),
+                    to_days([user[2] for user in logged_in]),
+                ]
+            ),
+        )
@@ -0,0 +1,46 @@
+import hashlib
+from datetime import datetime
+from http import HTTPStatus
+from typing import Optional
+from flask import Request, Response
+
+from app.common.messages import INVALID_IF_MATCH
+from app.common.exceptions import BadRequestException
+
+
+def _to_etag_part(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong entity tag from the values that identify a representation
+    """
+    raw = "|".join(_to_etag_part(part) for part in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=HTTPStatus.NOT_MODIFIED)
+    response.set_etag(etag)
+    return response
+
+
+def get_if_match_version(request: Request) -> Optional[int]:
+    """
+    Version a conditional write expects, sent as If-Match: "<version>".
+    None when the header is absent or "*"
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+
+    for tag in if_match:
+        if tag.isdigit():
+            return int(tag)
+
+    raise BadRequestException(INVALID_IF_MATCH)
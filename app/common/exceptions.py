@@ -44,3 +44,13 @@ class FieldRequiredException(BaseAPIException):
 class UnauthorizedException(BaseAPIException):
     def __init__(self, message: str):
         super().__init__(message, HTTPStatus.UNAUTHORIZED)
+
+
+class ConflictException(BaseAPIException):
+    def __init__(self, message: str):
+        super().__init__(message, HTTPStatus.CONFLICT)
+
+
+class PreconditionFailedException(BaseAPIException):
+    def __init__(self, message: str):
+        super().__init__(message, HTTPStatus.PRECONDITION_FAILED)
@@ -0,0 +1,136 @@
+import os
+import json
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import types
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # only flask export needs pyarrow
+    pa = None
+
+PYARROW_REQUIRED = "pyarrow is required to export tables"
+MANIFEST_FILE = "manifest.json"
+EXPORT_FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+EXPORT_COMPRESSION = "zstd"
+UNDATED = "undated"
+
+
+def _arrow_type(column_type):
+    # BigInteger and SmallInteger are Integer subclasses, Text is a String
+    if isinstance(column_type, types.Integer):
+        return pa.int64()
+    if isinstance(column_type, types.Float):
+        return pa.float64()
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp("us")
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema(columns: Sequence[Tuple[str, object]]):
+    """
+    Arrow schema of (name, SQLAlchemy type) columns, so every batch of a
+    table is written with the same types even when a batch is all NULL
+    """
+    if pa is None:
+        raise RuntimeError(PYARROW_REQUIRED)
+
+    return pa.schema([(name, _arrow_type(type_)) for name, type_ in columns])
+
+
+def partition_day(value) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return UNDATED
+
+
+class PartitionedWriter:
+    """
+    Compressed columnar files under <directory>/<table>/date=<day>/, one per
+    run and day. Rows are expected grouped by day, so only one file is open
+    at a time and memory stays at one batch.
+    """
+
+    def __init__(
+        self, directory: str, table: str, run: str, schema, format_: str
+    ) -> None:
+        self.directory = directory
+        self.table = table
+        self.run = run
+        self.schema = schema
+        self.format = format_
+        self.files: List[str] = []
+        self.rows = 0
+        self._day: Optional[str] = None
+        self._file = None
+        self._writer = None
+
+    def write(self, day: str, rows: Sequence[Sequence]) -> None:
+        if day != self._day:
+            self.close()
+            self._open(day)
+
+        batch = pa.RecordBatch.from_arrays(
+            [
+                pa.array([row[index] for row in rows], type=field.type)
+                for index, field in enumerate(self.schema)
+            ],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch)
+        self.rows += len(rows)
+
+    def _open(self, day: str) -> None:
+        path = os.path.join(
+            self.table, f"date={day}", f"part-{self.run}.{EXPORT_FORMATS[self.format]}"
+        )
+        full_path = os.path.join(self.directory, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+        if self.format == "parquet":
+            self._writer = pa.parquet.ParquetWriter(
+                full_path, self.schema, compression=EXPORT_COMPRESSION
+            )
+        else:
+            self._file = pa.OSFile(full_path, "wb")
+            self._writer = pa.ipc.new_file(
+                self._file,
+                self.schema,
+                options=pa.ipc.IpcWriteOptions(compression=EXPORT_COMPRESSION),
+            )
+        self._day = day
+        self.files.append(path)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        self._writer = self._file = self._day = None
+
+
+def read_manifest(directory: str) -> Dict:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {"tables": {}, "runs": []}
+
+
+def write_manifest(directory: str, manifest: Dict) -> None:
+    """
+    Replace the manifest atomically, readers never see it half written
+    """
+    path = os.path.join(directory, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(f"{path}.tmp", path)
@@ -0,0 +1,135 @@
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.common.pagination import MAX_TAKE
+from app.common.messages import (
+    DATE_INVALID,
+    DATETIME_INVALID,
+    IDS_INVALID,
+    JSON_BODY_INVALID,
+    TOO_MANY_IDS,
+    UNKNOWN_FIELDS,
+)
+from app.common.exceptions import BadRequestException, FieldRequiredException
+
+
+def parse_fields(raw: Optional[str], allowed: Sequence[str]) -> Optional[Tuple[str]]:
+    """
+    Parse a comma separated ?fields= value, None means every field
+    """
+    if not raw:
+        return None
+
+    fields = tuple(
+        dict.fromkeys(field.strip() for field in raw.split(",") if field.strip())
+    )
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise BadRequestException(UNKNOWN_FIELDS.format(", ".join(unknown)))
+
+    return fields or None
+
+
+def with_id(fields: Optional[Sequence[str]], key: str = "id") -> Optional[Tuple[str]]:
+    """
+    Fields to select so rows can be matched back by key
+    """
+    if fields is None or key in fields:
+        return fields
+
+    return (*fields, key)
+
+
+def embed(
+    rows: List[Optional[dict]],
+    key: str,
+    related: Dict[int, dict],
+    name: str,
+    keep_key: bool = True,
+) -> List[Optional[dict]]:
+    """
+    Copies of rows with related[row[key]] attached under name, dropping key
+    unless keep_key is set. None rows (not found markers) are left alone.
+    Rows are never changed in place, the same row may appear twice.
+    """
+    embedded = []
+    for row in rows:
+        if row is None:
+            embedded.append(None)
+            continue
+
+        copy = {k: v for k, v in row.items() if keep_key or k != key}
+        copy[name] = related.get(row[key])
+        embedded.append(copy)
+    return embedded
+
+
+def json_object(data) -> dict:
+    """
+    A parsed JSON body that must be an object, a missing body reads as {}
+    """
+    if data is None:
+        return {}
+
+    if not isinstance(data, dict):
+        raise BadRequestException(JSON_BODY_INVALID)
+
+    return data
+
+
+def parse_ids(raw: Optional[str], limit: int = MAX_TAKE) -> List[int]:
+    """
+    Parse a comma separated ?ids= value, keeping order and duplicates
+    """
+    if not raw:
+        raise FieldRequiredException("ids")
+
+    try:
+        ids = [int(id_) for id_ in raw.split(",") if id_.strip()]
+    except ValueError:
+        raise BadRequestException(IDS_INVALID)
+
+    if not ids:
+        raise FieldRequiredException("ids")
+
+    if len(ids) > limit:
+        raise BadRequestException(TOO_MANY_IDS.format(limit))
+
+    return ids
+
+
+def parse_date(raw: Optional[str], name: str, default: date) -> date:
+    """
+    Parse an ISO ?from= / ?to= style date, default when it is absent
+    """
+    if not raw:
+        return default
+
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise BadRequestException(DATE_INVALID.format(name))
+
+
+def parse_datetime(raw: Optional[str], name: str) -> Optional[datetime]:
+    """
+    Parse an ISO ?before= style timestamp, None when it is absent
+    """
+    if not raw:
+        return None
+
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise BadRequestException(DATETIME_INVALID.format(name))
+
+
+def serialize_row(row, fields: Iterable[str]) -> dict:
+    """
+    Serialize the given attributes of a model instance or a result row
+    """
+    result = {}
+    for field in fields:
+        value = getattr(row, field)
+        result[field] = value.isoformat() if isinstance(value, date) else value
+    return result
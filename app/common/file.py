@@ -1,4 +1,6 @@
 import io
+import os
+import uuid
 import boto3
 import base64
 from flask import Flask
@@ -21,24 +23,30 @@ def create_file_uploader(app: Flask) -> Callable:
         aws_secret_access_key=app.config["AWS_ACCESS_SECRET"],
     )
 
+    def put(stream, data: dict) -> str:
+        fields = {k: v for k, v in data.items() if k not in ("stream", "path")}
+        file = FileStorage(stream, **fields)
+
+        s3.upload_fileobj(
+            file,
+            app.config["S3_BUCKET_NAME"],
+            data["filename"],
+            ExtraArgs={
+                "ContentType": data["content_type"],
+            },
+        )
+        return f"{app.config['S3_BUCKET_BASE_URL']}/{data['filename']}"
+
     def upload_file(data: dict) -> str:
         """
-        Upload a file to AWS S3
+        Upload a file to AWS S3, read from its staged path or base64 stream
         """
         try:
-            data["stream"] = base64.b64decode(data["stream"])
-            data["stream"] = io.BytesIO(data["stream"])
-            file = FileStorage(**data)
-
-            s3.upload_fileobj(
-                file,
-                app.config["S3_BUCKET_NAME"],
-                data["filename"],
-                ExtraArgs={
-                    "ContentType": data["content_type"],
-                },
-            )
-            return f"{app.config['S3_BUCKET_BASE_URL']}/{data['filename']}"
+            if "path" in data:
+                with open(data["path"], "rb") as stream:
+                    return put(stream, data)
+
+            return put(io.BytesIO(base64.b64decode(data["stream"])), data)
         except Exception:
             raise UploadFailedException()
 
@@ -64,6 +72,16 @@ def renaming_file(filename: str):
     return updated_filename
 
 
+def _describe(file: FileStorage) -> dict:
+    return {
+        "name": file.name,
+        "filename": renaming_file(file.filename),
+        "content_type": file.content_type,
+        "content_length": file.content_length,
+        "headers": {header[0]: header[1] for header in file.headers},
+    }
+
+
 def process_files_to_streams(files: Dict[str, FileStorage]) -> dict:
     """
     Process a file to a base64 string
@@ -76,11 +94,35 @@ def process_files_to_streams(files: Dict[str, FileStorage]) -> dict:
 
         result[key] = {
             "stream": base64.b64encode(file.stream.read()),
-            "name": file.name,
-            "filename": renaming_file(file.filename),
-            "content_type": file.content_type,
-            "content_length": file.content_length,
-            "headers": {header[0]: header[1] for header in file.headers},
+            **_describe(file),
         }
 
     return result
+
+
+def stage_files(files: Dict[str, FileStorage], directory: str) -> dict:
+    """
+    Save uploads under directory, so a job only carries their paths.
+    directory has to be shared by the app and its job workers.
+    """
+    os.makedirs(directory, exist_ok=True)
+    result = {}
+
+    for key, file in files.items():
+        if file is None or file.filename == "":
+            continue  # skip not required fields/files
+
+        path = os.path.join(directory, uuid.uuid4().hex)
+        file.save(path)
+        result[key] = {"path": path, **_describe(file)}
+
+    return result
+
+
+def remove_staged_files(files: dict) -> None:
+    for file in files.values():
+        if "path" in file:
+            try:
+                os.remove(file["path"])
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,187 @@
+import os
+import shutil
+from uuid import uuid4
+from flask import Flask
+from threading import Lock
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # only the follow graph snapshot needs numpy
+    np = None
+
+CURRENT_FILE = "CURRENT"
+SNAPSHOT_PREFIX = "snapshot-"
+KEPT_SNAPSHOTS = 2
+ARRAYS = ("user_ids", "indptr", "indices")
+NUMPY_REQUIRED = "numpy is required to build the follow graph"
+
+
+def csr_from_pairs(sources, targets, size: int):
+    """
+    CSR arrays (indptr, indices) of the edges sources[i] -> targets[i] between
+    nodes numbered 0..size-1. Duplicate edges are dropped and every row of
+    indices comes out sorted.
+    """
+    order = np.lexsort((targets, sources))
+    sources, targets = sources[order], targets[order]
+    keep = np.ones(len(sources), dtype=bool)
+    keep[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+    sources, targets = sources[keep], targets[keep]
+
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=size), out=indptr[1:])
+    return indptr, targets.astype(np.int32)
+
+
+def gather(indptr, indices, nodes):
+    """
+    Concatenated rows of nodes in one fancy-index instead of a Python loop,
+    with the position in nodes each value came from
+    """
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    # the k-th row occupies [prefix_k, prefix_k + length_k) of the output
+    # and starts at starts[k] in indices
+    prefix = np.cumsum(lengths) - lengths
+    positions = np.arange(int(lengths.sum())) + np.repeat(starts - prefix, lengths)
+    owners = np.repeat(np.arange(len(nodes)), lengths)
+    return owners, indices[positions]
+
+
+class FollowGraph:
+    """
+    Follower graph in CSR form. Users are numbered by their position in the
+    sorted user_ids array, and the users followed by node i are
+    indices[indptr[i]:indptr[i + 1]], sorted.
+    """
+
+    def __init__(self, user_ids, indptr, indices) -> None:
+        self.user_ids = user_ids
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Tuple[int, int]]) -> "FollowGraph":
+        """
+        Build the graph from (follower_id, followed_id) pairs
+        """
+        if np is None:
+            raise RuntimeError(NUMPY_REQUIRED)
+
+        flat = np.fromiter(
+            (user_id for edge in edges for user_id in edge), dtype=np.int64
+        )
+        pairs = flat.reshape(-1, 2)
+        user_ids = np.unique(flat)
+        indptr, indices = csr_from_pairs(
+            np.searchsorted(user_ids, pairs[:, 0]),
+            np.searchsorted(user_ids, pairs[:, 1]),
+            len(user_ids),
+        )
+        return cls(user_ids, indptr, indices)
+
+    def _node(self, user_id: int) -> Optional[int]:
+        node = int(np.searchsorted(self.user_ids, user_id))
+        if node < len(self.user_ids) and self.user_ids[node] == user_id:
+            return node
+        return None
+
+    def suggest(self, user_id: int, limit: int) -> List[Tuple[int, int]]:
+        """
+        Users followed by the users user_id follows, as (user_id, mutual_count)
+        pairs ordered by mutual_count, excluding user_id and whom it follows
+        """
+        node = self._node(user_id)
+        if node is None or limit <= 0:
+            return []
+
+        followed = self.indices[self.indptr[node] : self.indptr[node + 1]]
+        _, hops = gather(self.indptr, self.indices, followed)
+        if len(hops) == 0:
+            return []
+
+        candidates, counts = np.unique(hops, return_counts=True)
+        fresh = ~np.isin(candidates, followed) & (candidates != node)
+        candidates, counts = candidates[fresh], counts[fresh]
+        if len(candidates) > limit:
+            top = np.argpartition(-counts, limit - 1)[:limit]
+            candidates, counts = candidates[top], counts[top]
+
+        user_ids = self.user_ids[candidates]
+        order = np.lexsort((user_ids, -counts))
+        return [(int(user_ids[i]), int(counts[i])) for i in order]
+
+
+class FollowGraphStore:
+    """
+    Follow graph snapshots on disk, one directory of .npy arrays each, with
+    CURRENT naming the live one. Loaded arrays are memory-mapped, so every
+    worker process reading the same snapshot shares one copy in the page cache.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self._lock = Lock()
+        self._path: Optional[str] = None
+        self._graph: Optional[FollowGraph] = None
+
+    @property
+    def directory(self) -> str:
+        return self.app.config["FOLLOW_GRAPH_DIR"]
+
+    def save(self, graph: FollowGraph) -> str:
+        """
+        Write graph as a new snapshot and make it the live one
+        """
+        name = f"{SNAPSHOT_PREFIX}{datetime.utcnow():%Y%m%d%H%M%S%f}-{uuid4().hex[:8]}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(path)
+        for array in ARRAYS:
+            np.save(os.path.join(path, f"{array}.npy"), getattr(graph, array))
+
+        pointer = os.path.join(self.directory, f"{CURRENT_FILE}.{name}")
+        with open(pointer, "w") as file:
+            file.write(name)
+        os.replace(pointer, os.path.join(self.directory, CURRENT_FILE))
+
+        self._prune()
+        return name
+
+    def load(self) -> Optional[FollowGraph]:
+        """
+        The live snapshot, reopened only when CURRENT has moved on.
+        None before the first snapshot or without numpy
+        """
+        if np is None:
+            return None
+
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE)) as file:
+                name = file.read().strip()
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            path = os.path.join(self.directory, name)
+            if path != self._path:
+                self._graph = FollowGraph(
+                    *(
+                        np.load(os.path.join(path, f"{array}.npy"), mmap_mode="r")
+                        for array in ARRAYS
+                    )
+                )
+                self._path = path
+            return self._graph
+
+    def _prune(self) -> None:
+        # Readers still mapping an older snapshot keep their pages after the
+        # files are unlinked, so only the newest few are kept around
+        snapshots = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith(SNAPSHOT_PREFIX)
+        )
+        for name in snapshots[:-KEPT_SNAPSHOTS]:
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
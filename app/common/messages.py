@@ -24,3 +24,37 @@ UNAUTHORIZED_ADD_SONG_TO_PLAYLIST = (
 UNAUTHORIZED_REMOVE_SONG_FROM_PLAYLIST = (
     "You are not authorized to remove song from this playlist"
 )
+
+UNKNOWN_FIELDS = "Unknown fields: {}"
+
+SONG_NOT_IN_PLAYLIST = "Song is not in this playlist"
+UNAUTHORIZED_MOVE_SONG_IN_PLAYLIST = "You are not authorized to reorder this playlist"
+
+SONG_IDS_INVALID = "song_ids must be a list of integers"
+JSON_BODY_INVALID = "Request body must be a JSON object"
+TOO_MANY_SONG_IDS = "song_ids accepts at most {} ids"
+
+INVALID_IF_MATCH = "If-Match must hold the quoted version to update"
+VERSION_MISMATCH = "The resource has changed since the given version"
+CONCURRENT_UPDATE = "The resource was changed by another request, retry"
+
+IDS_INVALID = "ids must be a comma separated list of integers"
+TOO_MANY_IDS = "ids accepts at most {} ids"
+
+BATCH_REQUESTS_INVALID = "requests must be a list of objects with a path"
+BATCH_METHOD_INVALID = "Unsupported method in batch: {}"
+BATCH_NESTED = "A batch cannot contain another batch"
+BATCH_REQUEST_MALFORMED = "Malformed batch request: {}"
+TOO_MANY_BATCH_REQUESTS = "A batch accepts at most {} requests"
+INTERNAL_SERVER_ERROR = "Internal server error"
+
+DATE_INVALID = "{} must be a date like 2022-05-31"
+DATETIME_INVALID = "{} must be a timestamp like 2022-05-31T18:30:00"
+DATE_RANGE_INVALID = "from must not be after to"
+DATE_RANGE_TOO_LONG = "A date range spans at most {} days"
+EXPORT_TABLE_INVALID = "Unknown tables to export: {}"
+EXPORT_FORMAT_INVALID = "Unknown export format: {}"
+COHORT_REPORT_NOT_FOUND = (
+    "No cohort report for this range, build it with flask analytics cohorts"
+)
+PLAY_WINDOW_INVALID = "window must be between 1 and {} hours"
@@ -0,0 +1,36 @@
+import os
+import json
+from queue import Queue
+from typing import List, Optional
+
+
+class FileSink:
+    """
+    Append events to path as NDJSON, synced to disk once per batch
+    """
+
+    def __init__(self, path: str, name: str = "file") -> None:
+        self.path = path
+        self.name = name
+
+    def deliver(self, events: List[dict]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a") as file:
+            file.writelines(json.dumps(event) + "\n" for event in events)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+class QueueSink:
+    """
+    Hand events to consumers in the same process through a queue; a bounded
+    queue holds the dispatcher back while consumers catch up
+    """
+
+    def __init__(self, queue: Optional[Queue] = None, name: str = "queue") -> None:
+        self.queue = Queue() if queue is None else queue
+        self.name = name
+
+    def deliver(self, events: List[dict]) -> None:
+        for event in events:
+            self.queue.put(event)
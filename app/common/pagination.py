@@ -0,0 +1,16 @@
+MAX_TAKE = 500
+MAX_PREVIEW = 10
+
+
+def clamp_take(take: int) -> int:
+    """
+    Bound the page size of non-streaming list reads
+    """
+    return max(0, min(take, MAX_TAKE))
+
+
+def clamp_preview(preview: int) -> int:
+    """
+    Bound the number of songs previewed per playlist in list reads
+    """
+    return max(0, min(preview, MAX_PREVIEW))
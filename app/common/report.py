@@ -0,0 +1,105 @@
+import io
+import bz2
+import csv
+import sys
+import gzip
+import lzma
+import click
+from flask import json
+from typing import IO, Callable, Iterable, Optional, Sequence
+
+REPORT_FORMATS = ("csv", "ndjson")
+COMPRESSIONS = {"gzip": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+STDOUT = "-"
+
+
+def report_options(command: Callable) -> Callable:
+    """
+    --fields/--format/--output/--compress shared by the report commands
+    """
+    options = [
+        click.option("--fields", help="Comma separated fields, all by default"),
+        click.option(
+            "--format",
+            "format_",
+            type=click.Choice(REPORT_FORMATS),
+            default="csv",
+            show_default=True,
+        ),
+        click.option(
+            "--output",
+            "-o",
+            default=STDOUT,
+            show_default=True,
+            help="File to write, - for stdout",
+        ),
+        click.option(
+            "--compress",
+            type=click.Choice(tuple(COMPRESSIONS)),
+            help="Compress on the fly, inferred from the --output extension",
+        ),
+    ]
+    for option in reversed(options):
+        command = option(command)
+    return command
+
+
+def open_report(output: str, compress: Optional[str] = None) -> IO[str]:
+    """
+    Text stream to output, compressed as it is written
+    """
+    if compress is None:
+        compress = next(
+            (name for ext, name in EXTENSIONS.items() if output.endswith(ext)), None
+        )
+
+    if output == STDOUT:
+        if compress is None:
+            return io.TextIOWrapper(sys.stdout.buffer, newline="", write_through=True)
+        return COMPRESSIONS[compress](sys.stdout.buffer, "wt", newline="")
+
+    if compress is None:
+        return open(output, "w", newline="")
+    return COMPRESSIONS[compress](output, "wt", newline="")
+
+
+def write_report(
+    rows: Iterable[dict], fields: Sequence[str], format_: str, stream: IO[str]
+) -> int:
+    """
+    Write rows one at a time as CSV with a header or as NDJSON, returning
+    how many were written. Nothing is buffered beyond the current row.
+    """
+    count = 0
+    if format_ == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(row) + "\n")
+            count += 1
+    return count
+
+
+def export_report(
+    rows: Iterable[dict],
+    fields: Sequence[str],
+    format_: str,
+    output: str,
+    compress: Optional[str] = None,
+) -> int:
+    """
+    write_report() to output, leaving stdout open once done
+    """
+    stream = open_report(output, compress)
+    try:
+        return write_report(rows, fields, format_, stream)
+    finally:
+        if output == STDOUT and compress is None:
+            stream.detach()
+        else:
+            stream.close()
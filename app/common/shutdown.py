@@ -0,0 +1,38 @@
+import atexit
+import weakref
+from flask import Flask
+from typing import Callable
+
+SHUTDOWN_HOOKS = "shutdown_hooks"
+
+# Apps with hooks still to run. A single exit handler serves all of them, so
+# creating apps over and over (tests, app factories) adds no exit handlers and
+# apps that were shut down or garbage collected are skipped.
+_apps = weakref.WeakSet()
+
+
+def on_shutdown(app: Flask, hook: Callable[[], object]) -> None:
+    """
+    Run hook when app is shut down, at the latest when the process exits
+    """
+    app.extensions.setdefault(SHUTDOWN_HOOKS, []).append(hook)
+    _apps.add(app)
+
+
+def shutdown(app: Flask) -> None:
+    """
+    Run app's shutdown hooks once, the last registered first
+    """
+    _apps.discard(app)
+    hooks = app.extensions.pop(SHUTDOWN_HOOKS, [])
+    for hook in reversed(hooks):
+        try:
+            hook()
+        except Exception:
+            app.logger.exception("Shutdown hook %r failed", hook)
+
+
+@atexit.register
+def _shutdown_all() -> None:
+    for app in list(_apps):
+        shutdown(app)
@@ -0,0 +1,93 @@
+from typing import Iterable, Iterator, List, Tuple
+
+from app.common.graph import NUMPY_REQUIRED, csr_from_pairs, gather
+
+try:
+    import numpy as np
+except ImportError:  # only the similarity job needs numpy
+    np = None
+
+SIMILAR_SONGS_PER_SONG = 20
+# Upper bound on the (song, co-occurring song) pairs expanded at once
+SIMILARITY_CHUNK_SIZE = 1_000_000
+
+
+def _chunks(costs, budget: int) -> Iterator[Tuple[int, int]]:
+    """
+    Consecutive [start, end) ranges whose costs add up to about budget,
+    never empty so a single expensive song still gets its own chunk
+    """
+    totals = np.cumsum(costs)
+    start = 0
+    while start < len(costs):
+        spent = totals[start - 1] if start else 0
+        end = int(np.searchsorted(totals, spent + budget, side="right"))
+        end = max(end, start + 1)
+        yield start, end
+        start = end
+
+
+def similar_songs(
+    memberships: Iterable[Tuple[int, int]],
+    top_n: int = SIMILAR_SONGS_PER_SONG,
+    chunk_size: int = SIMILARITY_CHUNK_SIZE,
+) -> Iterator[List[Tuple[int, int, int, float]]]:
+    """
+    Item-item cosine similarity over the song x playlist matrix built from
+    (playlist_id, song_id) pairs: songs sharing playlists score
+    shared / sqrt(playlists_a * playlists_b).
+
+    Yields the (song_id, rank, similar_song_id, score) rows of the top_n most
+    similar songs per song, a chunk of songs at a time, so co-occurrences are
+    never expanded for more than about chunk_size pairs at once.
+    """
+    if np is None:
+        raise RuntimeError(NUMPY_REQUIRED)
+
+    pairs = np.fromiter(
+        (id_ for membership in memberships for id_ in membership), dtype=np.int64
+    ).reshape(-1, 2)
+    playlist_ids, playlists = np.unique(pairs[:, 0], return_inverse=True)
+    song_ids, songs = np.unique(pairs[:, 1], return_inverse=True)
+    playlists, songs = playlists.ravel(), songs.ravel()
+
+    # Both orientations of the sparse matrix: playlists of a song and songs
+    # of a playlist
+    song_indptr, song_indices = csr_from_pairs(songs, playlists, len(song_ids))
+    playlist_indptr, playlist_indices = csr_from_pairs(
+        playlists, songs, len(playlist_ids)
+    )
+    degrees = np.diff(song_indptr)
+    playlist_sizes = np.diff(playlist_indptr)
+
+    # Pairs expanded for a song: the sizes of all of its playlists
+    owners = np.repeat(np.arange(len(song_ids)), degrees)
+    costs = np.bincount(
+        owners, weights=playlist_sizes[song_indices], minlength=len(song_ids)
+    )
+
+    for start, end in _chunks(costs, chunk_size):
+        chunk = np.arange(start, end)
+        song_of, song_playlists = gather(song_indptr, song_indices, chunk)
+        pair_of, others = gather(playlist_indptr, playlist_indices, song_playlists)
+        sources = chunk[song_of[pair_of]]
+
+        keys, shared = np.unique(sources * len(song_ids) + others, return_counts=True)
+        sources, others = keys // len(song_ids), keys % len(song_ids)
+        distinct = sources != others
+        sources, others, shared = sources[distinct], others[distinct], shared[distinct]
+        scores = shared / np.sqrt(degrees[sources] * degrees[others])
+
+        # Best first within each song, ties broken by the smaller song id
+        order = np.lexsort((song_ids[others], -scores, sources))
+        sources, others, scores = sources[order], others[order], scores[order]
+        firsts = np.searchsorted(sources, sources)
+        ranks = np.arange(len(sources)) - firsts
+        top = ranks < top_n
+
+        yield [
+            (int(song_ids[source]), int(rank), int(song_ids[other]), float(score))
+            for source, rank, other, score in zip(
+                sources[top], ranks[top], others[top], scores[top]
+            )
+        ]
@@ -0,0 +1,236 @@
+import sys
+import math
+import zlib
+import heapq
+import struct
+import operator
+from array import array
+from hashlib import blake2b
+from typing import Dict, List, Optional, Tuple
+
+# First byte of every serialized sketch, so a blob is never read as the wrong kind
+HLL_FORMAT = 1
+COUNT_MIN_FORMAT = 2
+TOP_K_FORMAT = 3
+
+DEFAULT_PRECISION = 12
+DEFAULT_WIDTH = 2048
+DEFAULT_DEPTH = 4
+DEFAULT_TOP_K = 100
+
+_HLL_HEADER = struct.Struct("<BB")
+_COUNT_MIN_HEADER = struct.Struct("<BIIQ")
+_TOP_K_HEADER = struct.Struct("<BII")
+_POWERS = [2.0**-rank for rank in range(65)]
+
+
+def _digest(value, size: int) -> bytes:
+    return blake2b(str(value).encode(), digest_size=size).digest()
+
+
+def _check_format(data: bytes, expected: int) -> None:
+    if not data or data[0] != expected:
+        raise ValueError(f"Not a serialized sketch of format {expected}")
+
+
+class HyperLogLog:
+    """
+    Approximate distinct count in 2 ** precision one-byte registers, with a
+    standard error of about 1.04 / sqrt(2 ** precision): 1.6% at 12
+    """
+
+    def __init__(
+        self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None
+    ) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+
+        self.precision = precision
+        self.registers = bytearray(registers or 1 << precision)
+
+    def add(self, value) -> None:
+        hashed = int.from_bytes(_digest(value, 8), "little")
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        size = len(self.registers)
+        if size >= 128:
+            alpha = 0.7213 / (1 + 1.079 / size)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[size]
+
+        estimate = alpha * size * size / sum(map(_POWERS.__getitem__, self.registers))
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate while most registers are empty
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def to_bytes(self) -> bytes:
+        return _HLL_HEADER.pack(HLL_FORMAT, self.precision) + zlib.compress(
+            bytes(self.registers)
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        _check_format(data, HLL_FORMAT)
+        _, precision = _HLL_HEADER.unpack_from(data)
+        return cls(precision, zlib.decompress(data[_HLL_HEADER.size :]))
+
+
+class CountMinSketch:
+    """
+    depth rows of width counters; a key's estimate is the smallest of its
+    counters, never below its true count and above it by at most
+    2 * total / width with probability 1 - 0.5 ** depth
+    """
+
+    def __init__(
+        self,
+        width: int = DEFAULT_WIDTH,
+        depth: int = DEFAULT_DEPTH,
+        counters: Optional[array] = None,
+        total: int = 0,
+    ) -> None:
+        self.width = width
+        self.depth = depth
+        self.counters = counters or array("Q", bytes(8 * width * depth))
+        self.total = total
+
+    def _cells(self, key) -> List[int]:
+        digest = _digest(key, 16)
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [
+            row * self.width + (first + row * second) % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, key, count: int = 1) -> int:
+        """
+        Count key, returning its new estimate
+        """
+        cells = self._cells(key)
+        for cell in cells:
+            self.counters[cell] += count
+        self.total += count
+        return min(self.counters[cell] for cell in cells)
+
+    def estimate(self, key) -> int:
+        return min(self.counters[cell] for cell in self._cells(key))
+
+    def merge(self, other: "CountMinSketch") -> "CountMinSketch":
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge sketches of different dimensions")
+
+        self.counters = array("Q", map(operator.add, self.counters, other.counters))
+        self.total += other.total
+        return self
+
+    def to_bytes(self) -> bytes:
+        counters = array("Q", self.counters)
+        if sys.byteorder == "big":
+            counters.byteswap()
+        header = _COUNT_MIN_HEADER.pack(
+            COUNT_MIN_FORMAT, self.width, self.depth, self.total
+        )
+        return header + zlib.compress(counters.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CountMinSketch":
+        _check_format(data, COUNT_MIN_FORMAT)
+        _, width, depth, total = _COUNT_MIN_HEADER.unpack_from(data)
+        counters = array("Q", zlib.decompress(data[_COUNT_MIN_HEADER.size :]))
+        if sys.byteorder == "big":
+            counters.byteswap()
+        return cls(width, depth, counters, total)
+
+
+class TopK:
+    """
+    Heavy hitters: a count-min sketch counting every key plus the k keys with
+    the highest estimates so far, kept in a min-heap so a new key only has to
+    beat the smallest of them
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K, sketch: Optional[CountMinSketch] = None):
+        self.k = k
+        self.sketch = sketch or CountMinSketch()
+        self.candidates: Dict[int, int] = {}
+        self._heap: List[Tuple[int, int]] = []
+
+    def add(self, key: int, count: int = 1) -> None:
+        self._offer(key, self.sketch.add(key, count))
+
+    def _offer(self, key: int, estimate: int) -> None:
+        if key in self.candidates or len(self.candidates) < self.k:
+            self.candidates[key] = estimate
+            heapq.heappush(self._heap, (estimate, key))
+        else:
+            # A candidate's entry is pushed again each time its estimate
+            # grows, only the one matching candidates is current
+            while self._heap[0][0] != self.candidates.get(self._heap[0][1]):
+                heapq.heappop(self._heap)
+            if estimate <= self._heap[0][0]:
+                return
+
+            _, evicted = heapq.heapreplace(self._heap, (estimate, key))
+            del self.candidates[evicted]
+            self.candidates[key] = estimate
+
+        if len(self._heap) > 4 * self.k:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(estimate, key) for key, estimate in self.candidates.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        (key, estimated count) of the n heaviest keys, heaviest first
+        """
+        ranked = sorted(self.candidates.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:n]
+
+    def merge(self, other: "TopK") -> "TopK":
+        self.sketch.merge(other.sketch)
+        keys = set(self.candidates) | set(other.candidates)
+        estimates = sorted(
+            ((self.sketch.estimate(key), key) for key in keys), reverse=True
+        )
+        self.candidates = {key: estimate for estimate, key in estimates[: self.k]}
+        self._rebuild_heap()
+        return self
+
+    def to_bytes(self) -> bytes:
+        # Estimates are read back from the sketch, only the keys are stored
+        keys = array("q", self.candidates)
+        if sys.byteorder == "big":
+            keys.byteswap()
+        header = _TOP_K_HEADER.pack(TOP_K_FORMAT, self.k, len(keys))
+        return header + keys.tobytes() + self.sketch.to_bytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TopK":
+        _check_format(data, TOP_K_FORMAT)
+        _, k, size = _TOP_K_HEADER.unpack_from(data)
+        start = _TOP_K_HEADER.size
+        keys = array("q", data[start : start + 8 * size])
+        if sys.byteorder == "big":
+            keys.byteswap()
+
+        top_k = cls(k, CountMinSketch.from_bytes(data[start + 8 * size :]))
+        top_k.candidates = {key: top_k.sketch.estimate(key) for key in keys}
+        top_k._rebuild_heap()
+        return top_k
@@ -0,0 +1,55 @@
+from typing import Callable, Iterable, Iterator, Optional
+from flask import Request, Response, json, stream_with_context
+
+JSON_MIMETYPE = "application/json"
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+
+def yield_rows(
+    session, statement, serialize: Callable, batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[dict]:
+    """
+    Iterate over a select through a server-side cursor, batch_size rows at a time
+    """
+    result = session.execute(statement.execution_options(yield_per=batch_size))
+    for row in result:
+        yield serialize(row)
+
+
+def get_stream_format(request: Request) -> Optional[str]:
+    """
+    NDJSON when the client accepts it, a streamed JSON array on ?stream=true,
+    None for a regular buffered response
+    """
+    best = request.accept_mimetypes.best_match([JSON_MIMETYPE, NDJSON_MIMETYPE])
+    if best == NDJSON_MIMETYPE:
+        return NDJSON_MIMETYPE
+
+    if request.args.get("stream") in ("1", "true"):
+        return JSON_MIMETYPE
+
+    return None
+
+
+def _json_array(rows: Iterable[dict], key: Optional[str]) -> Iterator[str]:
+    yield "[" if key is None else "{" + json.dumps(key) + ":["
+    for index, row in enumerate(rows):
+        yield json.dumps(row) if index == 0 else "," + json.dumps(row)
+    yield "]" if key is None else "]}"
+
+
+def _ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def streaming_response(
+    rows: Iterable[dict], mimetype: str, key: Optional[str] = None
+) -> Response:
+    """
+    Send rows as they are read instead of building the whole body first.
+    For JSON arrays, key wraps the array in an object like {"followers": [...]}
+    """
+    body = _ndjson(rows) if mimetype == NDJSON_MIMETYPE else _json_array(rows, key)
+    return Response(stream_with_context(body), mimetype=mimetype)
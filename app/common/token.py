@@ -7,10 +7,18 @@ from flask import jsonify, request, current_app
 from app.models.user import User
 from app.common.messages import TOKEN_INVALID, VALID_TOKEN_MISSING
 
+# Set by in-process dispatchers (the batch endpoint) that already resolved
+# the user, so sub-requests skip decoding the token and loading the user again
+CURRENT_USER_ENVIRON_KEY = "app.current_user"
+
 
 def token_required(func: Callable) -> Callable:
     @wraps(func)
     def wrapper(*args, **kwargs):
+        current_user = request.environ.get(CURRENT_USER_ENVIRON_KEY)
+        if current_user is not None:
+            return func(current_user, *args, **kwargs)
+
         token = None
         if "Authorization" in request.headers:
             token = request.headers["Authorization"][7:]
@@ -13,6 +13,20 @@ class Config:
     S3_BUCKET_BASE_URL = os.environ.get("S3_BUCKET_BASE_URL")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_RECORD_QUERIES = True
+    FOLLOW_GRAPH_DIR = os.environ.get("FOLLOW_GRAPH_DIR") or os.path.join(
+        BASEDIR, "follow-graph"
+    )
+    EXPORT_DIR = os.environ.get("EXPORT_DIR") or os.path.join(BASEDIR, "export")
+    OUTBOX_FILE = os.environ.get("OUTBOX_FILE") or os.path.join(
+        BASEDIR, "outbox", "events.ndjson"
+    )
+    # Uploads wait here for their job, shared with the job workers
+    UPLOAD_STAGING_DIR = os.environ.get("UPLOAD_STAGING_DIR") or os.path.join(
+        BASEDIR, "upload-staging"
+    )
+    # Seconds a shutting down process waits for running jobs, keep it below
+    # the WSGI server's graceful timeout
+    JOB_DRAIN_TIMEOUT = float(os.environ.get("JOB_DRAIN_TIMEOUT", 25))
 
     @staticmethod
     def init_app(app):
@@ -0,0 +1,65 @@
+import click
+from http import HTTPStatus
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+from flask import Response, jsonify, request
+
+from app.common.fields import parse_date
+from app.services.analytics import AnalyticsService
+from app.common.exceptions import BadRequestException, NotFoundException
+
+DEFAULT_DAILY_DAYS = 30
+DEFAULT_COHORT_DAYS = 12 * 7
+
+
+def _parse_range(
+    raw_start: Optional[str], raw_end: Optional[str], default_days: int
+) -> Tuple[date, date]:
+    end = parse_date(raw_end, "to", datetime.utcnow().date())
+    start = parse_date(raw_start, "from", end - timedelta(days=default_days - 1))
+    return start, end
+
+
+class AnalyticsController:
+    def __init__(self, service: AnalyticsService):
+        self.service = service
+
+    def get_daily(self, *args) -> Tuple[Response, int]:
+        try:
+            start, end = _parse_range(
+                request.args.get("from"), request.args.get("to"), DEFAULT_DAILY_DAYS
+            )
+            return jsonify(self.service.get_daily(start, end)), HTTPStatus.OK
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    def get_cohorts(self, *args) -> Tuple[Response, int]:
+        try:
+            start, end = _parse_range(
+                request.args.get("from"), request.args.get("to"), DEFAULT_COHORT_DAYS
+            )
+            return jsonify(self.service.get_cohorts(start, end)), HTTPStatus.OK
+        except NotFoundException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    def rollup(self) -> None:
+        result = self.service.rollup()
+        click.echo(
+            f"Rolled up {result['from']:%Y-%m-%d %H:%M:%S} to "
+            f"{result['to']:%Y-%m-%d %H:%M:%S}: {len(result['days'])} days updated"
+        )
+
+    @click.option("--from", "start", help="First signup day, like 2022-05-02")
+    @click.option("--to", "end", help="Last signup day, today by default")
+    def build_cohorts(self, start: Optional[str], end: Optional[str]) -> None:
+        try:
+            start, end = _parse_range(start, end, DEFAULT_COHORT_DAYS)
+            report = self.service.build_cohorts(start, end)
+        except (BadRequestException, RuntimeError) as e:
+            raise click.ClickException(str(e))
+
+        click.echo(
+            f"Built {len(report['cohorts'])} weekly cohorts for {start} to {end}"
+        )
@@ -2,7 +2,9 @@ from typing import Tuple
 from http import HTTPStatus
 from flask import jsonify, Response, request
 
+from app.models.user import User
 from app.services.auth import AuthService
+from app.common.fields import parse_fields
 from app.common.messages import EMAIL_PASSWORD_REQUIRED
 from app.common.exceptions import BadRequestException, DataAlreadyExists
 
@@ -39,4 +41,8 @@ class AuthController:
             return jsonify(e.to_dict()), e.error_code
 
     def profile(self, current_user):
-        return jsonify(current_user.to_dict()), HTTPStatus.OK
+        try:
+            fields = parse_fields(request.args.get("fields"), User.FIELDS)
+            return jsonify(current_user.to_dict(fields)), HTTPStatus.OK
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
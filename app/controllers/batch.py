@@ -0,0 +1,25 @@
+from typing import Tuple
+from http import HTTPStatus
+from flask import Response, jsonify, request
+
+from app.models.user import User
+from app.services.batch import BatchService
+from app.common.fields import json_object
+from app.common.exceptions import BadRequestException, FieldRequiredException
+
+
+class BatchController:
+    def __init__(self, service: BatchService):
+        self.service = service
+
+    def execute(self, current_user: User) -> Tuple[Response, int]:
+        try:
+            data = json_object(request.get_json(silent=True))
+            responses = self.service.execute(
+                current_user, data.get("requests"), bool(data.get("parallel"))
+            )
+            return jsonify({"responses": responses}), HTTPStatus.OK
+        except FieldRequiredException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
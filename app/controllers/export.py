@@ -0,0 +1,35 @@
+import click
+from typing import Tuple
+
+from app.services.export import ExportService
+from app.repositories.export import EXPORT_TABLES
+from app.common.exceptions import BadRequestException
+
+
+class ExportController:
+    def __init__(self, service: ExportService):
+        self.service = service
+
+    @click.option(
+        "--table",
+        "tables",
+        multiple=True,
+        help=f"Table to export, repeatable: {', '.join(EXPORT_TABLES)}",
+    )
+    @click.option(
+        "--format",
+        "format_",
+        default="parquet",
+        show_default=True,
+        help="parquet or arrow (Arrow IPC)",
+    )
+    def export(self, tables: Tuple[str], format_: str) -> None:
+        try:
+            run = self.service.export(tables or EXPORT_TABLES, format_)
+        except (BadRequestException, RuntimeError) as e:
+            raise click.ClickException(str(e))
+
+        for table, result in run["tables"].items():
+            click.echo(
+                f"{table}: {result['rows']} rows in {len(result['files'])} files"
+            )
@@ -0,0 +1,41 @@
+import click
+import time
+
+from app.services.job import POLL_INTERVAL, JobService
+
+
+class JobController:
+    def __init__(self, service: JobService):
+        self.service = service
+
+    @click.option(
+        "--concurrency",
+        "-c",
+        type=click.IntRange(min=1),
+        default=1,
+        show_default=True,
+        help="Consumers running jobs side by side",
+    )
+    @click.option("--burst", is_flag=True, help="Exit once no job is due")
+    @click.option(
+        "--poll-interval",
+        type=float,
+        default=POLL_INTERVAL,
+        show_default=True,
+        help="Seconds an idle consumer waits before looking again",
+    )
+    def work(self, concurrency: int, burst: bool, poll_interval: float) -> None:
+        start = time.perf_counter()
+        processed = self.service.work(concurrency, burst, poll_interval)
+        elapsed = time.perf_counter() - start
+        click.echo(f"Ran {processed} jobs in {elapsed:.2f}s")
+
+    def stats(self) -> None:
+        counts = self.service.get_stats()
+        if not counts:
+            click.echo("No jobs")
+        for status, count in sorted(counts.items()):
+            click.echo(f"{status}: {count}")
+
+    def retry_dead(self) -> None:
+        click.echo(f"Queued {self.service.retry_dead()} dead jobs again")
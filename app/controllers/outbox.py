@@ -0,0 +1,44 @@
+import click
+
+from app.services.outbox import (
+    OUTBOX_BATCH_SIZE,
+    OUTBOX_RETENTION_DAYS,
+    OutboxService,
+)
+
+
+class OutboxController:
+    def __init__(self, service: OutboxService):
+        self.service = service
+
+    @click.option(
+        "--batch-size",
+        type=click.IntRange(min=1),
+        default=OUTBOX_BATCH_SIZE,
+        show_default=True,
+    )
+    @click.option("--follow", is_flag=True, help="Keep polling for new events")
+    @click.option(
+        "--interval",
+        type=float,
+        default=1.0,
+        show_default=True,
+        help="Seconds to wait between polls once caught up",
+    )
+    def dispatch(self, batch_size: int, follow: bool, interval: float) -> None:
+        if follow:
+            self.service.follow(interval, batch_size)
+            return
+
+        for sink, count in self.service.dispatch(batch_size).items():
+            click.echo(f"{sink}: {count} events")
+
+    @click.option(
+        "--days",
+        type=click.IntRange(min=0),
+        default=OUTBOX_RETENTION_DAYS,
+        show_default=True,
+        help="Keep delivered events this many days",
+    )
+    def prune(self, days: int) -> None:
+        click.echo(f"Deleted {self.service.prune(days)} events")
@@ -0,0 +1,68 @@
+import click
+from http import HTTPStatus
+from typing import Tuple
+from flask import Response, jsonify, request
+
+from app.models.user import User
+from app.common.fields import parse_datetime
+from app.services.play import HISTORY_RETENTION_MONTHS, PlayService
+from app.common.exceptions import BadRequestException, NotFoundException
+
+DEFAULT_WINDOW_HOURS = 24
+
+
+class PlayController:
+    def __init__(self, service: PlayService):
+        self.service = service
+
+    def record(self, current_user: User, song_id: int) -> Tuple[Response, int]:
+        try:
+            self.service.record(current_user, song_id)
+            return "", HTTPStatus.OK
+        except NotFoundException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    def get_unique_listeners(self, _, song_id: int) -> Tuple[Response, int]:
+        hours = request.args.get("window", DEFAULT_WINDOW_HOURS, int)
+
+        try:
+            listeners = self.service.get_unique_listeners(song_id, hours)
+            return jsonify(listeners), HTTPStatus.OK
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    def get_top_songs(self, *args) -> Tuple[Response, int]:
+        hours = request.args.get("window", DEFAULT_WINDOW_HOURS, int)
+        take = request.args.get("take", 10, int)
+
+        try:
+            return jsonify(self.service.get_top_songs(hours, take)), HTTPStatus.OK
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    def get_history(self, current_user: User) -> Tuple[Response, int]:
+        take = request.args.get("take", 20, int)
+
+        try:
+            before = parse_datetime(request.args.get("before"), "before")
+            history = self.service.get_history(current_user, before, take)
+            return jsonify(history), HTTPStatus.OK
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    @click.option(
+        "--months",
+        type=click.IntRange(min=1),
+        default=HISTORY_RETENTION_MONTHS,
+        show_default=True,
+        help="Months of history to keep, the current one included",
+    )
+    def prune_history(self, months: int) -> None:
+        dropped = self.service.prune_history(months)
+        click.echo(
+            f"Dropped {len(dropped)} history partitions"
+            + "".join(f"\n  {month:%Y-%m}" for month in dropped)
+        )
+
+    def flush(self) -> None:
+        click.echo(f"Flushed {self.service.flush()} plays")
@@ -2,9 +2,17 @@ from http import HTTPStatus
 from typing import Tuple, Optional
 from flask import Response, jsonify, request
 
+from app.models.song import Song
 from app.models.user import User
+from app.models.playlist import Playlist
 from app.services.playlist import PlaylistService
+from app.common.etag import get_if_match_version, not_modified
+from app.common.fields import json_object, parse_fields, parse_ids
+from app.common.streaming import get_stream_format, streaming_response
 from app.common.exceptions import (
+    ConflictException,
+    PreconditionFailedException,
+    BadRequestException,
     NotFoundException,
     UnauthorizedException,
     FieldRequiredException,
@@ -24,6 +32,14 @@ class PlaylistController:
         except FieldRequiredException as e:
             return jsonify(e.to_dict()), e.error_code
 
+    def copy(self, current_user: User, playlist_id: int) -> Tuple[Response, int]:
+        try:
+            data = request.form.to_dict()
+            playlist = self.service.copy(current_user, playlist_id, data)
+            return jsonify(playlist), HTTPStatus.CREATED
+        except NotFoundException as e:
+            return jsonify(e.to_dict()), e.error_code
+
     def update(
         self, current_user: User, playlist_id: Optional[int]
     ) -> Tuple[Response, int]:
@@ -34,8 +50,15 @@ class PlaylistController:
 
             playlist_id = int(playlist_id)
             data = request.form.to_dict()
-            self.service.update(current_user, playlist_id, data)
+            version = get_if_match_version(request)
+            self.service.update(current_user, playlist_id, data, version)
             return "", HTTPStatus.OK
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except PreconditionFailedException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except ConflictException as e:
+            return jsonify(e.to_dict()), e.error_code
         except UnauthorizedException as e:
             return jsonify(e.to_dict()), e.error_code
         except NotFoundException as e:
@@ -61,7 +84,46 @@ class PlaylistController:
         take = request.args.get("take", 10, int)
         skip = request.args.get("skip", 0, int)
 
-        return jsonify(self.service.get_all(take, skip)), HTTPStatus.OK
+        song_count = request.args.get("song_count") in ("1", "true")
+        preview = request.args.get("preview", 0, int)
+
+        try:
+            fields = parse_fields(request.args.get("fields"), Playlist.FIELDS)
+            song_fields = parse_fields(request.args.get("song_fields"), Song.FIELDS)
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+        stream_format = get_stream_format(request)
+        if stream_format is not None:
+            take = take if "take" in request.args else None
+            rows = self.service.iter_all(
+                take, skip, fields, song_count, preview, song_fields
+            )
+            return streaming_response(rows, stream_format), HTTPStatus.OK
+
+        etag = self.service.get_all_etag(
+            take, skip, fields, song_count, preview, song_fields
+        )
+        if etag in request.if_none_match:
+            return not_modified(etag), HTTPStatus.NOT_MODIFIED
+
+        playlists = self.service.get_all(
+            take, skip, fields, song_count, preview, song_fields
+        )
+        response = jsonify(playlists)
+        response.set_etag(etag)
+        return response, HTTPStatus.OK
+
+    def get_many(self, *args) -> Tuple[Response, int]:
+        try:
+            ids = parse_ids(request.args.get("ids"))
+            fields = parse_fields(request.args.get("fields"), Playlist.FIELDS)
+        except FieldRequiredException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+        return jsonify(self.service.get_many(ids, fields)), HTTPStatus.OK
 
     def get_by_id(self, _, playlist_id: Optional[int]) -> Tuple[Response, int]:
         take = request.args.get("take", 10, int)
@@ -72,14 +134,30 @@ class PlaylistController:
                 err = FieldRequiredException("playlist_id")
                 return jsonify(err.to_dict()), err.error_code
 
-            playlist = self.service.get_by_id(playlist_id, take, skip)
-            return jsonify(playlist), HTTPStatus.OK
+            fields = parse_fields(request.args.get("fields"), Playlist.FIELDS)
+            song_fields = parse_fields(request.args.get("song_fields"), Song.FIELDS)
+            include = parse_fields(request.args.get("include"), Song.INCLUDES)
+            etag = self.service.get_etag(
+                playlist_id, take, skip, fields, song_fields, include
+            )
+            if etag in request.if_none_match:
+                return not_modified(etag), HTTPStatus.NOT_MODIFIED
+
+            playlist = self.service.get_by_id(
+                playlist_id, take, skip, fields, song_fields, include
+            )
+            response = jsonify(playlist)
+            response.set_etag(etag)
+            return response, HTTPStatus.OK
         except NotFoundException as e:
             return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
 
     def add_song(self, current_user: User, playlist_id: int, song_id: int):
         try:
-            self.service.add_song(current_user, playlist_id, song_id)
+            index = request.args.get("index", None, int)
+            self.service.add_song(current_user, playlist_id, song_id, index)
             return "", HTTPStatus.OK
         except UnauthorizedException as e:
             return jsonify(e.to_dict()), e.error_code
@@ -94,3 +172,49 @@ class PlaylistController:
             return jsonify(e.to_dict()), e.error_code
         except NotFoundException as e:
             return jsonify(e.to_dict()), e.error_code
+
+    def add_songs(self, current_user: User, playlist_id: int):
+        try:
+            data = json_object(request.get_json(silent=True))
+            result = self.service.add_songs(
+                current_user, playlist_id, data.get("song_ids")
+            )
+            return jsonify(result), HTTPStatus.OK
+        except FieldRequiredException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except UnauthorizedException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except NotFoundException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    def remove_songs(self, current_user: User, playlist_id: int):
+        try:
+            data = json_object(request.get_json(silent=True))
+            result = self.service.remove_songs(
+                current_user, playlist_id, data.get("song_ids")
+            )
+            return jsonify(result), HTTPStatus.OK
+        except FieldRequiredException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except UnauthorizedException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except NotFoundException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    def move_song(self, current_user: User, playlist_id: int, song_id: int):
+        try:
+            index = request.args.get("index", None, int)
+            if index is None:
+                err = FieldRequiredException("index")
+                return jsonify(err.to_dict()), err.error_code
+
+            self.service.move_song(current_user, playlist_id, song_id, index)
+            return "", HTTPStatus.OK
+        except UnauthorizedException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except NotFoundException as e:
+            return jsonify(e.to_dict()), e.error_code
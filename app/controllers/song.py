@@ -1,3 +1,4 @@
+import click
 from http import HTTPStatus
 from typing import List, Tuple, Optional
 from flask import Response, jsonify, request
@@ -5,7 +6,12 @@ from flask import Response, jsonify, request
 from app.models.song import Song
 from app.models.user import User
 from app.services.song import SongService
+from app.common.etag import get_if_match_version, not_modified
+from app.common.fields import parse_fields, parse_ids
+from app.common.report import export_report, report_options
+from app.common.streaming import get_stream_format, streaming_response
 from app.common.exceptions import (
+    PreconditionFailedException,
     NotFoundException,
     BadRequestException,
     UnauthorizedException,
@@ -49,8 +55,13 @@ class SongController:
             for key, file in request.files.items():
                 files[key] = file
 
-            self.service.update(current_user, song_id, files, request.form.to_dict())
+            version = get_if_match_version(request)
+            self.service.update(
+                current_user, song_id, files, request.form.to_dict(), version
+            )
             return "", HTTPStatus.OK
+        except PreconditionFailedException as e:
+            return jsonify(e.to_dict()), e.error_code
         except UnauthorizedException as e:
             return jsonify(e.to_dict()), e.error_code
         except NotFoundException as e:
@@ -79,7 +90,68 @@ class SongController:
         take = request.args.get("take", 10, int)
         skip = request.args.get("skip", 0, int)
 
-        return jsonify(self.service.get_all(take, skip)), HTTPStatus.OK
+        try:
+            fields = parse_fields(request.args.get("fields"), Song.FIELDS)
+            include = parse_fields(request.args.get("include"), Song.INCLUDES)
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+        stream_format = get_stream_format(request)
+        if stream_format is not None:
+            take = take if "take" in request.args else None
+            rows = self.service.iter_all(take, skip, fields, include)
+            return streaming_response(rows, stream_format), HTTPStatus.OK
+
+        etag = self.service.get_all_etag(take, skip, fields, include)
+        if etag in request.if_none_match:
+            return not_modified(etag), HTTPStatus.NOT_MODIFIED
+
+        response = jsonify(self.service.get_all(take, skip, fields, include))
+        response.set_etag(etag)
+        return response, HTTPStatus.OK
+
+    def get_many(self, *args) -> Tuple[Response, int]:
+        try:
+            ids = parse_ids(request.args.get("ids"))
+            fields = parse_fields(request.args.get("fields"), Song.FIELDS)
+            include = parse_fields(request.args.get("include"), Song.INCLUDES)
+        except FieldRequiredException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+        return jsonify(self.service.get_many(ids, fields, include)), HTTPStatus.OK
+
+    def get_similar(self, _, song_id: int) -> Tuple[Response, int]:
+        take = request.args.get("take", 10, int)
+
+        try:
+            fields = parse_fields(request.args.get("fields"), Song.FIELDS)
+            songs = self.service.get_similar(song_id, take, fields)
+            return jsonify({"songs": songs}), HTTPStatus.OK
+        except NotFoundException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+    def rebuild_similar(self) -> None:
+        try:
+            count = self.service.rebuild_similar()
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(f"Wrote {count} similar songs")
+
+    @report_options
+    def export(self, fields, format_, output, compress) -> None:
+        try:
+            fields = parse_fields(fields, Song.FIELDS)
+        except BadRequestException as e:
+            raise click.ClickException(str(e))
+
+        rows = self.service.iter_all(None, 0, fields)
+        count = export_report(rows, fields or Song.FIELDS, format_, output, compress)
+        click.echo(f"Wrote {count} songs", err=True)
 
     def get_by_id(self, _, song_id: Optional[int]) -> Tuple[Song, int]:
         try:
@@ -87,7 +159,17 @@ class SongController:
                 err = FieldRequiredException("song_id")
                 return jsonify(err.to_dict()), err.error_code
 
-            song = self.service.get_by_id(song_id)
-            return jsonify(song), HTTPStatus.OK
+            fields = parse_fields(request.args.get("fields"), Song.FIELDS)
+            include = parse_fields(request.args.get("include"), Song.INCLUDES)
+            etag = self.service.get_etag(song_id, fields, include)
+            if etag in request.if_none_match:
+                return not_modified(etag), HTTPStatus.NOT_MODIFIED
+
+            song = self.service.get_by_id(song_id, fields, include)
+            response = jsonify(song)
+            response.set_etag(etag)
+            return response, HTTPStatus.OK
         except NotFoundException as e:
             return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
@@ -1,11 +1,20 @@
+import click
 from typing import Tuple
 from http import HTTPStatus
 from flask import Response, jsonify, request
 
+from app.models.song import Song
 from app.models.user import User
 from app.services.user import UserService
+from app.common.fields import parse_fields, parse_ids
+from app.common.report import export_report, report_options
+from app.common.streaming import get_stream_format, streaming_response
 from app.common.messages import USER_ID_REQUIRED
-from app.common.exceptions import NotFoundException
+from app.common.exceptions import (
+    BadRequestException,
+    FieldRequiredException,
+    NotFoundException,
+)
 
 
 class UserController:
@@ -36,13 +45,39 @@ class UserController:
         except NotFoundException as e:
             return jsonify(e.to_dict()), e.error_code
 
+    def get_many(self, *args) -> Tuple[Response, int]:
+        try:
+            ids = parse_ids(request.args.get("ids"))
+            fields = parse_fields(request.args.get("fields"), User.FIELDS)
+        except FieldRequiredException as e:
+            return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+        return jsonify(self.service.get_many(ids, fields)), HTTPStatus.OK
+
     def get_followers(self, current_user: User) -> Tuple[Response, int]:
         take = request.args.get("take", 10, int)
         skip = request.args.get("skip", 0, int)
 
-        users = current_user.get_followers(take, skip)
+        try:
+            fields = parse_fields(request.args.get("fields"), User.FIELDS)
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+        stream_format = get_stream_format(request)
+        if stream_format is not None:
+            take = take if "take" in request.args else None
+            rows = self.service.iter_followers(
+                current_user.id, take, skip, fields, current_user.id
+            )
+            return streaming_response(rows, stream_format, "followers"), HTTPStatus.OK
+
+        users = self.service.get_followers(
+            current_user.id, take, skip, fields, current_user.id
+        )
         return (
-            jsonify({"followers": [user.to_dict() for user in users]}),
+            jsonify({"followers": users}),
             HTTPStatus.OK,
         )
 
@@ -50,21 +85,108 @@ class UserController:
         take = request.args.get("take", 10, int)
         skip = request.args.get("skip", 0, int)
 
-        users = current_user.get_followed_users(take, skip)
+        try:
+            fields = parse_fields(request.args.get("fields"), User.FIELDS)
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+        stream_format = get_stream_format(request)
+        if stream_format is not None:
+            take = take if "take" in request.args else None
+            rows = self.service.iter_followed_users(
+                current_user.id, take, skip, fields, current_user.id
+            )
+            return (
+                streaming_response(rows, stream_format, "followed_users"),
+                HTTPStatus.OK,
+            )
+
+        users = self.service.get_followed_users(
+            current_user.id, take, skip, fields, current_user.id
+        )
         return (
-            jsonify({"followed_users": [user.to_dict() for user in users]}),
+            jsonify({"followed_users": users}),
             HTTPStatus.OK,
         )
 
+    def get_suggestions(self, current_user: User) -> Tuple[Response, int]:
+        take = request.args.get("take", 10, int)
+
+        try:
+            fields = parse_fields(request.args.get("fields"), User.FIELDS)
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
+
+        users = self.service.get_suggestions(current_user.id, take, fields)
+        return jsonify({"suggestions": users}), HTTPStatus.OK
+
+    def snapshot_follow_graph(self) -> None:
+        try:
+            snapshot = self.service.snapshot_follow_graph()
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(
+            f"Wrote {snapshot['snapshot']}: "
+            f"{snapshot['users']} users, {snapshot['follows']} follows"
+        )
+
+    @click.argument("user_id", type=int)
+    @report_options
+    def export_followers(self, user_id: int, fields, format_, output, compress) -> None:
+        try:
+            fields = parse_fields(fields, User.FIELDS)
+        except BadRequestException as e:
+            raise click.ClickException(str(e))
+
+        rows = self.service.iter_followers(user_id, None, 0, fields)
+        count = export_report(rows, fields or User.FIELDS, format_, output, compress)
+        click.echo(f"Wrote {count} followers", err=True)
+
+    @click.argument("user_id", type=int)
+    @report_options
+    def export_followed_users(
+        self, user_id: int, fields, format_, output, compress
+    ) -> None:
+        try:
+            fields = parse_fields(fields, User.FIELDS)
+        except BadRequestException as e:
+            raise click.ClickException(str(e))
+
+        rows = self.service.iter_followed_users(user_id, None, 0, fields)
+        count = export_report(rows, fields or User.FIELDS, format_, output, compress)
+        click.echo(f"Wrote {count} followed users", err=True)
+
+    @click.argument("user_id", type=int)
+    @report_options
+    def export_songs(self, user_id: int, fields, format_, output, compress) -> None:
+        try:
+            fields = parse_fields(fields, Song.FIELDS)
+            rows = self.service.iter_songs(user_id, None, 0, fields)
+        except (BadRequestException, NotFoundException) as e:
+            raise click.ClickException(str(e))
+
+        count = export_report(rows, fields or Song.FIELDS, format_, output, compress)
+        click.echo(f"Wrote {count} songs", err=True)
+
     def get_songs(self, _, user_id: int) -> Tuple[Response, int]:
         take = request.args.get("take", 10, int)
         skip = request.args.get("skip", 0, int)
 
         try:
-            songs = self.service.get_songs(user_id, take, skip)
+            fields = parse_fields(request.args.get("fields"), Song.FIELDS)
+            stream_format = get_stream_format(request)
+            if stream_format is not None:
+                take = take if "take" in request.args else None
+                rows = self.service.iter_songs(user_id, take, skip, fields)
+                return streaming_response(rows, stream_format, "songs"), HTTPStatus.OK
+
+            songs = self.service.get_songs(user_id, take, skip, fields)
             return (
-                jsonify({"songs": [song.to_dict() for song in songs]}),
+                jsonify({"songs": songs}),
                 HTTPStatus.OK,
             )
         except NotFoundException as e:
             return jsonify(e.to_dict()), e.error_code
+        except BadRequestException as e:
+            return jsonify(e.to_dict()), e.error_code
@@ -0,0 +1,27 @@
+from flask import Blueprint
+
+from app.common.token import token_required
+from app.controllers.analytics import AnalyticsController
+
+
+class AnalyticsHandler:
+    def __init__(self, controller: AnalyticsController) -> None:
+        self.__blueprint = Blueprint("analytics", __name__)
+        self.__blueprint.add_url_rule(
+            "/daily",
+            "get_daily",
+            token_required(controller.get_daily),
+            methods=["GET"],
+        )
+        self.__blueprint.add_url_rule(
+            "/cohorts",
+            "get_cohorts",
+            token_required(controller.get_cohorts),
+            methods=["GET"],
+        )
+        self.__blueprint.cli.command("rollup")(controller.rollup)
+        self.__blueprint.cli.command("cohorts")(controller.build_cohorts)
+
+    @property
+    def blueprint(self) -> Blueprint:
+        return self.__blueprint
@@ -0,0 +1,16 @@
+from flask import Blueprint
+
+from app.common.token import token_required
+from app.controllers.batch import BatchController
+
+
+class BatchHandler:
+    def __init__(self, controller: BatchController):
+        self.__blueprint = Blueprint("batch", __name__)
+        self.__blueprint.add_url_rule(
+            "", "execute", token_required(controller.execute), methods=["POST"]
+        )
+
+    @property
+    def blueprint(self) -> Blueprint:
+        return self.__blueprint
@@ -0,0 +1,14 @@
+from flask import Blueprint
+
+from app.controllers.export import ExportController
+
+
+class ExportHandler:
+    def __init__(self, controller: ExportController) -> None:
+        # No routes, only the top level `flask export` command
+        self.__blueprint = Blueprint("export", __name__, cli_group=None)
+        self.__blueprint.cli.command("export")(controller.export)
+
+    @property
+    def blueprint(self) -> Blueprint:
+        return self.__blueprint
@@ -0,0 +1,15 @@
+from flask import Blueprint
+
+from app.controllers.job import JobController
+
+
+class JobHandler:
+    def __init__(self, controller: JobController) -> None:
+        self.__blueprint = Blueprint("jobs", __name__)
+        self.__blueprint.cli.command("work")(controller.work)
+        self.__blueprint.cli.command("stats")(controller.stats)
+        self.__blueprint.cli.command("retry-dead")(controller.retry_dead)
+
+    @property
+    def blueprint(self) -> Blueprint:
+        return self.__blueprint
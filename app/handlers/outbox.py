@@ -0,0 +1,14 @@
+from flask import Blueprint
+
+from app.controllers.outbox import OutboxController
+
+
+class OutboxHandler:
+    def __init__(self, controller: OutboxController) -> None:
+        self.__blueprint = Blueprint("outbox", __name__)
+        self.__blueprint.cli.command("dispatch")(controller.dispatch)
+        self.__blueprint.cli.command("prune")(controller.prune)
+
+    @property
+    def blueprint(self) -> Blueprint:
+        return self.__blueprint
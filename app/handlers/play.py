@@ -0,0 +1,39 @@
+from flask import Blueprint
+
+from app.common.token import token_required
+from app.controllers.play import PlayController
+
+
+class PlayHandler:
+    def __init__(self, controller: PlayController) -> None:
+        self.__blueprint = Blueprint("play", __name__)
+        self.__blueprint.add_url_rule(
+            "/<int:song_id>",
+            "record",
+            token_required(controller.record),
+            methods=["POST"],
+        )
+        self.__blueprint.add_url_rule(
+            "/listeners/<int:song_id>",
+            "get_unique_listeners",
+            token_required(controller.get_unique_listeners),
+            methods=["GET"],
+        )
+        self.__blueprint.add_url_rule(
+            "/history",
+            "get_history",
+            token_required(controller.get_history),
+            methods=["GET"],
+        )
+        self.__blueprint.add_url_rule(
+            "/top",
+            "get_top_songs",
+            token_required(controller.get_top_songs),
+            methods=["GET"],
+        )
+        self.__blueprint.cli.command("prune-history")(controller.prune_history)
+        self.__blueprint.cli.command("flush")(controller.flush)
+
+    @property
+    def blueprint(self) -> Blueprint:
+        return self.__blueprint
@@ -10,6 +10,12 @@ class PlaylistHandler:
         self.__blueprint.add_url_rule(
             "/create", "create", token_required(controller.create), methods=["POST"]
         )
+        self.__blueprint.add_url_rule(
+            "/copy/<int:playlist_id>",
+            "copy",
+            token_required(controller.copy),
+            methods=["POST"],
+        )
         self.__blueprint.add_url_rule(
             "/update/<int:playlist_id>",
             "update",
@@ -43,6 +49,30 @@ class PlaylistHandler:
             token_required(controller.remove_song),
             methods=["POST"],
         )
+        self.__blueprint.add_url_rule(
+            "/add-songs/<int:playlist_id>",
+            "add_songs",
+            token_required(controller.add_songs),
+            methods=["POST"],
+        )
+        self.__blueprint.add_url_rule(
+            "/remove-songs/<int:playlist_id>",
+            "remove_songs",
+            token_required(controller.remove_songs),
+            methods=["POST"],
+        )
+        self.__blueprint.add_url_rule(
+            "/move-song/<int:playlist_id>/<int:song_id>",
+            "move_song",
+            token_required(controller.move_song),
+            methods=["POST"],
+        )
+        self.__blueprint.add_url_rule(
+            "/get-many",
+            "get_many",
+            token_required(controller.get_many),
+            methods=["GET"],
+        )
 
     @property
     def blueprint(self):
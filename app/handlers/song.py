@@ -34,6 +34,20 @@ class SongHandler:
             token_required(controller.get_by_id),
             methods=["GET"],
         )
+        self.__blueprint.add_url_rule(
+            "/get-many",
+            "get_many",
+            token_required(controller.get_many),
+            methods=["GET"],
+        )
+        self.__blueprint.add_url_rule(
+            "/similar/<int:song_id>",
+            "get_similar",
+            token_required(controller.get_similar),
+            methods=["GET"],
+        )
+        self.__blueprint.cli.command("rebuild-similar")(controller.rebuild_similar)
+        self.__blueprint.cli.command("export")(controller.export)
 
     @property
     def blueprint(self) -> Blueprint:
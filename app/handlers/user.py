@@ -34,6 +34,26 @@ class UserHandler:
             token_required(controller.get_songs),
             methods=["GET"],
         )
+        self.__blueprint.add_url_rule(
+            "/get-many",
+            "get_many",
+            token_required(controller.get_many),
+            methods=["GET"],
+        )
+        self.__blueprint.add_url_rule(
+            "/suggestions",
+            "get_suggestions",
+            token_required(controller.get_suggestions),
+            methods=["GET"],
+        )
+        self.__blueprint.cli.command("snapshot-follow-graph")(
+            controller.snapshot_follow_graph
+        )
+        self.__blueprint.cli.command("export-followers")(controller.export_followers)
+        self.__blueprint.cli.command("export-followed-users")(
+            controller.export_followed_users
+        )
+        self.__blueprint.cli.command("export-songs")(controller.export_songs)
 
     @property
     def blueprint(self) -> Blueprint:
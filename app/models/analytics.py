@@ -0,0 +1,133 @@
+from datetime import date, datetime
+from sqlalchemy import and_, exists, func, literal, select
+from typing import Dict, List, Optional, Sequence
+
+from app import db
+from app.common.fields import serialize_row
+
+# What a daily_activity row records having seen on its day
+ACTIVITY_LOGIN = "login"
+ACTIVITY_PLAYLIST = "playlist"
+
+daily_activity = db.Table(
+    "daily_activity",
+    db.Column("kind", db.String(16), primary_key=True),
+    db.Column("day", db.Date, primary_key=True),
+    db.Column("subject_id", db.Integer, primary_key=True, autoincrement=False),
+    db.Index("ix_daily_activity_kind_subject_id_day", "kind", "subject_id", "day"),
+)
+
+
+def to_date(value) -> date:
+    """
+    date() of a timestamp comes back as a string on SQLite
+    """
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+class DailyRollup(db.Model):
+    __tablename__ = "daily_rollups"
+    FIELDS = (
+        "day",
+        "signups",
+        "active_users",
+        "uploads",
+        "playlists_created",
+        "active_playlists",
+    )
+    COUNTERS = FIELDS[1:]
+
+    day = db.Column(db.Date, primary_key=True)
+    signups = db.Column(db.Integer, nullable=False, default=0)
+    active_users = db.Column(db.Integer, nullable=False, default=0)
+    uploads = db.Column(db.Integer, nullable=False, default=0)
+    playlists_created = db.Column(db.Integer, nullable=False, default=0)
+    active_playlists = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def row_to_dict(cls, row, fields: Optional[Sequence[str]] = None) -> dict:
+        return serialize_row(row, fields or cls.FIELDS)
+
+    @classmethod
+    def get_range(cls, start: date, end: date) -> List["DailyRollup"]:
+        return (
+            cls.query.filter(cls.day >= start, cls.day <= end).order_by(cls.day).all()
+        )
+
+    @classmethod
+    def count_created(cls, column, start: datetime, end: datetime) -> Dict[date, int]:
+        """
+        Rows per day of column in (start, end], one GROUP BY
+        """
+        day = func.date(column)
+        statement = (
+            select(day.label("day"), func.count())
+            .where(column > start, column <= end)
+            .group_by(day)
+        )
+        return {to_date(day): count for day, count in db.session.execute(statement)}
+
+    @classmethod
+    def record_activity(
+        cls, kind: str, id_column, column, start: datetime, end: datetime
+    ) -> None:
+        """
+        Remember every (day, subject) whose column falls in (start, end].
+        Columns like last_login only hold the latest value, so the days they
+        pass through are kept here to be counted distinctly.
+        """
+        day = func.date(column)
+        seen = exists().where(
+            and_(
+                daily_activity.c.kind == kind,
+                daily_activity.c.day == day,
+                daily_activity.c.subject_id == id_column,
+            )
+        )
+        statement = daily_activity.insert().from_select(
+            ["kind", "day", "subject_id"],
+            select(literal(kind), day, id_column).where(
+                column > start, column <= end, ~seen
+            ),
+        )
+        db.session.execute(statement)
+
+    @classmethod
+    def count_activity(cls, kind: str, start: date, end: date) -> Dict[date, int]:
+        """
+        Distinct subjects seen per day between start and end, inclusive
+        """
+        statement = (
+            select(daily_activity.c.day, func.count())
+            .where(
+                daily_activity.c.kind == kind,
+                daily_activity.c.day >= start,
+                daily_activity.c.day <= end,
+            )
+            .group_by(daily_activity.c.day)
+        )
+        return {to_date(day): count for day, count in db.session.execute(statement)}
+
+
+class CohortReport(db.Model):
+    __tablename__ = "cohort_reports"
+
+    start = db.Column(db.Date, primary_key=True)
+    end = db.Column(db.Date, primary_key=True)
+    report = db.Column(db.JSON, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def get(cls, start: date, end: date) -> Optional["CohortReport"]:
+        return cls.query.get((start, end))
+
+
+class RollupWatermark(db.Model):
+    __tablename__ = "rollup_watermarks"
+
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.DateTime, nullable=False)
+
+    @classmethod
+    def get(cls, name: str) -> Optional["RollupWatermark"]:
+        return cls.query.get(name)
@@ -0,0 +1,52 @@
+from datetime import datetime
+from sqlalchemy import insert
+
+from app import db
+
+SONG_CREATED = "song_created"
+SONG_UPDATED = "song_updated"
+SONG_DELETED = "song_deleted"
+FOLLOWED = "followed"
+UNFOLLOWED = "unfollowed"
+PLAYLIST_CREATED = "playlist_created"
+PLAYLIST_UPDATED = "playlist_updated"
+PLAYLIST_DELETED = "playlist_deleted"
+PLAYLIST_SONG_ADDED = "playlist_song_added"
+PLAYLIST_SONG_MOVED = "playlist_song_moved"
+PLAYLIST_SONG_REMOVED = "playlist_song_removed"
+
+
+def add_event(session, type_: str, **payload) -> None:
+    """
+    Write an event in the session's transaction, so it commits or rolls back
+    together with the change it describes
+    """
+    session.execute(insert(OutboxEvent).values(type=type_, payload=payload))
+
+
+class OutboxEvent(db.Model):
+    __tablename__ = "outbox"
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    type = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "payload": self.payload,
+            "created_at": self.created_at.isoformat(),
+        }
+
+
+class OutboxWatermark(db.Model):
+    __tablename__ = "outbox_watermarks"
+
+    sink = db.Column(db.String(64), primary_key=True)
+    last_id = db.Column(db.BigInteger, nullable=False)
+
+    @classmethod
+    def get(cls, sink: str) -> "OutboxWatermark":
+        return cls.query.get(sink)
@@ -0,0 +1,79 @@
+import re
+from threading import Lock
+from typing import Optional
+from datetime import datetime, timedelta
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, Table
+
+from app import db
+
+# What a play_sketches row summarizes: the unique listeners of the song
+# subject_id, or the most played songs overall under subject_id 0
+SKETCH_LISTENERS = "listeners"
+SKETCH_TOP_SONGS = "top_songs"
+SKETCH_BUCKET = timedelta(hours=1)
+
+
+def bucket_of(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+# Listening history lives in one play_history_<yyyymm> table per month. They
+# are created on first write, so they are kept out of db.metadata; on
+# Postgres they are declarative partitions of play_history.
+HISTORY_TABLE = "play_history"
+HISTORY_PARTITION = re.compile(rf"^{HISTORY_TABLE}_(\d{{4}})(\d{{2}})$")
+_history_metadata = MetaData()
+_history_lock = Lock()
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def next_month(month: datetime) -> datetime:
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """
+    Month held by a history partition, None for any other table
+    """
+    match = HISTORY_PARTITION.match(name)
+    if match is None:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def history_partition(month: datetime) -> Table:
+    return history_table(f"{HISTORY_TABLE}_{month:%Y%m}")
+
+
+def history_table(name: str = HISTORY_TABLE) -> Table:
+    """
+    (user_id, song_id, ts) table of a month, or of the Postgres parent
+    """
+    with _history_lock:
+        if name in _history_metadata.tables:
+            return _history_metadata.tables[name]
+
+        return Table(
+            name,
+            _history_metadata,
+            Column("user_id", Integer, nullable=False),
+            Column("song_id", Integer, nullable=False),
+            Column("ts", DateTime, nullable=False),
+            Index(f"ix_{name}_user_id_ts", "user_id", "ts"),
+        )
+
+
+class PlaySketch(db.Model):
+    __tablename__ = "play_sketches"
+    __table_args__ = (db.Index("ix_play_sketches_bucket", "bucket"),)
+
+    kind = db.Column(db.String(16), primary_key=True)
+    subject_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
@@ -1,18 +1,32 @@
 from datetime import datetime
-from typing import List, Optional
+from sqlalchemy import bindparam, func, literal, select, update
+from typing import List, Optional, Sequence, Set, Tuple
 
 from app import db
+from app.common.fields import serialize_row
 from app.models.song import Song
 
+POSITION_STEP = 1 << 16
+
 playlist_songs = db.Table(
     "playlist_songs",
     db.Column("playlist_id", db.Integer, db.ForeignKey("playlists.id")),
     db.Column("song_id", db.Integer, db.ForeignKey("songs.id")),
+    db.Column("position", db.BigInteger, nullable=False),
+    db.Index("ix_playlist_songs_playlist_id_position", "playlist_id", "position"),
 )
 
 
 class Playlist(db.Model):
     __tablename__ = "playlists"
+    FIELDS = (
+        "id",
+        "title",
+        "user_id",
+        "created_at",
+        "updated_at",
+        "version",
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -21,21 +35,25 @@ class Playlist(db.Model):
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
     songs = db.relationship(
         "Song",
         secondary="playlist_songs",
+        order_by=playlist_songs.c.position,
         lazy="dynamic",
         backref=db.backref("playlists", lazy="dynamic"),
     )
 
-    def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "title": self.title,
-            "user_id": self.user_id,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-        }
+    @classmethod
+    def columns(cls, fields: Optional[Sequence[str]] = None) -> list:
+        return [getattr(cls, field) for field in fields or cls.FIELDS]
+
+    @classmethod
+    def row_to_dict(cls, row, fields: Optional[Sequence[str]] = None) -> dict:
+        return serialize_row(row, fields or cls.FIELDS)
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> dict:
+        return self.row_to_dict(self, fields)
 
     @classmethod
     def paginate(cls, take: int = 10, skip: int = 0) -> List["Playlist"]:
@@ -48,15 +66,279 @@ class Playlist(db.Model):
     def get_by_id(cls, playlist_id: int) -> Optional["Playlist"]:
         return cls.query.filter_by(id=playlist_id).first()
 
+    @classmethod
+    def get_for_update(cls, playlist_id: int) -> Optional["Playlist"]:
+        """
+        The playlist with its row locked until the transaction ends, on
+        databases that lock rows; SQLite runs one writer at a time anyway
+        """
+        return (
+            cls.query.filter_by(id=playlist_id)
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
+
+    @classmethod
+    def has_version(cls, playlist_id: int, version: int) -> bool:
+        row = cls.query.with_entities(cls.id).filter_by(id=playlist_id, version=version)
+        return row.first() is not None
+
+    @classmethod
+    def get_revision(cls, playlist_id: int) -> Optional[tuple]:
+        """
+        (id, updated_at, latest song update, song count) of a playlist
+        """
+        return (
+            cls.query.with_entities(
+                cls.id, cls.updated_at, func.max(Song.updated_at), func.count(Song.id)
+            )
+            .outerjoin(playlist_songs, playlist_songs.c.playlist_id == cls.id)
+            .outerjoin(Song, Song.id == playlist_songs.c.song_id)
+            .filter(cls.id == playlist_id)
+            .group_by(cls.id, cls.updated_at)
+            .first()
+        )
+
+    @classmethod
+    def get_table_revision(cls) -> Tuple[Optional[datetime], int]:
+        return cls.query.with_entities(
+            func.max(cls.updated_at), func.count(cls.id)
+        ).one()
+
+    @classmethod
+    def compare_and_swap(cls, playlist_id: int, version: int, values: dict) -> bool:
+        """
+        Write values only while the row is still at version, bumping it.
+        Returns False when another write got there first.
+        """
+        statement = (
+            update(cls)
+            .where(cls.id == playlist_id, cls.version == version)
+            .values(**values, version=cls.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return db.session.execute(statement).rowcount == 1
+
     @classmethod
     def from_dict(cls, data: dict) -> "Playlist":
         return cls(**data)
 
-    def add_song(self, song: Song):
-        self.songs.append(song)
+    def add_song(self, song: Song, index: Optional[int] = None) -> bool:
+        """
+        Insert a song at index (appended when None). Returns True when the
+        gaps around the new position are used up and the playlist should be
+        rebalanced.
+        """
+        if self.id is None or song.id is None:
+            db.session.flush()
+
+        position, crowded = self._position_for(index)
+        db.session.execute(
+            playlist_songs.insert().values(
+                playlist_id=self.id, song_id=song.id, position=position
+            )
+        )
+        self._touch()
+        return crowded
+
+    def move_song(self, song_id: int, index: int) -> bool:
+        """
+        Move a song to index by rewriting its position only. Returns True
+        when the playlist should be rebalanced.
+        """
+        position, crowded = self._position_for(index, song_id)
+        db.session.execute(
+            playlist_songs.update()
+            .where(
+                playlist_songs.c.playlist_id == self.id,
+                playlist_songs.c.song_id == song_id,
+            )
+            .values(position=position)
+        )
+        self._touch()
+        return crowded
 
     def remove_song(self, song: Song):
-        self.songs.remove(song)
+        db.session.execute(
+            playlist_songs.delete().where(
+                playlist_songs.c.playlist_id == self.id,
+                playlist_songs.c.song_id == song.id,
+            )
+        )
+        self._touch()
+
+    def add_songs(self, song_ids: Sequence[int]) -> List[int]:
+        """
+        Append every song not already in the playlist with one multi-row
+        insert. Returns the ids that were inserted, in the given order.
+        """
+        present = self.get_present_song_ids(song_ids)
+        new_ids = [id_ for id_ in dict.fromkeys(song_ids) if id_ not in present]
+        if not new_ids:
+            return []
+
+        last, _ = self._neighbour_positions(None, None)
+        db.session.execute(
+            playlist_songs.insert().values(
+                [
+                    {
+                        "playlist_id": self.id,
+                        "song_id": song_id,
+                        "position": last + POSITION_STEP * (i + 1),
+                    }
+                    for i, song_id in enumerate(new_ids)
+                ]
+            )
+        )
+        self._touch()
+        return new_ids
+
+    def remove_songs(self, song_ids: Sequence[int]) -> List[int]:
+        """
+        Remove every listed song in one delete. Returns the ids that were in
+        the playlist, in the given order.
+        """
+        present = self.get_present_song_ids(song_ids)
+        removed = [id_ for id_ in dict.fromkeys(song_ids) if id_ in present]
+        if not removed:
+            return []
+
+        db.session.execute(
+            playlist_songs.delete().where(
+                playlist_songs.c.playlist_id == self.id,
+                playlist_songs.c.song_id.in_(removed),
+            )
+        )
+        self._touch()
+        return removed
+
+    def get_present_song_ids(self, song_ids: Sequence[int]) -> Set[int]:
+        if not song_ids:
+            return set()
+
+        statement = select(playlist_songs.c.song_id).where(
+            playlist_songs.c.playlist_id == self.id,
+            playlist_songs.c.song_id.in_(song_ids),
+        )
+        return set(db.session.execute(statement).scalars())
+
+    def copy_songs_from(self, source_id: int) -> None:
+        """
+        Copy every song of another playlist, positions included, with a
+        single INSERT ... SELECT
+        """
+        if self.id is None:
+            db.session.flush()
+
+        rows = select(
+            literal(self.id), playlist_songs.c.song_id, playlist_songs.c.position
+        ).where(playlist_songs.c.playlist_id == source_id)
+        db.session.execute(
+            playlist_songs.insert().from_select(
+                ["playlist_id", "song_id", "position"], rows
+            )
+        )
+
+    def has_song(self, song_id: int) -> bool:
+        statement = select(playlist_songs.c.song_id).where(
+            playlist_songs.c.playlist_id == self.id,
+            playlist_songs.c.song_id == song_id,
+        )
+        return db.session.execute(statement.limit(1)).first() is not None
+
+    def rebalance(self) -> None:
+        """
+        Spread positions POSITION_STEP apart again, keeping the current order
+        """
+        # The order is read up front; ranking rows from inside the UPDATE
+        # would see rows it already rewrote on SQLite
+        song_ids = (
+            db.session.execute(
+                select(playlist_songs.c.song_id)
+                .where(playlist_songs.c.playlist_id == self.id)
+                .order_by(playlist_songs.c.position, playlist_songs.c.song_id)
+            )
+            .scalars()
+            .all()
+        )
+        if not song_ids:
+            return
+
+        db.session.execute(
+            playlist_songs.update()
+            .where(
+                playlist_songs.c.playlist_id == self.id,
+                playlist_songs.c.song_id == bindparam("rebalanced_song_id"),
+            )
+            .values(position=bindparam("rebalanced_position")),
+            [
+                {
+                    "rebalanced_song_id": song_id,
+                    "rebalanced_position": (index + 1) * POSITION_STEP,
+                }
+                for index, song_id in enumerate(song_ids)
+            ],
+        )
+
+    def _position_for(
+        self, index: Optional[int], moving_song_id: Optional[int] = None
+    ) -> Tuple[int, bool]:
+        """
+        Position between the songs currently at index - 1 and index, ignoring
+        moving_song_id. Rebalances first when the two are adjacent.
+        """
+        before, after = self._neighbour_positions(index, moving_song_id)
+        if after is not None and after - before < 2:
+            self.rebalance()
+            before, after = self._neighbour_positions(index, moving_song_id)
+
+        if after is None:
+            return before + POSITION_STEP, False
+
+        position = (before + after) // 2
+        return position, min(position - before, after - position) < 2
+
+    def _neighbour_positions(
+        self, index: Optional[int], moving_song_id: Optional[int]
+    ) -> Tuple[int, Optional[int]]:
+        positions = select(playlist_songs.c.position).where(
+            playlist_songs.c.playlist_id == self.id
+        )
+        if moving_song_id is not None:
+            positions = positions.where(playlist_songs.c.song_id != moving_song_id)
+
+        if index is None:
+            last = db.session.execute(
+                select(func.max(positions.subquery().c.position))
+            ).scalar()
+            return last or 0, None
+
+        if index <= 0:
+            first = db.session.execute(
+                positions.order_by(playlist_songs.c.position).limit(1)
+            ).scalar()
+            return 0, first
+
+        neighbours = (
+            db.session.execute(
+                positions.order_by(playlist_songs.c.position).offset(index - 1).limit(2)
+            )
+            .scalars()
+            .all()
+        )
+        if not neighbours:
+            return self._neighbour_positions(None, moving_song_id)
+
+        return neighbours[0], neighbours[1] if len(neighbours) > 1 else None
+
+    def _touch(self) -> None:
+        """
+        Mark a membership change so conditional writes holding the old
+        version fail
+        """
+        self.updated_at = datetime.utcnow()
+        self.version = Playlist.version + 1
 
     def get_songs(self, take: int = 10, skip: int = 0) -> List["Song"]:
         return self.songs.offset(skip).limit(take).all()
@@ -1,11 +1,33 @@
 from datetime import datetime
-from typing import List, Optional
+from sqlalchemy import func, update
+from typing import List, Optional, Sequence, Set, Tuple
 
 from app import db
+from app.common.fields import serialize_row
+
+song_similar = db.Table(
+    "song_similar",
+    db.Column("song_id", db.Integer, db.ForeignKey("songs.id"), primary_key=True),
+    db.Column("rank", db.Integer, primary_key=True, autoincrement=False),
+    db.Column("similar_song_id", db.Integer, db.ForeignKey("songs.id")),
+    db.Column("score", db.Float, nullable=False),
+)
 
 
 class Song(db.Model):
     __tablename__ = "songs"
+    FIELDS = (
+        "id",
+        "title",
+        "song_url",
+        "small_thumbnail_url",
+        "large_thumbnail_url",
+        "created_at",
+        "updated_at",
+        "version",
+        "user_id",
+    )
+    INCLUDES = ("user",)
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -16,19 +38,23 @@ class Song(db.Model):
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    # The job that created the song, so a rerun of that job creates no other
+    job_id = db.Column(
+        db.BigInteger().with_variant(db.Integer, "sqlite"), nullable=True, unique=True
+    )
 
-    def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "title": self.title,
-            "song_url": self.song_url,
-            "small_thumbnail_url": self.small_thumbnail_url,
-            "large_thumbnail_url": self.large_thumbnail_url,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-            "user_id": self.user_id,
-        }
+    @classmethod
+    def columns(cls, fields: Optional[Sequence[str]] = None) -> list:
+        return [getattr(cls, field) for field in fields or cls.FIELDS]
+
+    @classmethod
+    def row_to_dict(cls, row, fields: Optional[Sequence[str]] = None) -> dict:
+        return serialize_row(row, fields or cls.FIELDS)
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> dict:
+        return self.row_to_dict(self, fields)
 
     @classmethod
     def paginate(cls, take: int = 10, skip: int = 0) -> List["Song"]:
@@ -41,6 +67,46 @@ class Song(db.Model):
     def get_by_id(cls, song_id: int) -> Optional["Song"]:
         return cls.query.filter_by(id=song_id).first()
 
+    @classmethod
+    def get_by_job_id(cls, job_id: int) -> Optional["Song"]:
+        return cls.query.filter_by(job_id=job_id).first()
+
+    @classmethod
+    def get_existing_ids(cls, song_ids: Sequence[int]) -> Set[int]:
+        if not song_ids:
+            return set()
+
+        rows = cls.query.with_entities(cls.id).filter(cls.id.in_(song_ids))
+        return {row.id for row in rows}
+
+    @classmethod
+    def get_revision(cls, song_id: int) -> Optional[Tuple[int, datetime]]:
+        return (
+            cls.query.with_entities(cls.id, cls.updated_at)
+            .filter_by(id=song_id)
+            .first()
+        )
+
+    @classmethod
+    def get_table_revision(cls) -> Tuple[Optional[datetime], int]:
+        return cls.query.with_entities(
+            func.max(cls.updated_at), func.count(cls.id)
+        ).one()
+
+    @classmethod
+    def compare_and_swap(cls, song_id: int, version: int, values: dict) -> bool:
+        """
+        Write values only while the row is still at version, bumping it.
+        Returns False when another write got there first.
+        """
+        statement = (
+            update(cls)
+            .where(cls.id == song_id, cls.version == version)
+            .values(**values, version=cls.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return db.session.execute(statement).rowcount == 1
+
     @classmethod
     def from_dict(cls, data: dict) -> "Song":
         return cls(**data)
@@ -1,21 +1,36 @@
 import jwt
-from typing import List
+from sqlalchemy import func
+from typing import Dict, List, Optional, Sequence, Tuple
 from flask import current_app
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from app import db
+from app.common.fields import serialize_row
 from app.models.song import Song
 
 followers = db.Table(
     "followers",
     db.Column("follower_id", db.Integer, db.ForeignKey("users.id")),
     db.Column("followed_id", db.Integer, db.ForeignKey("users.id")),
+    db.Index("ix_followers_follower_id_followed_id", "follower_id", "followed_id"),
 )
 
 
 class User(db.Model):
     __tablename__ = "users"
+    FIELDS = (
+        "id",
+        "username",
+        "email",
+        "fullname",
+        "bio",
+        "created_at",
+        "updated_at",
+        "avatar",
+        "last_login",
+    )
+    SUMMARY_FIELDS = ("id", "username", "avatar")
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(255), unique=True, nullable=False)
@@ -49,20 +64,32 @@ class User(db.Model):
     def __repr__(self) -> str:
         return f"User('{self.username}', '{self.email}')"
 
-    def to_dict(self) -> dict:
-        return {
-            "id": self.id,
-            "username": self.username,
-            "email": self.email,
-            "fullname": self.fullname,
-            "bio": self.bio,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-            "avatar": self.avatar,
-            "last_login": None
-            if self.last_login is None
-            else self.last_login.isoformat(),
-        }
+    @classmethod
+    def columns(cls, fields: Optional[Sequence[str]] = None) -> list:
+        return [getattr(cls, field) for field in fields or cls.FIELDS]
+
+    @classmethod
+    def row_to_dict(cls, row, fields: Optional[Sequence[str]] = None) -> dict:
+        return serialize_row(row, fields or cls.FIELDS)
+
+    def to_dict(self, fields: Optional[Sequence[str]] = None) -> dict:
+        return self.row_to_dict(self, fields)
+
+    @classmethod
+    def get_summaries(cls, user_ids: Sequence[int]) -> Dict[int, dict]:
+        if not user_ids:
+            return {}
+
+        rows = cls.query.with_entities(*cls.columns(cls.SUMMARY_FIELDS)).filter(
+            cls.id.in_(user_ids)
+        )
+        return {row.id: cls.row_to_dict(row, cls.SUMMARY_FIELDS) for row in rows}
+
+    @classmethod
+    def get_table_revision(cls) -> Tuple[Optional[datetime], int]:
+        return cls.query.with_entities(
+            func.max(cls.updated_at), func.count(cls.id)
+        ).one()
 
     @classmethod
     def from_dict(cls, data: dict) -> "User":
@@ -86,13 +113,19 @@ class User(db.Model):
     def is_following(self, user: "User") -> bool:
         return self.followed.filter(followers.c.followed_id == user.id).count() > 0
 
-    def follow(self, user: "User") -> None:
+    def follow(self, user: "User") -> bool:
+        if self.is_following(user):
+            return False
+
+        self.followed.append(user)
+        return True
+
+    def unfollow(self, user: "User") -> bool:
         if not self.is_following(user):
-            self.followed.append(user)
+            return False
 
-    def unfollow(self, user: "User") -> None:
-        if self.is_following(user):
-            self.followed.remove(user)
+        self.followed.remove(user)
+        return True
 
     def get_followers(self, take: int = 10, skip: int = 0) -> List["User"]:
         return self.followers.limit(take).offset(skip).all()
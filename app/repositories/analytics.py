@@ -0,0 +1,136 @@
+from datetime import date, datetime
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import select
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.models.song import Song
+from app.models.user import User
+from app.models.playlist import Playlist
+from app.models.analytics import (
+    ACTIVITY_LOGIN,
+    ACTIVITY_PLAYLIST,
+    CohortReport,
+    DailyRollup,
+    RollupWatermark,
+    daily_activity,
+)
+
+
+class AnalyticsRepository:
+    def __init__(self, db: SQLAlchemy) -> None:
+        self.db = db
+
+    def get_watermark(self, name: str) -> Optional[datetime]:
+        watermark = RollupWatermark.get(name)
+        return None if watermark is None else watermark.value
+
+    def get_daily_rows(self, start: date, end: date) -> Dict[date, dict]:
+        return {
+            rollup.day: DailyRollup.row_to_dict(rollup)
+            for rollup in DailyRollup.get_range(start, end)
+        }
+
+    def iter_signup_chunks(
+        self, start: datetime, end: datetime, chunk_size: int
+    ) -> Iterator[List[Tuple[int, datetime, Optional[datetime]]]]:
+        """
+        (id, created_at, last_login) of users who signed up in [start, end),
+        ordered by id and read through a server-side cursor chunk_size at a time
+        """
+        statement = (
+            select(User.id, User.created_at, User.last_login)
+            .where(User.created_at >= start, User.created_at < end)
+            .order_by(User.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for rows in self.db.session.execute(statement).partitions(chunk_size):
+            yield rows
+
+    def get_login_days(
+        self, first_id: int, last_id: int, start: date, end: date
+    ) -> List[Tuple[int, date]]:
+        """
+        (user_id, day) of every login recorded by the daily rollup for users
+        first_id..last_id between start and end
+        """
+        statement = select(daily_activity.c.subject_id, daily_activity.c.day).where(
+            daily_activity.c.kind == ACTIVITY_LOGIN,
+            daily_activity.c.subject_id.between(first_id, last_id),
+            daily_activity.c.day.between(start, end),
+        )
+        return self.db.session.execute(statement).all()
+
+    def get_cohort_report(self, start: date, end: date) -> Optional[dict]:
+        report = CohortReport.get(start, end)
+        if report is None:
+            return None
+
+        return {**report.report, "computed_at": report.computed_at.isoformat()}
+
+    def save_cohort_report(self, start: date, end: date, report: dict) -> None:
+        cached = CohortReport.get(start, end)
+        if cached is None:
+            self.db.session.add(CohortReport(start=start, end=end, report=report))
+        else:
+            cached.report = report
+            cached.computed_at = datetime.utcnow()
+        self.db.session.commit()
+
+    def rollup(self, name: str, start: datetime, end: datetime) -> List[date]:
+        """
+        Fold the rows created or touched in (start, end] into the daily
+        rollups and move the watermark to end, in one transaction.
+        Returns the days that changed.
+        """
+        created = {
+            "signups": DailyRollup.count_created(User.created_at, start, end),
+            "uploads": DailyRollup.count_created(Song.created_at, start, end),
+            "playlists_created": DailyRollup.count_created(
+                Playlist.created_at, start, end
+            ),
+        }
+
+        DailyRollup.record_activity(
+            ACTIVITY_LOGIN, User.id, User.last_login, start, end
+        )
+        DailyRollup.record_activity(
+            ACTIVITY_PLAYLIST, Playlist.id, Playlist.updated_at, start, end
+        )
+        # Distinct counts can't be added up, they are recounted for the days
+        # the window spans
+        active = {
+            "active_users": DailyRollup.count_activity(
+                ACTIVITY_LOGIN, start.date(), end.date()
+            ),
+            "active_playlists": DailyRollup.count_activity(
+                ACTIVITY_PLAYLIST, start.date(), end.date()
+            ),
+        }
+
+        days = sorted(set().union(*created.values(), *active.values()))
+        rollups = {
+            rollup.day: rollup
+            for rollup in DailyRollup.query.filter(DailyRollup.day.in_(days))
+        }
+        for day in days:
+            rollup = rollups.get(day)
+            if rollup is None:
+                rollup = DailyRollup(
+                    day=day, **{counter: 0 for counter in DailyRollup.COUNTERS}
+                )
+                self.db.session.add(rollup)
+
+            for counter, counts in created.items():
+                setattr(rollup, counter, getattr(rollup, counter) + counts.get(day, 0))
+            for counter, counts in active.items():
+                if day in counts:
+                    setattr(rollup, counter, counts[day])
+
+        watermark = RollupWatermark.get(name)
+        if watermark is None:
+            self.db.session.add(RollupWatermark(name=name, value=end))
+        else:
+            watermark.value = end
+
+        self.db.session.commit()
+        return days
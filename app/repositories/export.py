@@ -0,0 +1,87 @@
+from datetime import datetime
+from sqlalchemy import and_, or_, select
+from flask_sqlalchemy import SQLAlchemy
+from typing import Iterator, List, Optional, Tuple
+
+from app.models.song import Song
+from app.models.user import User, followers
+from app.models.playlist import Playlist, playlist_songs
+
+# Tables tracked by (updated_at, id); playlist_songs has no timestamp of its
+# own and follows the updated_at its playlist gets on every membership change
+CHANGE_TRACKED = {"users": User, "songs": Song, "playlists": Playlist}
+EXPORT_TABLES = ("users", "songs", "playlists", "playlist_songs", "followers")
+
+
+class ExportRepository:
+    def __init__(self, db: SQLAlchemy) -> None:
+        self.db = db
+
+    def is_incremental(self, table: str) -> bool:
+        return table != "followers"
+
+    def columns(self, table: str) -> List[Tuple[str, object]]:
+        """
+        (name, type) of the columns exported for table, in row order
+        """
+        statement = self._select(table, None, datetime.max)
+        return [(column.key, column.type) for column in statement.selected_columns]
+
+    def iter_batches(
+        self,
+        table: str,
+        watermark: Optional[Tuple[datetime, int]],
+        until: datetime,
+        batch_size: int,
+    ) -> Iterator[list]:
+        """
+        Rows of table changed after watermark up to until, ordered by
+        (updated_at, id) and read through a server-side cursor batch_size at
+        a time. The last two columns of every row are its updated_at and id.
+        """
+        statement = self._select(table, watermark, until).execution_options(
+            yield_per=batch_size
+        )
+        for rows in self.db.session.execute(statement).partitions(batch_size):
+            yield rows
+
+    def _select(
+        self, table: str, watermark: Optional[Tuple[datetime, int]], until: datetime
+    ):
+        if table == "followers":
+            return select(followers.c.follower_id, followers.c.followed_id)
+
+        if table == "playlist_songs":
+            updated_at, id_ = Playlist.updated_at, Playlist.id
+            statement = (
+                select(
+                    playlist_songs.c.song_id,
+                    playlist_songs.c.position,
+                    updated_at.label("playlist_updated_at"),
+                    playlist_songs.c.playlist_id,
+                )
+                .join(Playlist, Playlist.id == playlist_songs.c.playlist_id)
+                .order_by(updated_at, id_, playlist_songs.c.position)
+            )
+        else:
+            model = CHANGE_TRACKED[table]
+            updated_at, id_ = model.updated_at, model.id
+            fields = [
+                field for field in model.FIELDS if field not in ("updated_at", "id")
+            ]
+            statement = select(*model.columns(fields), updated_at, id_).order_by(
+                updated_at, id_
+            )
+
+        if watermark is None:
+            # Rows from before updated_at existed only come out on a first run
+            return statement.where(or_(updated_at <= until, updated_at.is_(None)))
+
+        last_updated_at, last_id = watermark
+        return statement.where(
+            updated_at <= until,
+            or_(
+                updated_at > last_updated_at,
+                and_(updated_at == last_updated_at, id_ > last_id),
+            ),
+        )
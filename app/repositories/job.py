@@ -0,0 +1,159 @@
+import uuid
+from datetime import datetime, timedelta
+from flask_sqlalchemy import SQLAlchemy
+from typing import Dict, Optional
+from sqlalchemy import JSON, DateTime, Integer, String, bindparam, delete, func
+from sqlalchemy import select, text, update
+
+from app.models.job import JOB_DEAD, JOB_QUEUED, JOB_RUNNING, Job
+
+# Claims the next due job, or one whose visibility timeout ran out, in a
+# single statement. Postgres skips rows other workers are claiming instead of
+# waiting on them; SQLite runs one writer at a time anyway.
+CLAIM = """
+UPDATE jobs
+SET status = :running, lease = :lease, locked_until = :locked_until,
+    attempts = attempts + 1, updated_at = :now
+WHERE id = (
+    SELECT id FROM jobs
+    WHERE ((status = :queued AND run_at <= :now)
+        OR (status = :running AND locked_until <= :now)){job_filter}
+    ORDER BY run_at, id
+    LIMIT 1{lock}
+)
+RETURNING id, type, payload, attempts, max_attempts, lease
+"""
+
+
+class JobRepository:
+    def __init__(self, db: SQLAlchemy) -> None:
+        self.db = db
+
+    def enqueue(
+        self, type_: str, payload: dict, max_attempts: int, run_at: datetime
+    ) -> int:
+        job = Job(type=type_, payload=payload, max_attempts=max_attempts, run_at=run_at)
+        self.db.session.add(job)
+        self.db.session.commit()
+        return job.id
+
+    def claim(
+        self, now: datetime, visibility: timedelta, job_id: Optional[int] = None
+    ) -> Optional[dict]:
+        """
+        Take the next claimable job, or job_id only, under a fresh lease
+        """
+        postgres = self.db.engine.dialect.name == "postgresql"
+        statement = (
+            text(
+                CLAIM.format(
+                    job_filter="" if job_id is None else " AND id = :job_id",
+                    lock=" FOR UPDATE SKIP LOCKED" if postgres else "",
+                )
+            )
+            .bindparams(
+                bindparam("now", type_=DateTime),
+                bindparam("locked_until", type_=DateTime),
+            )
+            .columns(
+                id=Integer,
+                type=String,
+                payload=JSON,
+                attempts=Integer,
+                max_attempts=Integer,
+                lease=String,
+            )
+        )
+        params = {
+            "running": JOB_RUNNING,
+            "queued": JOB_QUEUED,
+            "lease": uuid.uuid4().hex,
+            "locked_until": now + visibility,
+            "now": now,
+        }
+        if job_id is not None:
+            params["job_id"] = job_id
+
+        row = self.db.session.execute(statement, params).first()
+        self.db.session.commit()
+        return None if row is None else dict(row._mapping)
+
+    def complete(self, job_id: int, lease: str) -> bool:
+        result = self.db.session.execute(
+            delete(Job).where(Job.id == job_id, Job.lease == lease)
+        )
+        self.db.session.commit()
+        return result.rowcount == 1
+
+    def fail(
+        self, job_id: int, lease: str, error: str, retry_at: Optional[datetime]
+    ) -> bool:
+        """
+        Queue the job again at retry_at, or dead-letter it when that is None.
+        Nothing happens when the lease was lost to another worker.
+        """
+        # Whatever the failed job left in the session goes first
+        self.db.session.rollback()
+        values = {"lease": None, "locked_until": None, "last_error": error}
+        if retry_at is None:
+            values["status"] = JOB_DEAD
+        else:
+            values.update(status=JOB_QUEUED, run_at=retry_at)
+
+        result = self.db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.lease == lease)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        return result.rowcount == 1
+
+    def extend(self, job_id: int, lease: str, locked_until: datetime) -> bool:
+        """
+        Keep a running job invisible until locked_until, as long as lease
+        still holds it
+        """
+        result = self.db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.lease == lease, Job.status == JOB_RUNNING)
+            .values(locked_until=locked_until)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        return result.rowcount == 1
+
+    def release(self, job_id: int, lease: str, now: datetime) -> bool:
+        """
+        Give an interrupted job back to the queue as due now, without
+        counting the attempt, so another worker resumes it right away
+        instead of after its visibility timeout
+        """
+        result = self.db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.lease == lease)
+            .values(
+                status=JOB_QUEUED,
+                run_at=now,
+                lease=None,
+                locked_until=None,
+                attempts=Job.attempts - 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        return result.rowcount == 1
+
+    def count_by_status(self) -> Dict[str, int]:
+        statement = select(Job.status, func.count()).group_by(Job.status)
+        return dict(self.db.session.execute(statement).all())
+
+    def retry_dead(self, now: datetime) -> int:
+        result = self.db.session.execute(
+            update(Job)
+            .where(Job.status == JOB_DEAD)
+            .values(status=JOB_QUEUED, attempts=0, run_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.session.commit()
+        return result.rowcount
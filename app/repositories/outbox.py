@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import List, Sequence
+from sqlalchemy import delete, func, select
+from flask_sqlalchemy import SQLAlchemy
+
+from app.models.outbox import OutboxEvent, OutboxWatermark
+
+
+class OutboxRepository:
+    def __init__(self, db: SQLAlchemy) -> None:
+        self.db = db
+
+    def get_events(self, after_id: int, until: datetime, limit: int) -> List[dict]:
+        events = (
+            OutboxEvent.query.filter(
+                OutboxEvent.id > after_id, OutboxEvent.created_at <= until
+            )
+            .order_by(OutboxEvent.id)
+            .limit(limit)
+            .all()
+        )
+        return [event.to_dict() for event in events]
+
+    def get_watermark(self, sink: str) -> int:
+        watermark = OutboxWatermark.get(sink)
+        return 0 if watermark is None else watermark.last_id
+
+    def get_min_watermark(self, sinks: Sequence[str]) -> int:
+        if not sinks:
+            return 0
+
+        statement = select(func.count(), func.min(OutboxWatermark.last_id)).where(
+            OutboxWatermark.sink.in_(sinks)
+        )
+        count, lowest = self.db.session.execute(statement).one()
+        # A sink that never ran has been sent nothing yet
+        return lowest if count == len(sinks) else 0
+
+    def save_watermark(self, sink: str, last_id: int) -> None:
+        watermark = OutboxWatermark.get(sink)
+        if watermark is None:
+            self.db.session.add(OutboxWatermark(sink=sink, last_id=last_id))
+        else:
+            watermark.last_id = last_id
+        self.db.session.commit()
+
+    def delete_events(self, up_to_id: int, before: datetime) -> int:
+        result = self.db.session.execute(
+            delete(OutboxEvent).where(
+                OutboxEvent.id <= up_to_id, OutboxEvent.created_at < before
+            )
+        )
+        self.db.session.commit()
+        return result.rowcount
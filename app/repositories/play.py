@@ -0,0 +1,210 @@
+from itertools import groupby
+from datetime import date, datetime, time, timedelta
+from sqlalchemy.exc import IntegrityError
+from flask_sqlalchemy import SQLAlchemy
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.schema import CreateIndex, CreateTable, DropTable
+from sqlalchemy import delete, func, insert, inspect, select, text
+
+from app.models.analytics import to_date
+from app.models.play import (
+    HISTORY_TABLE,
+    PlaySketch,
+    history_partition,
+    history_table,
+    month_start,
+    next_month,
+    partition_month,
+)
+
+# A first flush of a bucket races other workers inserting the same row
+MERGE_ATTEMPTS = 3
+
+
+class PlayRepository:
+    def __init__(self, db: SQLAlchemy) -> None:
+        self.db = db
+        # Months whose partition this process already made sure exists
+        self._partitions = set()
+
+    def get_sketches(self, kind: str, subject_id: int, since: datetime) -> List[bytes]:
+        statement = select(PlaySketch.data).where(
+            PlaySketch.kind == kind,
+            PlaySketch.subject_id == subject_id,
+            PlaySketch.bucket >= since,
+        )
+        return self.db.session.execute(statement).scalars().all()
+
+    def merge_sketches(self, sketches: Dict[Tuple[str, int, datetime], object]) -> None:
+        """
+        Merge in-process sketches keyed by (kind, subject_id, bucket) into the
+        stored ones in one transaction. Rows are locked in key order, so
+        workers flushing at the same time wait on each other instead of
+        overwriting one another's counts.
+        """
+        for attempt in range(MERGE_ATTEMPTS):
+            try:
+                for key in sorted(sketches):
+                    self._merge(key, sketches[key])
+                self.db.session.commit()
+                return
+            except IntegrityError:
+                self.db.session.rollback()
+                if attempt == MERGE_ATTEMPTS - 1:
+                    raise
+
+    def _merge(self, key: Tuple[str, int, datetime], sketch) -> None:
+        row = self.db.session.get(PlaySketch, key, with_for_update=True)
+        if row is None:
+            kind, subject_id, bucket = key
+            self.db.session.add(
+                PlaySketch(
+                    kind=kind,
+                    subject_id=subject_id,
+                    bucket=bucket,
+                    data=sketch.to_bytes(),
+                )
+            )
+            self.db.session.flush()
+            return
+
+        # Merged into a copy, the in-process sketch is reused on a retry
+        stored = type(sketch).from_bytes(row.data)
+        row.data = stored.merge(sketch).to_bytes()
+
+    def delete_sketches_before(self, cutoff: datetime) -> int:
+        result = self.db.session.execute(
+            delete(PlaySketch).where(PlaySketch.bucket < cutoff)
+        )
+        self.db.session.commit()
+        return result.rowcount
+
+    def _is_postgres(self) -> bool:
+        return self.db.engine.dialect.name == "postgresql"
+
+    def _ensure_partition(self, month: datetime) -> None:
+        if month in self._partitions:
+            return
+
+        table = history_partition(month)
+        if self._is_postgres():
+            self.db.session.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {table.name} "
+                    f"PARTITION OF {HISTORY_TABLE} "
+                    f"FOR VALUES FROM ('{month:%Y-%m-%d}') "
+                    f"TO ('{next_month(month):%Y-%m-%d}')"
+                )
+            )
+        else:
+            self.db.session.execute(CreateTable(table, if_not_exists=True))
+            for index in table.indexes:
+                self.db.session.execute(CreateIndex(index, if_not_exists=True))
+        self.db.session.commit()
+        self._partitions.add(month)
+
+    def append_history(self, plays: Sequence[Tuple[int, int, datetime]]) -> None:
+        """
+        Append (user_id, song_id, ts) plays, one multi-row insert per month
+        partition, creating partitions as months come up
+        """
+        plays = sorted(plays, key=lambda play: play[2])
+        by_month = groupby(plays, key=lambda play: month_start(play[2]))
+        for month, month_plays in by_month:
+            self._ensure_partition(month)
+            self.db.session.execute(
+                insert(history_partition(month)),
+                [
+                    {"user_id": user_id, "song_id": song_id, "ts": ts}
+                    for user_id, song_id, ts in month_plays
+                ],
+            )
+        self.db.session.commit()
+
+    def get_history_partitions(self) -> List[datetime]:
+        names = inspect(self.db.engine).get_table_names()
+        return sorted(month for month in map(partition_month, names) if month)
+
+    def get_history(
+        self, user_id: int, before: Optional[datetime], take: int
+    ) -> List[Tuple[int, datetime]]:
+        """
+        (song_id, ts) of user_id's plays older than before, newest first. On
+        Postgres the parent table prunes partitions itself; elsewhere months
+        are read newest first until take plays are found.
+        """
+        if self._is_postgres():
+            tables = [history_table()]
+        else:
+            months = self.get_history_partitions()
+            tables = [
+                history_partition(month)
+                for month in reversed(months)
+                if before is None or month < before
+            ]
+
+        plays = []
+        for table in tables:
+            statement = (
+                select(table.c.song_id, table.c.ts)
+                .where(table.c.user_id == user_id)
+                .order_by(table.c.ts.desc())
+                .limit(take - len(plays))
+            )
+            if before is not None:
+                statement = statement.where(table.c.ts < before)
+            plays.extend(self.db.session.execute(statement).all())
+            if len(plays) >= take:
+                break
+        return plays
+
+    def get_play_days(
+        self, first_user_id: int, last_user_id: int, start: date, end: date
+    ) -> List[Tuple[int, date]]:
+        """
+        Distinct (user_id, day) of the plays of users first_user_id..last_user_id
+        between start and end, inclusive
+        """
+        since = datetime.combine(start, time.min)
+        until = datetime.combine(end + timedelta(days=1), time.min)
+        if self._is_postgres():
+            tables = [history_table()]
+        else:
+            tables = [
+                history_partition(month)
+                for month in self.get_history_partitions()
+                if since < next_month(month) and month < until
+            ]
+
+        days = set()
+        for table in tables:
+            day = func.date(table.c.ts)
+            statement = (
+                select(table.c.user_id, day)
+                .where(
+                    table.c.user_id.between(first_user_id, last_user_id),
+                    table.c.ts >= since,
+                    table.c.ts < until,
+                )
+                .distinct()
+            )
+            days.update(
+                (user_id, to_date(value))
+                for user_id, value in self.db.session.execute(statement)
+            )
+        return sorted(days)
+
+    def drop_history_before(self, month: datetime) -> List[datetime]:
+        """
+        Drop the partitions of months before month, whole tables at a time
+        """
+        dropped = [
+            partition
+            for partition in self.get_history_partitions()
+            if partition < month
+        ]
+        for partition in dropped:
+            self.db.session.execute(DropTable(history_partition(partition)))
+            self._partitions.discard(partition)
+        self.db.session.commit()
+        return dropped
@@ -1,8 +1,21 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Dict, Iterator, Optional, List, Sequence, Tuple
+from sqlalchemy import func, select
 from flask_sqlalchemy import SQLAlchemy
 
 from app.models.song import Song
-from app.models.playlist import Playlist
+from app.common.fields import with_id
+from app.common.streaming import yield_rows
+from app.models.playlist import Playlist, playlist_songs
+from app.models.outbox import (
+    PLAYLIST_CREATED,
+    PLAYLIST_DELETED,
+    PLAYLIST_SONG_ADDED,
+    PLAYLIST_SONG_MOVED,
+    PLAYLIST_SONG_REMOVED,
+    PLAYLIST_UPDATED,
+    add_event,
+)
 
 
 class PlaylistRepository:
@@ -12,14 +25,48 @@ class PlaylistRepository:
     def create(self, data: dict) -> None:
         playlist = Playlist.from_dict(data)
         self.db.session.add(playlist)
+        self.db.session.flush()
+        add_event(
+            self.db.session,
+            PLAYLIST_CREATED,
+            playlist_id=playlist.id,
+            user_id=playlist.user_id,
+        )
         self.db.session.commit()
 
-    def update(self, playlist: Playlist, data: dict) -> None:
-        playlist.title = data.get("title", playlist.title)
+    def copy(self, source: Playlist, data: dict) -> Playlist:
+        playlist = Playlist.from_dict(data)
+        self.db.session.add(playlist)
+        playlist.copy_songs_from(source.id)
+        add_event(
+            self.db.session,
+            PLAYLIST_CREATED,
+            playlist_id=playlist.id,
+            user_id=playlist.user_id,
+            source_id=source.id,
+        )
+        self.db.session.commit()
+        return playlist
+
+    def update(
+        self, playlist: Playlist, data: dict, version: Optional[int] = None
+    ) -> bool:
+        values = {"title": data.get("title", playlist.title)}
+        version = playlist.version if version is None else version
+        updated = Playlist.compare_and_swap(playlist.id, version, values)
+        if updated:
+            add_event(
+                self.db.session,
+                PLAYLIST_UPDATED,
+                playlist_id=playlist.id,
+                version=version + 1,
+            )
 
         self.db.session.commit()
+        return updated
 
     def delete(self, playlist: Playlist) -> None:
+        add_event(self.db.session, PLAYLIST_DELETED, playlist_id=playlist.id)
         self.db.session.delete(playlist)
         self.db.session.commit()
 
@@ -29,10 +76,210 @@ class PlaylistRepository:
     def get_all(self, take: int = 10, skip: int = 0) -> List[Playlist]:
         return Playlist.paginate(take, skip)
 
-    def add_song(self, playlist: Playlist, song: Song) -> None:
-        playlist.add_song(song)
+    def get_row(
+        self, playlist_id: int, fields: Optional[Sequence[str]] = None
+    ) -> Optional[dict]:
+        statement = select(*Playlist.columns(fields)).where(Playlist.id == playlist_id)
+        row = self.db.session.execute(statement).first()
+        return None if row is None else Playlist.row_to_dict(row, fields)
+
+    def get_rows_by_ids(
+        self, playlist_ids: Sequence[int], fields: Optional[Sequence[str]] = None
+    ) -> Dict[int, dict]:
+        if not playlist_ids:
+            return {}
+
+        statement = select(*Playlist.columns(with_id(fields))).where(
+            Playlist.id.in_(playlist_ids)
+        )
+        return {
+            row.id: Playlist.row_to_dict(row, fields)
+            for row in self.db.session.execute(statement)
+        }
+
+    def get_all_rows(
+        self, take: int = 10, skip: int = 0, fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        statement = self._select_all(take, skip, fields)
+        return [
+            Playlist.row_to_dict(row, fields)
+            for row in self.db.session.execute(statement)
+        ]
+
+    def iter_all_rows(
+        self,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        statement = self._select_all(take, skip, fields)
+        return yield_rows(
+            self.db.session, statement, lambda row: Playlist.row_to_dict(row, fields)
+        )
+
+    def _select_all(
+        self, take: Optional[int], skip: int, fields: Optional[Sequence[str]]
+    ):
+        return select(*Playlist.columns(fields)).offset(skip).limit(take)
+
+    def get_song_rows(
+        self,
+        playlist_id: int,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        statement = (
+            select(*Song.columns(fields))
+            .join(playlist_songs, playlist_songs.c.song_id == Song.id)
+            .where(playlist_songs.c.playlist_id == playlist_id)
+            .order_by(playlist_songs.c.position)
+            .offset(skip)
+            .limit(take)
+        )
+        return [
+            Song.row_to_dict(row, fields) for row in self.db.session.execute(statement)
+        ]
+
+    def get_song_counts(self, playlist_ids: Sequence[int]) -> Dict[int, int]:
+        if not playlist_ids:
+            return {}
+
+        statement = (
+            select(playlist_songs.c.playlist_id, func.count())
+            .where(playlist_songs.c.playlist_id.in_(playlist_ids))
+            .group_by(playlist_songs.c.playlist_id)
+        )
+        return dict(self.db.session.execute(statement).all())
+
+    def get_song_previews(
+        self,
+        playlist_ids: Sequence[int],
+        per_playlist: int,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Dict[int, List[dict]]:
+        """
+        First per_playlist songs of every playlist, ranked by position with
+        ROW_NUMBER() in a single query
+        """
+        if not playlist_ids or per_playlist <= 0:
+            return {}
+
+        rank = (
+            func.row_number()
+            .over(
+                partition_by=playlist_songs.c.playlist_id,
+                order_by=playlist_songs.c.position,
+            )
+            .label("preview_rank")
+        )
+        ranked = (
+            select(
+                playlist_songs.c.playlist_id.label("preview_playlist_id"),
+                rank,
+                *Song.columns(fields),
+            )
+            .join(Song, Song.id == playlist_songs.c.song_id)
+            .where(playlist_songs.c.playlist_id.in_(playlist_ids))
+            .subquery()
+        )
+        statement = (
+            select(ranked)
+            .where(ranked.c.preview_rank <= per_playlist)
+            .order_by(ranked.c.preview_playlist_id, ranked.c.preview_rank)
+        )
+
+        previews = {}
+        for row in self.db.session.execute(statement):
+            previews.setdefault(row.preview_playlist_id, []).append(
+                Song.row_to_dict(row, fields)
+            )
+        return previews
+
+    def get_revision(self, playlist_id: int) -> Optional[tuple]:
+        return Playlist.get_revision(playlist_id)
+
+    def get_all_revision(self) -> Tuple[Optional[datetime], int]:
+        return Playlist.get_table_revision()
+
+    def add_song(
+        self, playlist: Playlist, song: Song, index: Optional[int] = None
+    ) -> bool:
+        crowded = playlist.add_song(song, index)
+        add_event(
+            self.db.session,
+            PLAYLIST_SONG_ADDED,
+            playlist_id=playlist.id,
+            song_id=song.id,
+        )
+        self.db.session.commit()
+        return crowded
+
+    def move_song(self, playlist: Playlist, song_id: int, index: int) -> bool:
+        crowded = playlist.move_song(song_id, index)
+        add_event(
+            self.db.session,
+            PLAYLIST_SONG_MOVED,
+            playlist_id=playlist.id,
+            song_id=song_id,
+            index=index,
+        )
+        self.db.session.commit()
+        return crowded
+
+    def add_songs(self, playlist: Playlist, song_ids: Sequence[int]) -> List[int]:
+        added = playlist.add_songs(song_ids)
+        for song_id in added:
+            add_event(
+                self.db.session,
+                PLAYLIST_SONG_ADDED,
+                playlist_id=playlist.id,
+                song_id=song_id,
+            )
+        self.db.session.commit()
+        return added
+
+    def remove_songs(self, playlist: Playlist, song_ids: Sequence[int]) -> List[int]:
+        removed = playlist.remove_songs(song_ids)
+        for song_id in removed:
+            add_event(
+                self.db.session,
+                PLAYLIST_SONG_REMOVED,
+                playlist_id=playlist.id,
+                song_id=song_id,
+            )
+        self.db.session.commit()
+        return removed
+
+    def has_song(self, playlist: Playlist, song_id: int) -> bool:
+        return playlist.has_song(song_id)
+
+    def rebalance(self, playlist_id: int) -> bool:
+        """
+        Rebalance a playlist apart from the write that crowded it. Returns
+        False, leaving positions as they were, when another write to the
+        playlist landed between reading its order and rewriting it.
+        """
+        playlist = Playlist.get_for_update(playlist_id)
+        if playlist is None:
+            return True
+
+        version = playlist.version
+        playlist.rebalance()
+        # Every membership change bumps the version, see Playlist._touch
+        if not Playlist.has_version(playlist_id, version):
+            self.db.session.rollback()
+            return False
+
         self.db.session.commit()
+        return True
 
     def remove_song(self, playlist: Playlist, song: Song) -> None:
         playlist.remove_song(song)
+        add_event(
+            self.db.session,
+            PLAYLIST_SONG_REMOVED,
+            playlist_id=playlist.id,
+            song_id=song.id,
+        )
         self.db.session.commit()
@@ -1,7 +1,14 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, List, Sequence, Set, Tuple
+from sqlalchemy import or_, select
 from flask_sqlalchemy import SQLAlchemy
 
-from app.models.song import Song
+from app.models.song import Song, song_similar
+from app.models.playlist import playlist_songs
+from app.models.user import User
+from app.models.outbox import SONG_CREATED, SONG_DELETED, SONG_UPDATED, add_event
+from app.common.fields import embed, with_id
+from app.common.streaming import yield_rows
 
 
 class SongRepository:
@@ -11,26 +18,174 @@ class SongRepository:
     def create(self, data: dict) -> None:
         song = Song.from_dict(data)
         self.db.session.add(song)
+        self.db.session.flush()
+        add_event(
+            self.db.session,
+            SONG_CREATED,
+            song_id=song.id,
+            user_id=song.user_id,
+            title=song.title,
+        )
         self.db.session.commit()
 
-    def update(self, song: Song, data: dict) -> None:
-        song.title = data.get("title", song.title)
-        song.song_url = data.get("song_url", song.song_url)
-        song.small_thumbnail_url = data.get(
-            "small_thumbnail_url", song.small_thumbnail_url
-        )
-        song.large_thumbnail_url = data.get(
-            "large_thumbnail_url", song.large_thumbnail_url
-        )
+    def update(self, song: Song, data: dict, version: Optional[int] = None) -> bool:
+        values = {
+            "title": data.get("title", song.title),
+            "song_url": data.get("song_url", song.song_url),
+            "small_thumbnail_url": data.get(
+                "small_thumbnail_url", song.small_thumbnail_url
+            ),
+            "large_thumbnail_url": data.get(
+                "large_thumbnail_url", song.large_thumbnail_url
+            ),
+        }
+        version = song.version if version is None else version
+        updated = Song.compare_and_swap(song.id, version, values)
+        if updated:
+            add_event(
+                self.db.session, SONG_UPDATED, song_id=song.id, version=version + 1
+            )
 
         self.db.session.commit()
+        return updated
 
     def delete(self, song: Song) -> None:
+        self.db.session.execute(
+            song_similar.delete().where(
+                or_(
+                    song_similar.c.song_id == song.id,
+                    song_similar.c.similar_song_id == song.id,
+                )
+            )
+        )
+        add_event(self.db.session, SONG_DELETED, song_id=song.id, user_id=song.user_id)
         self.db.session.delete(song)
         self.db.session.commit()
 
     def get_by_id(self, song_id: int) -> Optional[Song]:
         return Song.get_by_id(song_id)
 
+    def get_by_job_id(self, job_id: int) -> Optional[Song]:
+        return Song.get_by_job_id(job_id)
+
+    def get_existing_ids(self, song_ids: Sequence[int]) -> Set[int]:
+        return Song.get_existing_ids(song_ids)
+
     def get_all(self, take: int = 10, skip: int = 0) -> List[Song]:
         return Song.paginate(take, skip)
+
+    def get_row(
+        self, song_id: int, fields: Optional[Sequence[str]] = None
+    ) -> Optional[dict]:
+        statement = select(*Song.columns(fields)).where(Song.id == song_id)
+        row = self.db.session.execute(statement).first()
+        return None if row is None else Song.row_to_dict(row, fields)
+
+    def get_rows_by_ids(
+        self, song_ids: Sequence[int], fields: Optional[Sequence[str]] = None
+    ) -> Dict[int, dict]:
+        if not song_ids:
+            return {}
+
+        statement = select(*Song.columns(with_id(fields))).where(Song.id.in_(song_ids))
+        return {
+            row.id: Song.row_to_dict(row, fields)
+            for row in self.db.session.execute(statement)
+        }
+
+    def get_all_rows(
+        self, take: int = 10, skip: int = 0, fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        statement = self._select_all(take, skip, fields)
+        return [
+            Song.row_to_dict(row, fields) for row in self.db.session.execute(statement)
+        ]
+
+    def iter_all_rows(
+        self,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        statement = self._select_all(take, skip, fields)
+        return yield_rows(
+            self.db.session, statement, lambda row: Song.row_to_dict(row, fields)
+        )
+
+    def _select_all(
+        self, take: Optional[int], skip: int, fields: Optional[Sequence[str]]
+    ):
+        return select(*Song.columns(fields)).offset(skip).limit(take)
+
+    def get_similar_rows(
+        self, song_id: int, take: int = 10, fields: Optional[Sequence[str]] = None
+    ) -> List[dict]:
+        """
+        Precomputed similar songs, best first, read off the song_similar
+        primary key
+        """
+        statement = (
+            select(*Song.columns(fields), song_similar.c.score)
+            .join(song_similar, song_similar.c.similar_song_id == Song.id)
+            .where(song_similar.c.song_id == song_id)
+            .order_by(song_similar.c.rank)
+            .limit(take)
+        )
+        return [
+            {**Song.row_to_dict(row, fields), "score": row.score}
+            for row in self.db.session.execute(statement)
+        ]
+
+    def iter_memberships(self) -> Iterator[Tuple[int, int]]:
+        """
+        Every (playlist_id, song_id) pair, read through a server-side cursor
+        """
+        statement = select(playlist_songs.c.playlist_id, playlist_songs.c.song_id)
+        return yield_rows(self.db.session, statement, tuple)
+
+    def replace_similar(self, chunks: Iterable[List[tuple]]) -> int:
+        """
+        Swap the whole song_similar table for the given chunks of
+        (song_id, rank, similar_song_id, score) rows in one transaction
+        """
+        self.db.session.execute(song_similar.delete())
+        count = 0
+        for rows in chunks:
+            if not rows:
+                continue
+
+            self.db.session.execute(
+                song_similar.insert(),
+                [
+                    {
+                        "song_id": song_id,
+                        "rank": rank,
+                        "similar_song_id": similar_song_id,
+                        "score": score,
+                    }
+                    for song_id, rank, similar_song_id, score in rows
+                ],
+            )
+            count += len(rows)
+
+        self.db.session.commit()
+        return count
+
+    def embed_users(
+        self, songs: List[Optional[dict]], keep_user_id: bool = True
+    ) -> List[Optional[dict]]:
+        """
+        Attach a summary of each song's uploader, loaded with a single IN query
+        """
+        user_ids = {song["user_id"] for song in songs if song is not None}
+        users = User.get_summaries(list(user_ids))
+        return embed(songs, "user_id", users, "user", keep_user_id)
+
+    def get_user_revision(self) -> Tuple[Optional[datetime], int]:
+        return User.get_table_revision()
+
+    def get_revision(self, song_id: int) -> Optional[Tuple[int, datetime]]:
+        return Song.get_revision(song_id)
+
+    def get_all_revision(self) -> Tuple[Optional[datetime], int]:
+        return Song.get_table_revision()
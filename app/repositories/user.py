@@ -1,7 +1,12 @@
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import select
 from flask_sqlalchemy import SQLAlchemy
 
-from app.models.user import User
+from app.models.song import Song
+from app.common.fields import with_id
+from app.common.streaming import yield_rows
+from app.models.user import User, followers
+from app.models.outbox import FOLLOWED, UNFOLLOWED, add_event
 
 
 class UserRepository:
@@ -33,13 +38,186 @@ class UserRepository:
     def get_by_id(self, user_id: int) -> Optional[User]:
         return User.query.get(user_id)
 
+    def attach(self, user: User) -> User:
+        """
+        The same user bound to the current thread's session, without a query
+        """
+        return self.db.session.merge(user, load=False)
+
+    def rollback(self) -> None:
+        """
+        Discard whatever a failed request left in the thread's session
+        """
+        self.db.session.rollback()
+
     def get_by_email(self, email: str) -> Optional[User]:
         return User.query.filter_by(email=email).first()
 
+    def get_rows_by_ids(
+        self, user_ids: Sequence[int], fields: Optional[Sequence[str]] = None
+    ) -> Dict[int, dict]:
+        if not user_ids:
+            return {}
+
+        statement = select(*User.columns(with_id(fields))).where(User.id.in_(user_ids))
+        return {
+            row.id: User.row_to_dict(row, fields)
+            for row in self.db.session.execute(statement)
+        }
+
+    def iter_follow_edges(self) -> Iterator[Tuple[int, int]]:
+        """
+        Every (follower_id, followed_id) pair, read through a server-side cursor
+        """
+        statement = select(followers.c.follower_id, followers.c.followed_id)
+        return yield_rows(self.db.session, statement, tuple)
+
+    def get_follower_rows(
+        self,
+        user_id: int,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        statement = self._select_followers(user_id, take, skip, fields)
+        return [
+            User.row_to_dict(row, fields) for row in self.db.session.execute(statement)
+        ]
+
+    def get_followed_ids(self, follower_id: int, user_ids: Sequence[int]) -> Set[int]:
+        """
+        Which of user_ids follower_id follows, answered from the
+        (follower_id, followed_id) index in one query
+        """
+        if not user_ids:
+            return set()
+
+        statement = select(followers.c.followed_id).where(
+            followers.c.follower_id == follower_id,
+            followers.c.followed_id.in_(user_ids),
+        )
+        return set(self.db.session.execute(statement).scalars())
+
+    def iter_follower_rows(
+        self,
+        user_id: int,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        statement = self._select_followers(user_id, take, skip, fields)
+        return yield_rows(
+            self.db.session, statement, lambda row: User.row_to_dict(row, fields)
+        )
+
+    def get_followed_user_rows(
+        self,
+        user_id: int,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        statement = self._select_followed_users(user_id, take, skip, fields)
+        return [
+            User.row_to_dict(row, fields) for row in self.db.session.execute(statement)
+        ]
+
+    def iter_followed_user_rows(
+        self,
+        user_id: int,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        statement = self._select_followed_users(user_id, take, skip, fields)
+        return yield_rows(
+            self.db.session, statement, lambda row: User.row_to_dict(row, fields)
+        )
+
+    def get_song_rows(
+        self,
+        user_id: int,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        statement = self._select_songs(user_id, take, skip, fields)
+        return [
+            Song.row_to_dict(row, fields) for row in self.db.session.execute(statement)
+        ]
+
+    def iter_song_rows(
+        self,
+        user_id: int,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        statement = self._select_songs(user_id, take, skip, fields)
+        return yield_rows(
+            self.db.session, statement, lambda row: Song.row_to_dict(row, fields)
+        )
+
+    def _select_followers(
+        self,
+        user_id: int,
+        take: Optional[int],
+        skip: int,
+        fields: Optional[Sequence[str]],
+    ):
+        return (
+            select(*User.columns(fields))
+            .join(followers, followers.c.follower_id == User.id)
+            .where(followers.c.followed_id == user_id)
+            .limit(take)
+            .offset(skip)
+        )
+
+    def _select_followed_users(
+        self,
+        user_id: int,
+        take: Optional[int],
+        skip: int,
+        fields: Optional[Sequence[str]],
+    ):
+        return (
+            select(*User.columns(fields))
+            .join(followers, followers.c.followed_id == User.id)
+            .where(followers.c.follower_id == user_id)
+            .limit(take)
+            .offset(skip)
+        )
+
+    def _select_songs(
+        self,
+        user_id: int,
+        take: Optional[int],
+        skip: int,
+        fields: Optional[Sequence[str]],
+    ):
+        return (
+            select(*Song.columns(fields))
+            .where(Song.user_id == user_id)
+            .limit(take)
+            .offset(skip)
+        )
+
     def follow(self, from_user: User, to_user: User) -> None:
-        from_user.follow(to_user)
+        if from_user.follow(to_user):
+            add_event(
+                self.db.session,
+                FOLLOWED,
+                follower_id=from_user.id,
+                followed_id=to_user.id,
+            )
         self.db.session.commit()
 
     def unfollow(self, from_user: User, to_user: User) -> None:
-        from_user.unfollow(to_user)
+        if from_user.unfollow(to_user):
+            add_event(
+                self.db.session,
+                UNFOLLOWED,
+                follower_id=from_user.id,
+                followed_id=to_user.id,
+            )
         self.db.session.commit()
@@ -0,0 +1,113 @@
+from typing import Optional
+from datetime import date, datetime, time, timedelta
+
+from app.common.cohorts import CohortMatrix
+from app.common.exceptions import BadRequestException, NotFoundException
+from app.common.singleflight import SingleFlight
+from app.models.analytics import DailyRollup
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.play import PlayRepository
+from app.common.messages import (
+    COHORT_REPORT_NOT_FOUND,
+    DATE_RANGE_INVALID,
+    DATE_RANGE_TOO_LONG,
+)
+
+DAILY_ROLLUP = "daily_rollup"
+# Rows committed by transactions still in flight at the end of a run may
+# carry an earlier timestamp, so a run stops this far behind the clock
+ROLLUP_SETTLE = timedelta(minutes=1)
+MAX_DAILY_RANGE = 366
+MAX_COHORT_RANGE = 728
+# Users read, and their logins looked up, per round trip of the cohort job
+COHORT_CHUNK_SIZE = 100_000
+
+
+class AnalyticsService:
+    def __init__(
+        self,
+        repository: AnalyticsRepository,
+        play_repository: Optional[PlayRepository] = None,
+    ) -> None:
+        self.repository = repository
+        # Plays count as activity alongside logins when their history is known
+        self.play_repository = play_repository
+        self.singleflight = SingleFlight()
+
+    def rollup(self, now: Optional[datetime] = None) -> dict:
+        """
+        Fold everything since the stored watermark into the daily rollups
+        """
+        start = self.repository.get_watermark(DAILY_ROLLUP) or datetime.min
+        end = (now or datetime.utcnow()) - ROLLUP_SETTLE
+        if end <= start:
+            return {"from": start, "to": start, "days": []}
+
+        days = self.repository.rollup(DAILY_ROLLUP, start, end)
+        return {"from": start, "to": end, "days": days}
+
+    def get_daily(self, start: date, end: date) -> dict:
+        self._validate_range(start, end, MAX_DAILY_RANGE)
+
+        return self.singleflight.do(
+            ("get_daily", start, end), self._get_daily, start, end
+        )
+
+    def _get_daily(self, start: date, end: date) -> dict:
+        rows = self.repository.get_daily_rows(start, end)
+        empty = {counter: 0 for counter in DailyRollup.COUNTERS}
+
+        days = []
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            days.append(rows.get(day) or {"day": day.isoformat(), **empty})
+
+        watermark = self.repository.get_watermark(DAILY_ROLLUP)
+        return {
+            "days": days,
+            "as_of": None if watermark is None else watermark.isoformat(),
+        }
+
+    def build_cohorts(self, start: date, end: date) -> dict:
+        """
+        Weekly retention of the users who signed up between start and end,
+        stored as the cached report for that range
+        """
+        self._validate_range(start, end, MAX_COHORT_RANGE)
+
+        matrix = CohortMatrix(start, end)
+        chunks = self.repository.iter_signup_chunks(
+            datetime.combine(matrix.start, time.min),
+            datetime.combine(end + timedelta(days=1), time.min),
+            COHORT_CHUNK_SIZE,
+        )
+        for users in chunks:
+            first_id, last_id = users[0][0], users[-1][0]
+            activity = self.repository.get_login_days(
+                first_id, last_id, matrix.start, end
+            )
+            if self.play_repository is not None:
+                activity = list(activity) + self.play_repository.get_play_days(
+                    first_id, last_id, matrix.start, end
+                )
+            matrix.add_rows(users, activity)
+
+        report = {"from": start.isoformat(), "to": end.isoformat(), **matrix.to_dict()}
+        self.repository.save_cohort_report(start, end, report)
+        return report
+
+    def get_cohorts(self, start: date, end: date) -> dict:
+        self._validate_range(start, end, MAX_COHORT_RANGE)
+
+        report = self.repository.get_cohort_report(start, end)
+        if report is None:
+            raise NotFoundException(COHORT_REPORT_NOT_FOUND)
+
+        return report
+
+    def _validate_range(self, start: date, end: date, limit: int) -> None:
+        if start > end:
+            raise BadRequestException(DATE_RANGE_INVALID)
+
+        if (end - start).days >= limit:
+            raise BadRequestException(DATE_RANGE_TOO_LONG.format(limit))
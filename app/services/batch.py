@@ -0,0 +1,145 @@
+from flask import Flask, Response
+from urllib.parse import urlsplit
+from typing import Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import HTTPException
+
+from app.models.user import User
+from app.repositories.user import UserRepository
+from app.common.token import CURRENT_USER_ENVIRON_KEY
+from app.common.exceptions import BadRequestException, FieldRequiredException
+from app.common.messages import (
+    BATCH_NESTED,
+    BATCH_REQUEST_MALFORMED,
+    BATCH_METHOD_INVALID,
+    BATCH_REQUESTS_INVALID,
+    INTERNAL_SERVER_ERROR,
+    TOO_MANY_BATCH_REQUESTS,
+)
+
+BATCH_PATH = "/batch"
+MAX_BATCH_REQUESTS = 20
+MAX_BATCH_WORKERS = 4
+BATCH_METHODS = ("GET", "POST", "PUT", "DELETE")
+FORWARDED_HEADERS = ("ETag",)
+
+
+class BatchService:
+    def __init__(self, app: Flask, user_repository: UserRepository) -> None:
+        self.app = app
+        self.user_repository = user_repository
+
+    def execute(
+        self, current_user: User, sub_requests: List[dict], parallel: bool = False
+    ) -> List[dict]:
+        """
+        Dispatch every sub-request against the app's own routes, in order,
+        authenticated as current_user. With parallel set, a batch made only of
+        GET requests is spread over a small thread pool.
+        """
+        self._validate(sub_requests)
+
+        read_only = all(self._method(sub) == "GET" for sub in sub_requests)
+        if not parallel or not read_only or len(sub_requests) == 1:
+            return [self._dispatch(current_user, sub) for sub in sub_requests]
+
+        workers = min(len(sub_requests), MAX_BATCH_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    lambda sub: self._dispatch_in_thread(current_user, sub),
+                    sub_requests,
+                )
+            )
+
+    def _validate(self, sub_requests: List[dict]) -> None:
+        if not sub_requests:
+            raise FieldRequiredException("requests")
+
+        if not isinstance(sub_requests, list):
+            raise BadRequestException(BATCH_REQUESTS_INVALID)
+
+        if len(sub_requests) > MAX_BATCH_REQUESTS:
+            raise BadRequestException(
+                TOO_MANY_BATCH_REQUESTS.format(MAX_BATCH_REQUESTS)
+            )
+
+        for sub in sub_requests:
+            path = sub.get("path") if isinstance(sub, dict) else None
+            if not isinstance(path, str) or not path.startswith("/"):
+                raise BadRequestException(BATCH_REQUESTS_INVALID)
+
+            if self._method(sub) not in BATCH_METHODS:
+                raise BadRequestException(BATCH_METHOD_INVALID.format(sub["method"]))
+
+            if urlsplit(path).path.rstrip("/") == BATCH_PATH:
+                raise BadRequestException(BATCH_NESTED)
+
+    def _method(self, sub: dict) -> str:
+        return str(sub.get("method", "GET")).upper()
+
+    def _dispatch_in_thread(self, current_user: User, sub: dict) -> dict:
+        with self.app.app_context():
+            return self._dispatch(self.user_repository.attach(current_user), sub)
+
+    def _dispatch(self, current_user: User, sub: dict) -> dict:
+        path = sub["path"]
+        method = self._method(sub)
+
+        try:
+            self.app.url_map.bind("localhost").match(urlsplit(path).path, method)
+        except HTTPException as e:
+            return {"status": e.code, "body": {"message": e.description}}
+
+        try:
+            context = self.app.test_request_context(
+                path,
+                method=method,
+                query_string=sub.get("params"),
+                headers=sub.get("headers"),
+                json=sub.get("body"),
+                data=sub.get("form"),
+                environ_overrides={CURRENT_USER_ENVIRON_KEY: current_user},
+            )
+        except (TypeError, ValueError) as e:
+            # e.g. params with a query string already in path, body and form
+            # together or headers that are not an object
+            return {
+                "status": 400,
+                "body": {"message": BATCH_REQUEST_MALFORMED.format(e)},
+            }
+
+        with context:
+            try:
+                response = self.app.full_dispatch_request()
+            except Exception:
+                self.app.logger.exception(
+                    "Batch sub-request %s %s failed", method, path
+                )
+                response = None
+
+            if response is None or response.status_code >= 500:
+                # Sub-requests share the session, the next one must not run
+                # on what this one left half done
+                self.user_repository.rollback()
+            if response is None:
+                return {"status": 500, "body": {"message": INTERNAL_SERVER_ERROR}}
+            return self._to_dict(response)
+
+    def _to_dict(self, response: Response) -> dict:
+        result = {"status": response.status_code, "body": self._body(response)}
+        headers = {
+            name: response.headers[name]
+            for name in FORWARDED_HEADERS
+            if name in response.headers
+        }
+        if headers:
+            result["headers"] = headers
+        return result
+
+    def _body(self, response: Response) -> Optional[Any]:
+        if response.is_json:
+            return response.get_json()
+
+        body = response.get_data(as_text=True)
+        return body or None
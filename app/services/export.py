@@ -0,0 +1,117 @@
+from flask import Flask
+from itertools import groupby
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+from app.common.exceptions import BadRequestException
+from app.repositories.export import EXPORT_TABLES, ExportRepository
+from app.common.messages import EXPORT_FORMAT_INVALID, EXPORT_TABLE_INVALID
+from app.common.export import (
+    EXPORT_FORMATS,
+    PartitionedWriter,
+    arrow_schema,
+    partition_day,
+    read_manifest,
+    write_manifest,
+)
+
+EXPORT_BATCH_SIZE = 50_000
+# Like the daily rollup, stay behind transactions that are still committing
+EXPORT_SETTLE = timedelta(minutes=1)
+
+
+class ExportService:
+    def __init__(self, app: Flask, repository: ExportRepository) -> None:
+        self.app = app
+        self.repository = repository
+
+    def export(
+        self,
+        tables: Sequence[str] = EXPORT_TABLES,
+        format_: str = "parquet",
+        now: Optional[datetime] = None,
+    ) -> dict:
+        """
+        Write what changed in each table since the manifest's watermark as
+        date partitioned columnar files under EXPORT_DIR, then record the new
+        watermarks. followers has no change tracking and is exported whole.
+        """
+        unknown = [table for table in tables if table not in EXPORT_TABLES]
+        if unknown:
+            raise BadRequestException(EXPORT_TABLE_INVALID.format(", ".join(unknown)))
+
+        if format_ not in EXPORT_FORMATS:
+            raise BadRequestException(EXPORT_FORMAT_INVALID.format(format_))
+
+        directory = self.app.config["EXPORT_DIR"]
+        manifest = read_manifest(directory)
+        started_at = now or datetime.utcnow()
+        until = started_at - EXPORT_SETTLE
+        run = {
+            "run": f"{started_at:%Y%m%dT%H%M%S%f}",
+            "started_at": started_at.isoformat(),
+            "format": format_,
+            "tables": {},
+        }
+
+        for table in tables:
+            state = manifest["tables"].get(table, {})
+            writer = PartitionedWriter(
+                directory,
+                table,
+                run["run"],
+                arrow_schema(self.repository.columns(table)),
+                format_,
+            )
+            try:
+                watermark = self._export_table(table, state, until, writer, started_at)
+            finally:
+                writer.close()
+
+            if self.repository.is_incremental(table):
+                manifest["tables"][table] = {"mode": "incremental", **watermark}
+            else:
+                manifest["tables"][table] = {
+                    "mode": "snapshot",
+                    "exported_at": started_at.isoformat(),
+                }
+            run["tables"][table] = {"rows": writer.rows, "files": writer.files}
+
+        run["finished_at"] = datetime.utcnow().isoformat()
+        manifest["runs"].append(run)
+        write_manifest(directory, manifest)
+        return run
+
+    def _export_table(
+        self,
+        table: str,
+        state: dict,
+        until: datetime,
+        writer: PartitionedWriter,
+        started_at: datetime,
+    ) -> dict:
+        watermark = None
+        if "updated_at" in state:
+            watermark = (datetime.fromisoformat(state["updated_at"]), state["id"])
+
+        incremental = self.repository.is_incremental(table)
+        batches = self.repository.iter_batches(
+            table, watermark, until, EXPORT_BATCH_SIZE
+        )
+        for rows in batches:
+            if not incremental:
+                writer.write(partition_day(started_at), rows)
+                continue
+
+            # Incremental rows end with (updated_at, id) and arrive in that order
+            for day, day_rows in groupby(rows, key=lambda row: partition_day(row[-2])):
+                writer.write(day, list(day_rows))
+
+            dated = [row for row in rows if row[-2] is not None]
+            if dated:
+                watermark = (dated[-1][-2], dated[-1][-1])
+
+        if watermark is None:
+            return {}
+
+        return {"updated_at": watermark[0].isoformat(), "id": watermark[1]}
@@ -0,0 +1,302 @@
+import time
+from flask import Flask
+from datetime import datetime, timedelta
+from threading import Condition, Event, Thread, local
+from typing import Callable, Dict, List, Optional
+
+from app.repositories.job import JobRepository
+
+JOB_MAX_ATTEMPTS = 5
+# A claimed job is invisible to other workers this long; a worker that dies
+# mid-job gives it back once it runs out
+JOB_VISIBILITY_TIMEOUT = timedelta(minutes=5)
+RETRY_BACKOFF = timedelta(seconds=10)
+MAX_RETRY_BACKOFF = timedelta(hours=1)
+POLL_INTERVAL = 1.0
+
+
+class LeaseLostError(Exception):
+    """
+    The job ran out of its visibility timeout and another worker claimed it
+    """
+
+
+def retry_backoff(attempts: int) -> timedelta:
+    """
+    Exponential delay before the attempt following attempts failed ones
+    """
+    return min(RETRY_BACKOFF * 2 ** (attempts - 1), MAX_RETRY_BACKOFF)
+
+
+class JobService:
+    def __init__(self, app: Flask, repository: JobRepository) -> None:
+        self.app = app
+        self.repository = repository
+        self.handlers: Dict[str, Callable[[dict], None]] = {}
+        self.cleanups: Dict[str, Callable[[dict], None]] = {}
+        # Shutdown state: once accepting is off nothing new is claimed here,
+        # _active counts run_one calls in progress and _running holds the
+        # lease of every job they run, guarded by _idle
+        self.accepting = True
+        self._active = 0
+        self._running: Dict[int, str] = {}
+        self._stops: List[Event] = []
+        self._idle = Condition()
+        # The job each thread is running, for heartbeat()
+        self._current = local()
+
+    def register(
+        self,
+        type_: str,
+        handler: Callable[[dict], None],
+        cleanup: Optional[Callable[[dict], None]] = None,
+    ) -> None:
+        """
+        handler runs the payload of type_ jobs, possibly more than once.
+        cleanup, if any, runs once the job succeeded or was dead-lettered and
+        no other worker can still be running it, so a dead job retried later
+        has to cope with what cleanup removed.
+        """
+        if type_ in self.handlers:
+            raise ValueError(f"A handler for {type_} jobs is already registered")
+
+        self.handlers[type_] = handler
+        if cleanup is not None:
+            self.cleanups[type_] = cleanup
+
+    def current_job_id(self) -> Optional[int]:
+        job = getattr(self._current, "job", None)
+        return None if job is None else job["id"]
+
+    def heartbeat(self) -> None:
+        """
+        Push back the visibility timeout of the job running on this thread,
+        for handlers that can take longer than it. Raises LeaseLostError when
+        another worker claimed the job in the meantime.
+        """
+        job = getattr(self._current, "job", None)
+        if job is None:
+            return
+
+        locked_until = datetime.utcnow() + JOB_VISIBILITY_TIMEOUT
+        if not self.repository.extend(job["id"], job["lease"], locked_until):
+            raise LeaseLostError(f"Job {job['id']} was claimed by another worker")
+
+    def enqueue(
+        self,
+        type_: str,
+        payload: dict,
+        delay: timedelta = timedelta(0),
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+    ) -> int:
+        if type_ not in self.handlers:
+            raise ValueError(f"No handler for {type_} jobs")
+
+        run_at = datetime.utcnow() + delay
+        return self.repository.enqueue(type_, payload, max_attempts, run_at)
+
+    def start(self, type_: str, payload: dict) -> int:
+        """
+        Enqueue a job and run it right away on a thread of this process. Once
+        shutting down the job is only enqueued; either way a worker resumes
+        it should it not finish here.
+        """
+        job_id = self.enqueue(type_, payload)
+        if self.accepting:
+            # Daemon threads do not hold up exit, shutdown() drains them
+            thread = Thread(target=self._run_in_context, args=(job_id,), daemon=True)
+            thread.start()
+        return job_id
+
+    def _run_in_context(self, job_id: int) -> None:
+        with self.app.app_context():
+            self.run_one(job_id)
+
+    def run_one(
+        self, job_id: Optional[int] = None, now: Optional[datetime] = None
+    ) -> Optional[bool]:
+        """
+        Claim and run the next due job, or job_id only. Returns None when
+        there was nothing to claim or the service is shutting down, otherwise
+        whether the job succeeded.
+        """
+        with self._idle:
+            if not self.accepting:
+                return None
+            self._active += 1
+
+        job = None
+        try:
+            job = self.repository.claim(
+                now or datetime.utcnow(), JOB_VISIBILITY_TIMEOUT, job_id
+            )
+            if job is None:
+                return None
+
+            with self._idle:
+                self._running[job["id"]] = job["lease"]
+            return self._run(job)
+        finally:
+            with self._idle:
+                self._active -= 1
+                if job is not None:
+                    self._running.pop(job["id"], None)
+                self._idle.notify_all()
+
+    def _run(self, job: dict) -> bool:
+        if job["attempts"] > job["max_attempts"]:
+            # Every attempt timed out without reporting back, the job most
+            # likely takes its worker down with it
+            if self.repository.fail(job["id"], job["lease"], "Timed out", None):
+                self._clean_up(job)
+            return False
+
+        self._current.job = job
+        try:
+            self.handlers[job["type"]](job["payload"])
+        except LeaseLostError:
+            # The worker holding the job now reports back for it
+            self.app.logger.warning(
+                "Job %s (%s) lost its lease", job["id"], job["type"]
+            )
+            return False
+        except Exception as e:
+            self.app.logger.exception("Job %s (%s) failed", job["id"], job["type"])
+            retry_at = None
+            if job["attempts"] < job["max_attempts"]:
+                retry_at = datetime.utcnow() + retry_backoff(job["attempts"])
+            failed = self.repository.fail(
+                job["id"], job["lease"], f"{type(e).__name__}: {e}", retry_at
+            )
+            if failed and retry_at is None:
+                self._clean_up(job)
+            return False
+        finally:
+            self._current.job = None
+
+        if self.repository.complete(job["id"], job["lease"]):
+            self._clean_up(job)
+        return True
+
+    def _clean_up(self, job: dict) -> None:
+        cleanup = self.cleanups.get(job["type"])
+        if cleanup is None:
+            return
+
+        try:
+            cleanup(job["payload"])
+        except Exception:
+            self.app.logger.exception(
+                "Cleaning up job %s (%s) failed", job["id"], job["type"]
+            )
+
+    def work(
+        self,
+        concurrency: int = 1,
+        burst: bool = False,
+        poll_interval: float = POLL_INTERVAL,
+        stop: Optional[Event] = None,
+    ) -> int:
+        """
+        Run concurrency consumers until stop is set, or with burst until
+        nothing is due. Returns how many jobs were run.
+        """
+        stop = stop or Event()
+        processed = [0] * concurrency
+        with self._idle:
+            self._stops.append(stop)
+            if not self.accepting:
+                stop.set()
+
+        def consume(index: int) -> None:
+            with self.app.app_context():
+                while not stop.is_set():
+                    try:
+                        ran = self.run_one()
+                    except Exception:
+                        self.app.logger.exception("Claiming a job failed")
+                        ran = None
+
+                    if ran is not None:
+                        processed[index] += 1
+                    elif burst:
+                        return
+                    else:
+                        stop.wait(poll_interval)
+
+        consumers = [
+            Thread(
+                target=consume,
+                args=(index,),
+                name=f"job-consumer-{index}",
+                daemon=True,
+            )
+            for index in range(concurrency)
+        ]
+        for consumer in consumers:
+            consumer.start()
+        try:
+            for consumer in consumers:
+                while consumer.is_alive():
+                    consumer.join(0.5)
+        except KeyboardInterrupt:
+            self.shutdown()
+        finally:
+            with self._idle:
+                self._stops.remove(stop)
+        return sum(processed)
+
+    def shutdown(self, timeout: Optional[float] = None) -> dict:
+        """
+        Stop claiming jobs and wait up to timeout seconds, JOB_DRAIN_TIMEOUT
+        by default, for the running ones. Jobs still running after that are
+        released to the queue for another worker to resume right away.
+        """
+        if timeout is None:
+            timeout = self.app.config["JOB_DRAIN_TIMEOUT"]
+
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._idle:
+            self.accepting = False
+            for stop in self._stops:
+                stop.set()
+
+            running = self._active
+            remaining = timeout
+            while self._active and remaining > 0:
+                self._idle.wait(remaining)
+                remaining = deadline - time.monotonic()
+            drained = running - self._active
+            unfinished = dict(self._running)
+
+        released = 0
+        if unfinished:
+            with self.app.app_context():
+                for job_id, lease in unfinished.items():
+                    try:
+                        released += self.repository.release(
+                            job_id, lease, datetime.utcnow()
+                        )
+                    except Exception:
+                        self.app.logger.exception("Releasing job %s failed", job_id)
+
+        report = {
+            "drained": drained,
+            "released": released,
+            "seconds": round(time.monotonic() - start, 3),
+        }
+        if running:
+            self.app.logger.warning(
+                "Drained %d jobs in %.2fs, released %d unfinished ones",
+                report["drained"],
+                report["seconds"],
+                report["released"],
+            )
+        return report
+
+    def get_stats(self) -> Dict[str, int]:
+        return self.repository.count_by_status()
+
+    def retry_dead(self) -> int:
+        return self.repository.retry_dead(datetime.utcnow())
@@ -0,0 +1,78 @@
+import time
+from flask import Flask
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.common.outbox import FileSink
+from app.repositories.outbox import OutboxRepository
+
+OUTBOX_BATCH_SIZE = 500
+# Ids are handed out before commit, so a later id can become visible before
+# an earlier one; events are only read once they are this old
+OUTBOX_SETTLE = timedelta(seconds=5)
+OUTBOX_RETENTION_DAYS = 7
+
+
+class OutboxService:
+    def __init__(self, app: Flask, repository: OutboxRepository) -> None:
+        self.app = app
+        self.repository = repository
+        self.sinks = {}
+        self.register_sink(FileSink(app.config["OUTBOX_FILE"]))
+
+    def register_sink(self, sink) -> None:
+        """
+        Add a sink, anything with a unique name and a deliver(events) method.
+        Each sink keeps its own watermark, a failing one holds back no other.
+        """
+        if sink.name in self.sinks:
+            raise ValueError(f"A sink named {sink.name} is already registered")
+
+        self.sinks[sink.name] = sink
+
+    def dispatch(
+        self, batch_size: int = OUTBOX_BATCH_SIZE, now: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        Deliver events past each sink's watermark in id order, batch_size at
+        a time, moving the watermark after every batch. Delivery is at least
+        once: a batch is sent again when its watermark could not be saved.
+        Returns the number of events delivered per sink.
+        """
+        until = (now or datetime.utcnow()) - OUTBOX_SETTLE
+        delivered = {}
+        for name, sink in self.sinks.items():
+            delivered[name] = 0
+            watermark = self.repository.get_watermark(name)
+            try:
+                while True:
+                    events = self.repository.get_events(watermark, until, batch_size)
+                    if not events:
+                        break
+
+                    sink.deliver(events)
+                    watermark = events[-1]["id"]
+                    self.repository.save_watermark(name, watermark)
+                    delivered[name] += len(events)
+                    if len(events) < batch_size:
+                        break
+            except Exception:
+                self.app.logger.exception("Delivering outbox events to %s", name)
+        return delivered
+
+    def follow(
+        self, interval: float = 1.0, batch_size: int = OUTBOX_BATCH_SIZE
+    ) -> None:
+        while True:
+            if not any(self.dispatch(batch_size).values()):
+                time.sleep(interval)
+
+    def prune(
+        self, days: int = OUTBOX_RETENTION_DAYS, now: Optional[datetime] = None
+    ) -> int:
+        """
+        Delete events older than days that every sink has been sent
+        """
+        up_to_id = self.repository.get_min_watermark(list(self.sinks))
+        before = (now or datetime.utcnow()) - timedelta(days=days)
+        return self.repository.delete_events(up_to_id, before)
@@ -0,0 +1,245 @@
+from flask import Flask
+from threading import Event, Lock, Thread
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from app.models.user import User
+from app.repositories.play import PlayRepository
+from app.repositories.song import SongRepository
+from app.common.pagination import clamp_take
+from app.common.singleflight import SingleFlight
+from app.common.sketch import HyperLogLog, TopK
+from app.common.exceptions import BadRequestException, NotFoundException
+from app.common.messages import PLAY_WINDOW_INVALID, SONG_NOT_FOUND
+from app.models.play import (
+    SKETCH_BUCKET,
+    SKETCH_LISTENERS,
+    SKETCH_TOP_SONGS,
+    bucket_of,
+    month_start,
+)
+
+# Plays are folded into in-process sketches and history rows, written out
+# every so many plays or seconds, whichever comes first. A background thread
+# writes them on the interval even when no more plays come in.
+SKETCH_FLUSH_PLAYS = 1_000
+SKETCH_FLUSH_INTERVAL = timedelta(seconds=10)
+MAX_WINDOW_HOURS = 7 * 24
+# Buckets older than the longest window are dropped on flush
+SKETCH_RETENTION = timedelta(hours=MAX_WINDOW_HOURS) + SKETCH_BUCKET
+HISTORY_RETENTION_MONTHS = 12
+
+
+class PlayService:
+    def __init__(
+        self, app: Flask, repository: PlayRepository, song_repository: SongRepository
+    ) -> None:
+        self.app = app
+        self.repository = repository
+        self.song_repository = song_repository
+        self.singleflight = SingleFlight()
+        self._lock = Lock()
+        self._pending: Dict[Tuple[str, int, datetime], object] = {}
+        self._pending_plays = 0
+        self._history: List[Tuple[int, int, datetime]] = []
+        self._flushed_at = datetime.utcnow()
+        self._stop = Event()
+        self._flusher: Optional[Thread] = None
+
+    def record(
+        self, current_user: User, song_id: int, now: Optional[datetime] = None
+    ) -> None:
+        if not self.song_repository.get_existing_ids([song_id]):
+            raise NotFoundException(SONG_NOT_FOUND)
+
+        now = now or datetime.utcnow()
+        bucket = bucket_of(now)
+        with self._lock:
+            self._sketch(SKETCH_LISTENERS, song_id, bucket, HyperLogLog).add(
+                current_user.id
+            )
+            self._sketch(SKETCH_TOP_SONGS, 0, bucket, TopK).add(song_id)
+            self._history.append((current_user.id, song_id, now))
+            self._pending_plays += 1
+            due = (
+                self._pending_plays >= SKETCH_FLUSH_PLAYS
+                or now - self._flushed_at >= SKETCH_FLUSH_INTERVAL
+            )
+            if self._flusher is None and not self._stop.is_set():
+                self._flusher = Thread(
+                    target=self._flush_periodically, name="play-flusher", daemon=True
+                )
+                self._flusher.start()
+
+        if due:
+            self.flush(now)
+
+    def _sketch(self, kind: str, subject_id: int, bucket: datetime, factory):
+        key = (kind, subject_id, bucket)
+        sketch = self._pending.get(key)
+        if sketch is None:
+            sketch = self._pending[key] = factory()
+        return sketch
+
+    def flush(self, now: Optional[datetime] = None) -> int:
+        """
+        Append the buffered history and merge the sketches of this process
+        into play_sketches, returning how many plays were written. On failure
+        whatever was not written is kept for the next flush.
+        """
+        now = now or datetime.utcnow()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            history, self._history = self._history, []
+            self._pending_plays = 0
+            self._flushed_at = now
+
+        written = len(history)
+        try:
+            if history:
+                self.repository.append_history(history)
+                history = []
+            if pending:
+                self.repository.merge_sketches(pending)
+        except Exception:
+            self._restore(history, pending)
+            raise
+
+        self.repository.delete_sketches_before(bucket_of(now) - SKETCH_RETENTION)
+        return written
+
+    def _has_buffered(self) -> bool:
+        with self._lock:
+            return bool(self._history or self._pending)
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(SKETCH_FLUSH_INTERVAL.total_seconds()):
+            if not self._has_buffered():
+                continue
+            try:
+                with self.app.app_context():
+                    self.flush()
+            except Exception:
+                self.app.logger.exception("Flushing plays failed")
+
+    def shutdown(self) -> int:
+        """
+        Stop the periodic flush and write whatever is still buffered,
+        returning how many plays were written
+        """
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        if not self._has_buffered():
+            return 0
+
+        with self.app.app_context():
+            return self.flush()
+
+    def _restore(self, history: list, pending: dict) -> None:
+        with self._lock:
+            self._history[:0] = history
+            for key, sketch in pending.items():
+                if key in self._pending:
+                    sketch.merge(self._pending[key])
+                self._pending[key] = sketch
+
+    def _window_start(self, hours: int, now: Optional[datetime]) -> datetime:
+        if not 1 <= hours <= MAX_WINDOW_HOURS:
+            raise BadRequestException(PLAY_WINDOW_INVALID.format(MAX_WINDOW_HOURS))
+
+        # The last hours buckets, the one still filling up included
+        return bucket_of(now or datetime.utcnow()) - SKETCH_BUCKET * (hours - 1)
+
+    def _merged(self, kind: str, subject_id: int, since: datetime, factory):
+        merged = factory()
+        for data in self.repository.get_sketches(kind, subject_id, since):
+            merged.merge(factory.from_bytes(data))
+
+        # Plays of this process that are not flushed yet
+        with self._lock:
+            for (pending_kind, pending_id, bucket), sketch in self._pending.items():
+                if (pending_kind, pending_id) == (kind, subject_id) and bucket >= since:
+                    merged.merge(sketch)
+        return merged
+
+    def get_unique_listeners(
+        self, song_id: int, hours: int = 24, now: Optional[datetime] = None
+    ) -> dict:
+        since = self._window_start(hours, now)
+        return self.singleflight.do(
+            ("get_unique_listeners", song_id, since),
+            self._get_unique_listeners,
+            song_id,
+            hours,
+            since,
+        )
+
+    def _get_unique_listeners(self, song_id: int, hours: int, since: datetime) -> dict:
+        listeners = self._merged(SKETCH_LISTENERS, song_id, since, HyperLogLog)
+        return {
+            "song_id": song_id,
+            "window_hours": hours,
+            "unique_listeners": listeners.count(),
+        }
+
+    def get_top_songs(
+        self, hours: int = 24, take: int = 10, now: Optional[datetime] = None
+    ) -> dict:
+        since = self._window_start(hours, now)
+        take = clamp_take(take)
+        return self.singleflight.do(
+            ("get_top_songs", since, take), self._get_top_songs, hours, take, since
+        )
+
+    def _get_top_songs(self, hours: int, take: int, since: datetime) -> dict:
+        top_songs = self._merged(SKETCH_TOP_SONGS, 0, since, TopK)
+        return {
+            "window_hours": hours,
+            "songs": [
+                {"song_id": song_id, "plays": plays}
+                for song_id, plays in top_songs.top(take)
+            ],
+        }
+
+    def get_history(
+        self, current_user: User, before: Optional[datetime] = None, take: int = 20
+    ) -> dict:
+        """
+        Plays of current_user older than before, newest first, keyset
+        paginated: next_before is the before of the following page
+        """
+        take = clamp_take(take)
+        plays = self.repository.get_history(current_user.id, before, take)
+
+        # Plays of this process that are not flushed yet
+        with self._lock:
+            plays += [
+                (song_id, ts)
+                for user_id, song_id, ts in self._history
+                if user_id == current_user.id and (before is None or ts < before)
+            ]
+        plays = sorted(plays, key=lambda play: play[1], reverse=True)[:take]
+
+        return {
+            "plays": [
+                {"song_id": song_id, "played_at": ts.isoformat()}
+                for song_id, ts in plays
+            ],
+            "next_before": (
+                plays[-1][1].isoformat() if plays and len(plays) == take else None
+            ),
+        }
+
+    def prune_history(
+        self, months: int = HISTORY_RETENTION_MONTHS, now: Optional[datetime] = None
+    ) -> List[datetime]:
+        """
+        Drop the history of months before the last months ones, the current
+        month included. Returns the months dropped.
+        """
+        current = month_start(now or datetime.utcnow())
+        first = current.year * 12 + current.month - months
+        return self.repository.drop_history_before(
+            datetime(first // 12, first % 12 + 1, 1)
+        )
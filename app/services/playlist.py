@@ -1,29 +1,56 @@
-from typing import List, Dict
+from itertools import islice
+from typing import Iterator, List, Dict, Optional, Sequence
 
 from app.models.user import User
+from app.common.etag import make_etag
+from app.common.fields import with_id
+from app.common.pagination import MAX_TAKE, clamp_preview, clamp_take
+from app.common.singleflight import SingleFlight
+from app.common.streaming import STREAM_BATCH_SIZE
 from app.repositories.song import SongRepository
 from app.repositories.playlist import PlaylistRepository
+from app.services.job import JobService
 from app.common.exceptions import (
+    BadRequestException,
+    ConflictException,
     FieldRequiredException,
     NotFoundException,
+    PreconditionFailedException,
     UnauthorizedException,
 )
 from app.common.messages import (
+    CONCURRENT_UPDATE,
+    VERSION_MISMATCH,
     SONG_NOT_FOUND,
     PLAYLIST_NOT_FOUND,
+    SONG_NOT_IN_PLAYLIST,
+    SONG_IDS_INVALID,
+    TOO_MANY_SONG_IDS,
     UNAUTHORIZED_TO_DELETE_PLAYLIST,
     UNAUTHORIZED_TO_UPDATE_PLAYLIST,
     UNAUTHORIZED_ADD_SONG_TO_PLAYLIST,
     UNAUTHORIZED_REMOVE_SONG_FROM_PLAYLIST,
+    UNAUTHORIZED_MOVE_SONG_IN_PLAYLIST,
 )
 
 
+REBALANCE_PLAYLIST_JOB = "playlist.rebalance"
+
+
 class PlaylistService:
     def __init__(
-        self, playlist_repository: PlaylistRepository, song_repository: SongRepository
+        self,
+        playlist_repository: PlaylistRepository,
+        song_repository: SongRepository,
+        jobs: Optional[JobService] = None,
     ) -> None:
         self.playlist_repository = playlist_repository
         self.song_repository = song_repository
+        self.singleflight = SingleFlight()
+        # Without a job queue crowded playlists are rebalanced inline
+        self.jobs = jobs
+        if jobs is not None:
+            jobs.register(REBALANCE_PLAYLIST_JOB, self._run_rebalance_job)
 
     def create(self, data: Dict[str, str]) -> None:
         if "title" not in data or not data["title"]:
@@ -31,7 +58,25 @@ class PlaylistService:
 
         self.playlist_repository.create(data)
 
-    def update(self, current_user: User, playlist_id: int, data: dict) -> None:
+    def copy(self, current_user: User, playlist_id: int, data: dict) -> dict:
+        source = self.playlist_repository.get_by_id(playlist_id)
+        if source is None:
+            raise NotFoundException(PLAYLIST_NOT_FOUND)
+
+        data = {
+            "title": data.get("title") or source.title,
+            "user_id": current_user.id,
+        }
+        playlist = self.playlist_repository.copy(source, data)
+        return {"id": playlist.id}
+
+    def update(
+        self,
+        current_user: User,
+        playlist_id: int,
+        data: dict,
+        version: Optional[int] = None,
+    ) -> None:
         playlist = self.playlist_repository.get_by_id(playlist_id)
         if playlist is None:
             raise NotFoundException(PLAYLIST_NOT_FOUND)
@@ -39,7 +84,11 @@ class PlaylistService:
         if current_user.id != playlist.user_id:
             raise UnauthorizedException(UNAUTHORIZED_TO_UPDATE_PLAYLIST)
 
-        self.playlist_repository.update(playlist, data)
+        if version is not None and version != playlist.version:
+            raise PreconditionFailedException(VERSION_MISMATCH)
+
+        if not self.playlist_repository.update(playlist, data, playlist.version):
+            raise ConflictException(CONCURRENT_UPDATE)
 
     def delete(self, current_user: User, playlist_id: int) -> None:
         playlist = self.playlist_repository.get_by_id(playlist_id)
@@ -52,22 +101,246 @@ class PlaylistService:
         self.playlist_repository.delete(playlist)
 
     def get_by_id(
-        self, playlist_id: int, take_songs: int = 10, skip_songs: int = 0
+        self,
+        playlist_id: int,
+        take_songs: int = 10,
+        skip_songs: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        song_fields: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
     ) -> dict:
-        playlist = self.playlist_repository.get_by_id(playlist_id)
-        if playlist is None:
+        take_songs = clamp_take(take_songs)
+        return self.singleflight.do(
+            (
+                "get_by_id",
+                playlist_id,
+                take_songs,
+                skip_songs,
+                fields,
+                song_fields,
+                include,
+            ),
+            self._get_by_id,
+            playlist_id,
+            take_songs,
+            skip_songs,
+            fields,
+            song_fields,
+            include,
+        )
+
+    def _get_by_id(
+        self,
+        playlist_id: int,
+        take_songs: int,
+        skip_songs: int,
+        fields: Optional[Sequence[str]],
+        song_fields: Optional[Sequence[str]],
+        include: Optional[Sequence[str]],
+    ) -> dict:
+        playlist_dict = self.playlist_repository.get_row(playlist_id, fields)
+        if playlist_dict is None:
             raise NotFoundException(PLAYLIST_NOT_FOUND)
 
-        playlist_dict = playlist.to_dict()
-        songs = playlist.get_songs(take_songs, skip_songs)
-        playlist_dict["songs"] = [song.to_dict() for song in songs]
+        include_user = include is not None and "user" in include
+        songs = self.playlist_repository.get_song_rows(
+            playlist_id,
+            take_songs,
+            skip_songs,
+            with_id(song_fields, "user_id") if include_user else song_fields,
+        )
+        if include_user:
+            keep_user_id = song_fields is None or "user_id" in song_fields
+            songs = self.song_repository.embed_users(songs, keep_user_id)
+
+        playlist_dict["songs"] = songs
         return playlist_dict
 
-    def get_all(self, take: int = 10, skip: int = 0) -> List[dict]:
-        playlists = self.playlist_repository.get_all(take, skip)
-        return [playlist.to_dict() for playlist in playlists]
+    def get_many(
+        self, playlist_ids: List[int], fields: Optional[Sequence[str]] = None
+    ) -> List[Optional[dict]]:
+        """
+        Rows for every id in the given order, None where the id does not exist
+        """
+        return self.singleflight.do(
+            ("get_many", tuple(playlist_ids), fields),
+            self._get_many,
+            playlist_ids,
+            fields,
+        )
+
+    def _get_many(
+        self, playlist_ids: List[int], fields: Optional[Sequence[str]]
+    ) -> List[Optional[dict]]:
+        rows = self.playlist_repository.get_rows_by_ids(
+            list(dict.fromkeys(playlist_ids)), fields
+        )
+        return [rows.get(id_) for id_ in playlist_ids]
+
+    def get_etag(
+        self,
+        playlist_id: int,
+        take_songs: int = 10,
+        skip_songs: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        song_fields: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> str:
+        revision = self.playlist_repository.get_revision(playlist_id)
+        if revision is None:
+            raise NotFoundException(PLAYLIST_NOT_FOUND)
+
+        user_revision = self.song_repository.get_user_revision() if include else ()
+        return make_etag(
+            "playlist",
+            *revision,
+            clamp_take(take_songs),
+            skip_songs,
+            fields,
+            song_fields,
+            include,
+            *user_revision,
+        )
 
-    def add_song(self, current_user: User, playlist_id: int, song_id: int) -> None:
+    def get_all_etag(
+        self,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        song_count: bool = False,
+        preview: int = 0,
+        song_fields: Optional[Sequence[str]] = None,
+    ) -> str:
+        revision = self.playlist_repository.get_all_revision()
+        preview = clamp_preview(preview)
+        song_revision = self.song_repository.get_all_revision() if preview else ()
+        return make_etag(
+            "playlists",
+            *revision,
+            *song_revision,
+            clamp_take(take),
+            skip,
+            fields,
+            song_count,
+            preview,
+            song_fields,
+        )
+
+    def get_all(
+        self,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        song_count: bool = False,
+        preview: int = 0,
+        song_fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        take = clamp_take(take)
+        preview = clamp_preview(preview)
+        if not song_count and not preview:
+            return self.singleflight.do(
+                ("get_all", take, skip, fields), self._get_all, take, skip, fields
+            )
+
+        return self.singleflight.do(
+            ("get_all", take, skip, fields, song_count, preview, song_fields),
+            self._get_all_with_songs,
+            take,
+            skip,
+            fields,
+            song_count,
+            preview,
+            song_fields,
+        )
+
+    def _get_all(
+        self, take: int, skip: int, fields: Optional[Sequence[str]]
+    ) -> List[dict]:
+        return self.playlist_repository.get_all_rows(take, skip, fields)
+
+    def _get_all_with_songs(
+        self,
+        take: int,
+        skip: int,
+        fields: Optional[Sequence[str]],
+        song_count: bool,
+        preview: int,
+        song_fields: Optional[Sequence[str]],
+    ) -> List[dict]:
+        """
+        Playlists plus their song counts and first songs, in three queries
+        whatever the page size
+        """
+        playlists = self.playlist_repository.get_all_rows(take, skip, with_id(fields))
+        return self._with_songs(playlists, fields, song_count, preview, song_fields)
+
+    def _with_songs(
+        self,
+        playlists: List[dict],
+        fields: Optional[Sequence[str]],
+        song_count: bool,
+        preview: int,
+        song_fields: Optional[Sequence[str]],
+    ) -> List[dict]:
+        """
+        Set song counts and first songs on playlists read with their ids
+        """
+        keep_id = fields is None or "id" in fields
+        playlist_ids = [playlist["id"] for playlist in playlists]
+        counts = (
+            self.playlist_repository.get_song_counts(playlist_ids) if song_count else {}
+        )
+        previews = self.playlist_repository.get_song_previews(
+            playlist_ids, preview, song_fields
+        )
+
+        for playlist in playlists:
+            playlist_id = playlist["id"] if keep_id else playlist.pop("id")
+            if song_count:
+                playlist["song_count"] = counts.get(playlist_id, 0)
+            if preview:
+                playlist["songs"] = previews.get(playlist_id, [])
+        return playlists
+
+    def iter_all(
+        self,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        song_count: bool = False,
+        preview: int = 0,
+        song_fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        preview = clamp_preview(preview)
+        if not song_count and not preview:
+            return self.playlist_repository.iter_all_rows(take, skip, fields)
+
+        rows = self.playlist_repository.iter_all_rows(take, skip, with_id(fields))
+        return self._iter_with_songs(rows, fields, song_count, preview, song_fields)
+
+    def _iter_with_songs(
+        self,
+        rows: Iterator[dict],
+        fields: Optional[Sequence[str]],
+        song_count: bool,
+        preview: int,
+        song_fields: Optional[Sequence[str]],
+    ) -> Iterator[dict]:
+        # Counts and previews are loaded one stream batch at a time, memory
+        # stays flat
+        while True:
+            batch = list(islice(rows, STREAM_BATCH_SIZE))
+            if not batch:
+                return
+            yield from self._with_songs(batch, fields, song_count, preview, song_fields)
+
+    def add_song(
+        self,
+        current_user: User,
+        playlist_id: int,
+        song_id: int,
+        index: Optional[int] = None,
+    ) -> None:
         playlist = self.playlist_repository.get_by_id(playlist_id)
         if playlist is None:
             raise NotFoundException(PLAYLIST_NOT_FOUND)
@@ -79,7 +352,77 @@ class PlaylistService:
         if song is None:
             raise NotFoundException(SONG_NOT_FOUND)
 
-        self.playlist_repository.add_song(playlist, song)
+        if self.playlist_repository.add_song(playlist, song, index):
+            self._schedule_rebalance(playlist_id)
+
+    def add_songs(
+        self, current_user: User, playlist_id: int, song_ids: List[int]
+    ) -> dict:
+        self._validate_song_ids(song_ids)
+
+        playlist = self.playlist_repository.get_by_id(playlist_id)
+        if playlist is None:
+            raise NotFoundException(PLAYLIST_NOT_FOUND)
+
+        if playlist.user_id != current_user.id:
+            raise UnauthorizedException(UNAUTHORIZED_ADD_SONG_TO_PLAYLIST)
+
+        song_ids = list(dict.fromkeys(song_ids))
+        existing = self.song_repository.get_existing_ids(song_ids)
+        added = self.playlist_repository.add_songs(
+            playlist, [id_ for id_ in song_ids if id_ in existing]
+        )
+        return {
+            "added": added,
+            "missing": [id_ for id_ in song_ids if id_ not in existing],
+        }
+
+    def remove_songs(
+        self, current_user: User, playlist_id: int, song_ids: List[int]
+    ) -> dict:
+        self._validate_song_ids(song_ids)
+
+        playlist = self.playlist_repository.get_by_id(playlist_id)
+        if playlist is None:
+            raise NotFoundException(PLAYLIST_NOT_FOUND)
+
+        if playlist.user_id != current_user.id:
+            raise UnauthorizedException(UNAUTHORIZED_REMOVE_SONG_FROM_PLAYLIST)
+
+        song_ids = list(dict.fromkeys(song_ids))
+        removed = self.playlist_repository.remove_songs(playlist, song_ids)
+        return {
+            "removed": removed,
+            "missing": [id_ for id_ in song_ids if id_ not in removed],
+        }
+
+    def _validate_song_ids(self, song_ids: List[int]) -> None:
+        if not song_ids:
+            raise FieldRequiredException("song_ids")
+
+        if not isinstance(song_ids, list) or any(
+            type(id_) is not int for id_ in song_ids
+        ):
+            raise BadRequestException(SONG_IDS_INVALID)
+
+        if len(song_ids) > MAX_TAKE:
+            raise BadRequestException(TOO_MANY_SONG_IDS.format(MAX_TAKE))
+
+    def move_song(
+        self, current_user: User, playlist_id: int, song_id: int, index: int
+    ) -> None:
+        playlist = self.playlist_repository.get_by_id(playlist_id)
+        if playlist is None:
+            raise NotFoundException(PLAYLIST_NOT_FOUND)
+
+        if playlist.user_id != current_user.id:
+            raise UnauthorizedException(UNAUTHORIZED_MOVE_SONG_IN_PLAYLIST)
+
+        if not self.playlist_repository.has_song(playlist, song_id):
+            raise NotFoundException(SONG_NOT_IN_PLAYLIST)
+
+        if self.playlist_repository.move_song(playlist, song_id, index):
+            self._schedule_rebalance(playlist_id)
 
     def remove_song(self, current_user: User, playlist_id: int, song_id: int) -> None:
         playlist = self.playlist_repository.get_by_id(playlist_id)
@@ -94,3 +437,15 @@ class PlaylistService:
             raise NotFoundException(SONG_NOT_FOUND)
 
         self.playlist_repository.remove_song(playlist, song)
+
+    def _schedule_rebalance(self, playlist_id: int) -> None:
+        if self.jobs is None:
+            self.playlist_repository.rebalance(playlist_id)
+            return None
+
+        self.jobs.start(REBALANCE_PLAYLIST_JOB, {"playlist_id": playlist_id})
+
+    def _run_rebalance_job(self, payload: dict) -> None:
+        # Failing the job retries it later against the newer order
+        if not self.playlist_repository.rebalance(payload["playlist_id"]):
+            raise ConflictException(CONCURRENT_UPDATE)
@@ -1,31 +1,64 @@
 import base64
 from flask import Flask
+from itertools import islice
 from threading import Thread
-from typing import Callable, List, Dict
+from typing import Callable, Iterator, List, Dict, Optional, Sequence
 from werkzeug.datastructures import FileStorage
 
 from app.models.user import User
 from app.repositories.song import SongRepository
-from app.common.file import process_files_to_streams
+from app.common.etag import make_etag
+from app.common.fields import with_id
+from app.common.pagination import clamp_take
+from app.common.streaming import STREAM_BATCH_SIZE
+from app.common.similarity import similar_songs
+from app.services.job import JobService
+from app.common.file import (
+    process_files_to_streams,
+    remove_staged_files,
+    stage_files,
+)
+from app.common.singleflight import SingleFlight
 from app.common.exceptions import (
     NotFoundException,
     UnauthorizedException,
     FieldRequiredException,
+    PreconditionFailedException,
 )
 from app.common.messages import (
+    CONCURRENT_UPDATE,
+    VERSION_MISMATCH,
     SONG_NOT_FOUND,
     UNAUTHORIZED_TO_DELETE_SONG,
     UNAUTHORIZED_TO_UPDATE_SONG,
 )
 
 
+CREATE_SONG_JOB = "song.create"
+UPDATE_SONG_JOB = "song.update"
+# Updates without If-Match apply to the current version, retried this many
+# times when another write lands between reading and swapping it
+UPDATE_ATTEMPTS = 3
+
+
 class SongService:
     def __init__(
-        self, app: Flask, repository: SongRepository, upload_file: Callable
+        self,
+        app: Flask,
+        repository: SongRepository,
+        upload_file: Callable,
+        jobs: Optional[JobService] = None,
     ) -> None:
         self.app = app
         self.repository = repository
         self.upload_file = upload_file
+        self.singleflight = SingleFlight()
+        # Without a job queue uploads run on plain threads and are lost if
+        # the process goes away before they finish
+        self.jobs = jobs
+        if jobs is not None:
+            jobs.register(CREATE_SONG_JOB, self._run_create_job, self._clean_up_job)
+            jobs.register(UPDATE_SONG_JOB, self._run_update_job, self._clean_up_job)
 
     def create(self, files: Dict[str, FileStorage], song_data: dict) -> None:
         if "title" not in song_data or not song_data:
@@ -34,16 +67,45 @@ class SongService:
         if "song_file" not in files or not files["song_file"]:
             raise FieldRequiredException("song_file")
 
+        if self.jobs is not None:
+            files = stage_files(files, self.app.config["UPLOAD_STAGING_DIR"])
+            self.jobs.start(CREATE_SONG_JOB, {"files": files, "song_data": song_data})
+            return
+
         files = process_files_to_streams(files)
         thread = Thread(target=self._create, args=(files, song_data))
         thread.start()
 
+    def _run_create_job(self, payload: dict) -> None:
+        # A run that lost its lease to this one may have created the song
+        job_id = self.jobs.current_job_id()
+        if self.repository.get_by_job_id(job_id) is not None:
+            return
+
+        self._create(payload["files"], {**payload["song_data"], "job_id": job_id})
+
+    def _run_update_job(self, payload: dict) -> None:
+        self._update(
+            payload["song_id"],
+            payload["files"],
+            payload["song_data"],
+            payload["version"],
+        )
+
+    def _clean_up_job(self, payload: dict) -> None:
+        remove_staged_files(payload["files"])
+
+    def _upload(self, files: dict, song_data: dict) -> None:
+        for key, file in files.items():
+            if self.jobs is not None:
+                # Keeps the job from being claimed again while uploads run
+                self.jobs.heartbeat()
+            key_data = key.replace("file", "url")
+            song_data[key_data] = self.upload_file(file)
+
     def _create(self, files: dict, song_data: dict) -> None:
         with self.app.app_context():
-            for key, file in files.items():
-                key_data = key.replace("file", "url")
-                song_data[key_data] = self.upload_file(file)
-
+            self._upload(files, song_data)
             self.repository.create(song_data)
 
     def update(
@@ -52,6 +114,7 @@ class SongService:
         song_id: int,
         files: Dict[str, FileStorage],
         song_data: dict,
+        version: Optional[int] = None,
     ) -> None:
         song = self.repository.get_by_id(song_id)
         if song is None:
@@ -60,18 +123,42 @@ class SongService:
         if current_user.id != song.user_id:
             raise UnauthorizedException(UNAUTHORIZED_TO_UPDATE_SONG)
 
+        if version is not None and version != song.version:
+            raise PreconditionFailedException(VERSION_MISMATCH)
+
+        if self.jobs is not None:
+            payload = {
+                "song_id": song_id,
+                "files": stage_files(files, self.app.config["UPLOAD_STAGING_DIR"]),
+                "song_data": song_data,
+                "version": version,
+            }
+            self.jobs.start(UPDATE_SONG_JOB, payload)
+            return
+
         files = process_files_to_streams(files)
-        thread = Thread(target=self._update, args=(song_id, files, song_data))
+        thread = Thread(target=self._update, args=(song_id, files, song_data, version))
         thread.start()
 
-    def _update(self, song_id: int, files: dict, song_data: dict) -> None:
+    def _update(
+        self, song_id: int, files: dict, song_data: dict, version: Optional[int]
+    ) -> None:
         with self.app.app_context():
-            for key, file in files.items():
-                key_data = key.replace("file", "url")
-                song_data[key_data] = self.upload_file(file)
+            self._upload(files, song_data)
 
-            song = self.repository.get_by_id(song_id)
-            self.repository.update(song, song_data)
+            # Only a version the client pinned with If-Match can be lost to
+            # a concurrent write, otherwise the latest one is updated
+            attempts = UPDATE_ATTEMPTS if version is None else 1
+            for _ in range(attempts):
+                song = self.repository.get_by_id(song_id)
+                if song is None:
+                    break
+                if self.repository.update(song, song_data, version):
+                    return
+
+            self.app.logger.warning(
+                "Dropped update of song %s: %s", song_id, CONCURRENT_UPDATE
+            )
 
     def delete(self, current_user: User, song_id: int) -> None:
         song = self.repository.get_by_id(song_id)
@@ -83,13 +170,197 @@ class SongService:
 
         self.repository.delete(song)
 
-    def get_by_id(self, song_id: int) -> dict:
-        song = self.repository.get_by_id(song_id)
+    def get_by_id(
+        self,
+        song_id: int,
+        fields: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> dict:
+        return self.singleflight.do(
+            ("get_by_id", song_id, fields, include),
+            self._get_by_id,
+            song_id,
+            fields,
+            include,
+        )
+
+    def _get_by_id(
+        self,
+        song_id: int,
+        fields: Optional[Sequence[str]],
+        include: Optional[Sequence[str]],
+    ) -> dict:
+        song = self.repository.get_row(song_id, self._query_fields(fields, include))
         if song is None:
             raise NotFoundException(SONG_NOT_FOUND)
 
-        return song.to_dict()
+        return self._include([song], fields, include)[0]
+
+    def get_similar(
+        self,
+        song_id: int,
+        take: int = 10,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        take = clamp_take(take)
+        return self.singleflight.do(
+            ("get_similar", song_id, take, fields),
+            self._get_similar,
+            song_id,
+            take,
+            fields,
+        )
+
+    def _get_similar(
+        self, song_id: int, take: int, fields: Optional[Sequence[str]]
+    ) -> List[dict]:
+        songs = self.repository.get_similar_rows(song_id, take, fields)
+        if not songs and not self.repository.get_existing_ids([song_id]):
+            raise NotFoundException(SONG_NOT_FOUND)
+
+        return songs
 
-    def get_all(self, take: int = 10, skip: int = 0) -> List[dict]:
-        songs = self.repository.get_all(take, skip)
-        return [song.to_dict() for song in songs]
+    def rebuild_similar(self) -> int:
+        """
+        Recompute the similar songs of every song from playlist co-occurrence
+        """
+        chunks = similar_songs(self.repository.iter_memberships())
+        return self.repository.replace_similar(chunks)
+
+    def get_many(
+        self,
+        song_ids: List[int],
+        fields: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> List[Optional[dict]]:
+        """
+        Rows for every id in the given order, None where the id does not exist
+        """
+        return self.singleflight.do(
+            ("get_many", tuple(song_ids), fields, include),
+            self._get_many,
+            song_ids,
+            fields,
+            include,
+        )
+
+    def _get_many(
+        self,
+        song_ids: List[int],
+        fields: Optional[Sequence[str]],
+        include: Optional[Sequence[str]],
+    ) -> List[Optional[dict]]:
+        rows = self.repository.get_rows_by_ids(
+            list(dict.fromkeys(song_ids)), self._query_fields(fields, include)
+        )
+        songs = [rows.get(id_) for id_ in song_ids]
+        return self._include(songs, fields, include)
+
+    def get_etag(
+        self,
+        song_id: int,
+        fields: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> str:
+        revision = self.repository.get_revision(song_id)
+        if revision is None:
+            raise NotFoundException(SONG_NOT_FOUND)
+
+        return make_etag("song", *revision, fields, *self._include_revision(include))
+
+    def get_all_etag(
+        self,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> str:
+        revision = self.repository.get_all_revision()
+        return make_etag(
+            "songs",
+            *revision,
+            clamp_take(take),
+            skip,
+            fields,
+            *self._include_revision(include),
+        )
+
+    def get_all(
+        self,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        take = clamp_take(take)
+        return self.singleflight.do(
+            ("get_all", take, skip, fields, include),
+            self._get_all,
+            take,
+            skip,
+            fields,
+            include,
+        )
+
+    def _get_all(
+        self,
+        take: int,
+        skip: int,
+        fields: Optional[Sequence[str]],
+        include: Optional[Sequence[str]],
+    ) -> List[dict]:
+        songs = self.repository.get_all_rows(
+            take, skip, self._query_fields(fields, include)
+        )
+        return self._include(songs, fields, include)
+
+    def _query_fields(
+        self, fields: Optional[Sequence[str]], include: Optional[Sequence[str]]
+    ) -> Optional[Sequence[str]]:
+        return with_id(fields, "user_id") if include else fields
+
+    def _include(
+        self,
+        songs: List[Optional[dict]],
+        fields: Optional[Sequence[str]],
+        include: Optional[Sequence[str]],
+    ) -> List[Optional[dict]]:
+        if not include or "user" not in include:
+            return songs
+
+        keep_user_id = fields is None or "user_id" in fields
+        return self.repository.embed_users(songs, keep_user_id)
+
+    def _include_revision(self, include: Optional[Sequence[str]]) -> tuple:
+        if not include:
+            return ()
+
+        return (include, *self.repository.get_user_revision())
+
+    def iter_all(
+        self,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        include: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
+        rows = self.repository.iter_all_rows(
+            take, skip, self._query_fields(fields, include)
+        )
+        if not include:
+            return rows
+
+        return self._iter_included(rows, fields, include)
+
+    def _iter_included(
+        self,
+        rows: Iterator[dict],
+        fields: Optional[Sequence[str]],
+        include: Optional[Sequence[str]],
+    ) -> Iterator[dict]:
+        # Uploaders are loaded one stream batch at a time, memory stays flat
+        while True:
+            batch = list(islice(rows, STREAM_BATCH_SIZE))
+            if not batch:
+                return
+            yield from self._include(batch, fields, include)
@@ -1,14 +1,28 @@
-from typing import List
+from itertools import islice
+from typing import Iterator, List, Optional, Sequence
 
 from app.models.user import User
 from app.common.messages import USER_NOT_FOUND
 from app.repositories.user import UserRepository
 from app.common.exceptions import NotFoundException
+from app.common.fields import with_id
+from app.common.graph import FollowGraph, FollowGraphStore
+from app.common.pagination import clamp_take
+from app.common.singleflight import SingleFlight
+from app.common.streaming import STREAM_BATCH_SIZE
+
+SUGGESTION_OVERFETCH = 2
 
 
 class UserService:
-    def __init__(self, repository: UserRepository):
+    def __init__(
+        self,
+        repository: UserRepository,
+        follow_graph: Optional[FollowGraphStore] = None,
+    ):
         self.repository = repository
+        self.follow_graph = follow_graph
+        self.singleflight = SingleFlight()
 
     def follow(self, from_user: User, to_id: int):
         to_user = self.repository.get_by_id(to_id)
@@ -24,28 +38,227 @@ class UserService:
 
         self.repository.unfollow(from_user, to_user)
 
-    def get_followers(self, user_id: int, take: int = 10, skip: int = 0) -> List[dict]:
+    def get_many(
+        self, user_ids: List[int], fields: Optional[Sequence[str]] = None
+    ) -> List[Optional[dict]]:
+        """
+        Rows for every id in the given order, None where the id does not exist
+        """
+        return self.singleflight.do(
+            ("get_many", tuple(user_ids), fields),
+            self._get_many,
+            user_ids,
+            fields,
+        )
+
+    def _get_many(
+        self, user_ids: List[int], fields: Optional[Sequence[str]]
+    ) -> List[Optional[dict]]:
+        rows = self.repository.get_rows_by_ids(list(dict.fromkeys(user_ids)), fields)
+        return [rows.get(id_) for id_ in user_ids]
+
+    def get_followers(
+        self,
+        user_id: int,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        viewer_id: Optional[int] = None,
+    ) -> List[dict]:
+        take = clamp_take(take)
+        return self.singleflight.do(
+            ("get_followers", user_id, take, skip, fields, viewer_id),
+            self._get_followers,
+            user_id,
+            take,
+            skip,
+            fields,
+            viewer_id,
+        )
+
+    def _get_followers(
+        self,
+        user_id: int,
+        take: int,
+        skip: int,
+        fields: Optional[Sequence[str]],
+        viewer_id: Optional[int],
+    ) -> List[dict]:
         user = self.repository.get_by_id(user_id)
         if user is None:
             raise NotFoundException(USER_NOT_FOUND)
 
-        users = user.get_followers(take, skip)
-        return [user.to_dict() for user in users]
+        if viewer_id is None:
+            return self.repository.get_follower_rows(user_id, take, skip, fields)
+
+        users = self.repository.get_follower_rows(user_id, take, skip, with_id(fields))
+        return self._flag_followed(users, fields, viewer_id)
 
     def get_followed_users(
-        self, user_id: int, take: int = 10, skip: int = 0
+        self,
+        user_id: int,
+        take: int = 10,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        viewer_id: Optional[int] = None,
+    ) -> List[dict]:
+        take = clamp_take(take)
+        return self.singleflight.do(
+            ("get_followed_users", user_id, take, skip, fields, viewer_id),
+            self._get_followed_users,
+            user_id,
+            take,
+            skip,
+            fields,
+            viewer_id,
+        )
+
+    def _get_followed_users(
+        self,
+        user_id: int,
+        take: int,
+        skip: int,
+        fields: Optional[Sequence[str]],
+        viewer_id: Optional[int],
+    ) -> List[dict]:
+        user = self.repository.get_by_id(user_id)
+        if user is None:
+            raise NotFoundException(USER_NOT_FOUND)
+
+        if viewer_id is None:
+            return self.repository.get_followed_user_rows(user_id, take, skip, fields)
+
+        users = self.repository.get_followed_user_rows(
+            user_id, take, skip, with_id(fields)
+        )
+        return self._flag_followed(users, fields, viewer_id)
+
+    def _flag_followed(
+        self, users: List[dict], fields: Optional[Sequence[str]], viewer_id: int
+    ) -> List[dict]:
+        """
+        Set is_followed_by_me on a page of users with a single query
+        """
+        followed = self.repository.get_followed_ids(
+            viewer_id, [user["id"] for user in users]
+        )
+        keep_id = fields is None or "id" in fields
+        for user in users:
+            user_id = user["id"] if keep_id else user.pop("id")
+            user["is_followed_by_me"] = user_id in followed
+        return users
+
+    def snapshot_follow_graph(self) -> dict:
+        """
+        Rebuild the follow graph snapshot that suggestions are served from
+        """
+        graph = FollowGraph.from_edges(self.repository.iter_follow_edges())
+        name = self.follow_graph.save(graph)
+        return {
+            "snapshot": name,
+            "users": len(graph.user_ids),
+            "follows": len(graph.indices),
+        }
+
+    def get_suggestions(
+        self,
+        user_id: int,
+        take: int = 10,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        take = clamp_take(take)
+        return self.singleflight.do(
+            ("get_suggestions", user_id, take, fields),
+            self._get_suggestions,
+            user_id,
+            take,
+            fields,
+        )
+
+    def _get_suggestions(
+        self, user_id: int, take: int, fields: Optional[Sequence[str]]
+    ) -> List[dict]:
+        graph = self.follow_graph.load() if self.follow_graph else None
+        if graph is None:
+            return []
+
+        # The snapshot lags behind: over-fetch so that users followed or
+        # deleted since it was taken can be dropped without a short page
+        suggestions = graph.suggest(user_id, take * SUGGESTION_OVERFETCH)
+        ids = [suggested_id for suggested_id, _ in suggestions]
+        followed = self.repository.get_followed_ids(user_id, ids)
+        rows = self.repository.get_rows_by_ids(
+            [id_ for id_ in ids if id_ not in followed], fields
+        )
+
+        users = []
+        for suggested_id, mutual_count in suggestions:
+            if suggested_id in rows:
+                users.append({**rows[suggested_id], "mutual_count": mutual_count})
+        return users[:take]
+
+    def get_songs(
+        self,
+        user_id: int,
+        take: int = 10,
+        skip=0,
+        fields: Optional[Sequence[str]] = None,
     ) -> List[dict]:
         user = self.repository.get_by_id(user_id)
         if user is None:
             raise NotFoundException(USER_NOT_FOUND)
 
-        users = user.get_followed_users(take, skip)
-        return [user.to_dict() for user in users]
+        return self.repository.get_song_rows(user_id, clamp_take(take), skip, fields)
+
+    def iter_followers(
+        self,
+        user_id: int,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        viewer_id: Optional[int] = None,
+    ) -> Iterator[dict]:
+        if viewer_id is None:
+            return self.repository.iter_follower_rows(user_id, take, skip, fields)
+
+        rows = self.repository.iter_follower_rows(user_id, take, skip, with_id(fields))
+        return self._iter_flagged(rows, fields, viewer_id)
+
+    def iter_followed_users(
+        self,
+        user_id: int,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+        viewer_id: Optional[int] = None,
+    ) -> Iterator[dict]:
+        if viewer_id is None:
+            return self.repository.iter_followed_user_rows(user_id, take, skip, fields)
+
+        rows = self.repository.iter_followed_user_rows(
+            user_id, take, skip, with_id(fields)
+        )
+        return self._iter_flagged(rows, fields, viewer_id)
+
+    def _iter_flagged(
+        self, rows: Iterator[dict], fields: Optional[Sequence[str]], viewer_id: int
+    ) -> Iterator[dict]:
+        # Flagged one stream batch at a time, memory stays flat
+        while True:
+            batch = list(islice(rows, STREAM_BATCH_SIZE))
+            if not batch:
+                return
+            yield from self._flag_followed(batch, fields, viewer_id)
 
-    def get_songs(self, user_id: int, take: int = 10, skip=0) -> List[dict]:
+    def iter_songs(
+        self,
+        user_id: int,
+        take: Optional[int] = None,
+        skip: int = 0,
+        fields: Optional[Sequence[str]] = None,
+    ) -> Iterator[dict]:
         user = self.repository.get_by_id(user_id)
         if user is None:
             raise NotFoundException(USER_NOT_FOUND)
 
-        songs = user.get_songs(take, skip)
-        return [song.to_dict() for song in songs]
+        return self.repository.iter_song_rows(user_id, take, skip, fields)
@@ -0,0 +1,129 @@
+"""
+Weekly cohort retention at scale.
+
+Feeds USERS synthetic users, signed up over a year with a few logins each,
+through CohortMatrix in chunks the size the cohort job reads, and reports
+users/sec of the vectorised aggregation alone. With --db-users, also seeds a
+throwaway SQLite database and times the whole job (streaming users and their
+logins through AnalyticsService.build_cohorts).
+
+    python -m benchmarks.cohorts --users 10000000 --db-users 200000
+"""
+import time
+import argparse
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from benchmarks.common import benchmark_app
+
+START = date(2021, 1, 4)
+END = date(2021, 12, 26)
+
+
+def synthetic_chunks(num_users: int, chunk_size: int, logins_per_user: int, rng):
+    first_day = (START - date(1970, 1, 1)).days
+    span = (END - START).days + 1
+    for first_id in range(1, num_users + 1, chunk_size):
+        user_ids = np.arange(first_id, min(first_id + chunk_size, num_users + 1))
+        signup_days = first_day + rng.integers(0, span, len(user_ids))
+        activity_user_ids = np.repeat(user_ids, logins_per_user)
+        activity_days = np.repeat(signup_days, logins_per_user) + rng.integers(
+            0, span, len(activity_user_ids)
+        )
+        yield user_ids, signup_days, activity_user_ids, activity_days
+
+
+def bench_matrix(num_users: int, chunk_size: int, logins_per_user: int) -> None:
+    from app.common.cohorts import CohortMatrix
+
+    rng = np.random.default_rng(0)
+    matrix = CohortMatrix(START, END)
+    elapsed = 0.0
+    # Chunks are generated lazily to keep memory flat; only add() is timed
+    for chunk in synthetic_chunks(num_users, chunk_size, logins_per_user, rng):
+        start = time.perf_counter()
+        matrix.add(*chunk)
+        elapsed += time.perf_counter() - start
+
+    print(
+        f"matrix: {num_users} users, {num_users * logins_per_user} logins, "
+        f"{matrix.weeks} weeks in {elapsed:.2f}s ({num_users / elapsed:,.0f} users/s)"
+    )
+
+
+def seed(db, num_users: int, logins_per_user: int) -> None:
+    from app.models.user import User
+    from app.models.analytics import ACTIVITY_LOGIN, daily_activity
+
+    rng = np.random.default_rng(0)
+    span = (END - START).days + 1
+    batch = 50_000
+    for first_id in range(1, num_users + 1, batch):
+        ids = range(first_id, min(first_id + batch, num_users + 1))
+        signups = [
+            START + timedelta(days=int(day)) for day in rng.integers(0, span, len(ids))
+        ]
+        db.session.bulk_insert_mappings(
+            User,
+            [
+                {
+                    "id": id_,
+                    "username": f"bench-{id_}",
+                    "email": f"bench-{id_}@bench.com",
+                    "_password": "bench",
+                    "created_at": datetime.combine(signup, datetime.min.time()),
+                }
+                for id_, signup in zip(ids, signups)
+            ],
+        )
+        db.session.execute(
+            daily_activity.insert(),
+            [
+                {
+                    "kind": ACTIVITY_LOGIN,
+                    "day": signup + timedelta(days=int(offset)),
+                    "subject_id": id_,
+                }
+                for id_, signup in zip(ids, signups)
+                for offset in set(rng.integers(1, span, logins_per_user).tolist())
+            ],
+        )
+        db.session.commit()
+
+
+def bench_job(num_users: int, logins_per_user: int) -> None:
+    with benchmark_app() as (_, db):
+        from app.services.analytics import AnalyticsService
+        from app.repositories.analytics import AnalyticsRepository
+
+        seed(db, num_users, logins_per_user)
+        service = AnalyticsService(AnalyticsRepository(db))
+
+        start = time.perf_counter()
+        service.build_cohorts(START, END)
+        elapsed = time.perf_counter() - start
+
+        print(
+            f"job:    {num_users} users from SQLite in {elapsed:.2f}s "
+            f"({num_users / elapsed:,.0f} users/s)"
+        )
+
+
+def main():
+    from app.services.analytics import COHORT_CHUNK_SIZE
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000_000)
+    parser.add_argument("--logins", type=int, default=3)
+    parser.add_argument("--chunk", type=int, default=COHORT_CHUNK_SIZE)
+    parser.add_argument("--db-users", type=int, default=0)
+    args = parser.parse_args()
+
+    bench_matrix(args.users, args.chunk, args.logins)
+    if args.db_users:
+        bench_job(args.db_users, args.logins)
+
+
+if __name__ == "__main__":
+    main()
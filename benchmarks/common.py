@@ -0,0 +1,57 @@
+import os
+import time
+import tempfile
+from threading import Lock
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import event
+
+
+@contextmanager
+def benchmark_app() -> Iterator:
+    """
+    Create an app bound to a throwaway on-disk SQLite database
+    """
+    directory = tempfile.mkdtemp()
+    os.environ["TEST_DATABASE_URL"] = "sqlite:///" + os.path.join(
+        directory, "benchmark.sqlite"
+    )
+
+    from app import create_app, db
+    from app.common.shutdown import shutdown
+
+    app = create_app("testing")
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ["TEST_DATABASE_URL"]
+    with app.app_context():
+        db.create_all()
+        yield app, db
+        db.session.remove()
+        db.drop_all()
+    shutdown(app)
+
+
+class QueryCounter:
+    """
+    Count statements sent to the database, optionally adding a fixed delay per
+    statement to emulate a networked database
+    """
+
+    def __init__(self, engine, latency: float = 0.0) -> None:
+        self.engine = engine
+        self.latency = latency
+        self.count = 0
+        self._lock = Lock()
+
+    def _before_cursor_execute(self, *args) -> None:
+        with self._lock:
+            self.count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *args) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
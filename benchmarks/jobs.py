@@ -0,0 +1,54 @@
+"""
+Job queue throughput.
+
+Enqueues JOBS no-op jobs into a throwaway SQLite database and drains them
+with JobService.work in burst mode, reporting jobs/sec for each number of
+concurrent consumers. Every job is a claim and a delete, so this measures
+the queue's own overhead; a handler's work adds on top.
+
+    python -m benchmarks.jobs --jobs 5000 --concurrency 1 4 8
+"""
+import time
+import argparse
+
+from benchmarks.common import benchmark_app
+
+NOOP_JOB = "bench.noop"
+
+
+def bench(num_jobs: int, concurrency: int) -> None:
+    with benchmark_app() as (app, db):
+        from app.models.job import Job
+
+        jobs = app.extensions["jobs"]
+        jobs.register(NOOP_JOB, lambda payload: None)
+
+        start = time.perf_counter()
+        for index in range(num_jobs):
+            jobs.enqueue(NOOP_JOB, {"index": index})
+        enqueued = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ran = jobs.work(concurrency=concurrency, burst=True, poll_interval=0.01)
+        elapsed = time.perf_counter() - start
+
+        left = db.session.query(Job).count()
+        print(
+            f"concurrency {concurrency}: enqueued {num_jobs} in {enqueued:.2f}s "
+            f"({num_jobs / enqueued:,.0f} jobs/s), ran {ran} in {elapsed:.2f}s "
+            f"({ran / elapsed:,.0f} jobs/s), {left} left"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        bench(args.jobs, concurrency)
+
+
+if __name__ == "__main__":
+    main()
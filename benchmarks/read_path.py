@@ -0,0 +1,78 @@
+"""
+ORM vs Core read path for list endpoints.
+
+Serializes the same page of songs through Song.paginate + to_dict and through
+SongRepository.get_all_rows, and reports rows/sec for each page size.
+
+    python -m benchmarks.read_path --songs 5000 --repeat 20
+"""
+import time
+import argparse
+
+from benchmarks.common import benchmark_app
+
+
+def seed(db, num_songs: int) -> None:
+    from app.models.user import User
+    from app.models.song import Song
+
+    user = User(username="bench", email="bench@bench.com")
+    user.set_password("bench")
+    db.session.add(user)
+    db.session.commit()
+
+    db.session.bulk_insert_mappings(
+        Song,
+        [
+            {
+                "title": f"song-{i}",
+                "song_url": f"https://bench/song-{i}.mp3",
+                "small_thumbnail_url": f"https://bench/small-{i}.png",
+                "large_thumbnail_url": f"https://bench/large-{i}.png",
+                "user_id": user.id,
+            }
+            for i in range(num_songs)
+        ],
+    )
+    db.session.commit()
+
+
+def measure(db, read, take: int, repeat: int) -> float:
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows += len(read(take))
+        db.session.remove()
+    return rows / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--songs", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_app() as (_, db):
+        from app.models.song import Song
+        from app.repositories.song import SongRepository
+
+        seed(db, args.songs)
+        repository = SongRepository(db)
+
+        def orm(take):
+            return [song.to_dict() for song in Song.paginate(take, 0)]
+
+        def core(take):
+            return repository.get_all_rows(take, 0)
+
+        for take in (10, 100, 500):
+            orm_rate = measure(db, orm, take, args.repeat)
+            core_rate = measure(db, core, take, args.repeat)
+            print(
+                f"take={take:>4}: orm {orm_rate:>9.0f} rows/s, "
+                f"core {core_rate:>9.0f} rows/s ({core_rate / orm_rate:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
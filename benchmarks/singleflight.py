@@ -0,0 +1,89 @@
+"""
+Thundering herd on GET /playlist/get-by-id/<id>.
+
+Fires CONCURRENCY simultaneous reads of the same playlist through
+PlaylistService, once bypassing request coalescing and once through it, and
+reports the number of statements that reached the database.
+
+    python -m benchmarks.singleflight --concurrency 200 --latency 0.005
+"""
+import time
+import argparse
+from threading import Barrier, Thread
+
+from benchmarks.common import QueryCounter, benchmark_app
+
+
+def seed(db, num_songs: int) -> int:
+    from app.models.user import User
+    from app.models.song import Song
+    from app.models.playlist import Playlist
+
+    user = User(username="bench", email="bench@bench.com")
+    user.set_password("bench")
+    db.session.add(user)
+    db.session.commit()
+
+    playlist = Playlist(title="bench", user_id=user.id)
+    db.session.add(playlist)
+    for i in range(num_songs):
+        song = Song(title=f"song-{i}", song_url=f"song-{i}", user_id=user.id)
+        db.session.add(song)
+        playlist.add_song(song)
+    db.session.commit()
+
+    return playlist.id
+
+
+def herd(app, db, read, concurrency: int) -> float:
+    barrier = Barrier(concurrency)
+
+    def worker():
+        with app.app_context():
+            barrier.wait()
+            read()
+            db.session.remove()
+
+    threads = [Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--songs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    with benchmark_app() as (app, db):
+        from app.repositories.song import SongRepository
+        from app.services.playlist import PlaylistService
+        from app.repositories.playlist import PlaylistRepository
+
+        playlist_id = seed(db, args.songs)
+        service = PlaylistService(PlaylistRepository(db), SongRepository(db))
+        engine = db.get_engine()
+
+        scenarios = [
+            (
+                "direct",
+                lambda: service._get_by_id(playlist_id, 10, 0, None, None, None),
+            ),
+            ("singleflight", lambda: service.get_by_id(playlist_id)),
+        ]
+        for name, read in scenarios:
+            with QueryCounter(engine, args.latency) as counter:
+                elapsed = herd(app, db, read, args.concurrency)
+            print(
+                f"{name:>12}: {args.concurrency} requests, "
+                f"{counter.count} queries, {elapsed * 1000:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Add play sketches
+
+Revision ID: 0a7d3e9c5b14
+Revises: f1c84d2e6b03
+Create Date: 2026-10-19 19:02:17.530942
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7d3e9c5b14'
+down_revision = 'f1c84d2e6b03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('play_sketches',
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('subject_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('kind', 'subject_id', 'bucket')
+    )
+    op.create_index('ix_play_sketches_bucket', 'play_sketches', ['bucket'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_play_sketches_bucket', table_name='play_sketches')
+    op.drop_table('play_sketches')
@@ -0,0 +1,44 @@
+"""Add play history
+
+Revision ID: 1b3e5f7a9c20
+Revises: 0a7d3e9c5b14
+Create Date: 2026-10-19 19:41:05.118273
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b3e5f7a9c20'
+down_revision = '0a7d3e9c5b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Month partitions are created by the app on first write; only Postgres
+    # has a parent table for them to be declarative partitions of
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        'CREATE TABLE play_history ('
+        'user_id INTEGER NOT NULL, '
+        'song_id INTEGER NOT NULL, '
+        'ts TIMESTAMP WITHOUT TIME ZONE NOT NULL'
+        ') PARTITION BY RANGE (ts)'
+    )
+    op.create_index('ix_play_history_user_id_ts', 'play_history', ['user_id', 'ts'], unique=False)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TABLE play_history CASCADE')
+        return
+
+    for name in sa.inspect(op.get_bind()).get_table_names():
+        if re.match(r'^play_history_\d{6}$', name):
+            op.drop_table(name)
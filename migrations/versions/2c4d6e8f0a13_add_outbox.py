@@ -0,0 +1,36 @@
+"""Add outbox
+
+Revision ID: 2c4d6e8f0a13
+Revises: 1b3e5f7a9c20
+Create Date: 2026-10-19 20:16:44.902517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c4d6e8f0a13'
+down_revision = '1b3e5f7a9c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('type', sa.String(length=64), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('outbox_watermarks',
+    sa.Column('sink', sa.String(length=64), nullable=False),
+    sa.Column('last_id', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('sink')
+    )
+
+
+def downgrade():
+    op.drop_table('outbox_watermarks')
+    op.drop_table('outbox')
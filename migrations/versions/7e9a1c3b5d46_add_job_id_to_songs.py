@@ -0,0 +1,28 @@
+"""Add job_id to songs
+
+Revision ID: 7e9a1c3b5d46
+Revises: 3d5f7a9b1c24
+Create Date: 2026-10-19 22:14:05.318270
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e9a1c3b5d46'
+down_revision = '3d5f7a9b1c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('songs') as batch_op:
+        batch_op.add_column(sa.Column('job_id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=True))
+        batch_op.create_unique_constraint('uq_songs_job_id', ['job_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('songs') as batch_op:
+        batch_op.drop_constraint('uq_songs_job_id', type_='unique')
+        batch_op.drop_column('job_id')
@@ -0,0 +1,31 @@
+"""Add position to playlist_songs
+
+Revision ID: a3d5c2e81f04
+Revises: 6f13a67fa276
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d5c2e81f04'
+down_revision = '6f13a67fa276'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('playlist_songs', sa.Column('position', sa.BigInteger(), nullable=True))
+    # Existing rows keep their previous (song id) order, spaced by POSITION_STEP
+    op.execute('UPDATE playlist_songs SET position = song_id * 65536')
+    with op.batch_alter_table('playlist_songs') as batch_op:
+        batch_op.alter_column('position', existing_type=sa.BigInteger(), nullable=False)
+    op.create_index('ix_playlist_songs_playlist_id_position', 'playlist_songs', ['playlist_id', 'position'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_playlist_songs_playlist_id_position', table_name='playlist_songs')
+    with op.batch_alter_table('playlist_songs') as batch_op:
+        batch_op.drop_column('position')
@@ -0,0 +1,26 @@
+"""Add version to songs and playlists
+
+Revision ID: b71e0c9d4a52
+Revises: a3d5c2e81f04
+Create Date: 2026-10-19 11:03:27.540917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e0c9d4a52'
+down_revision = 'a3d5c2e81f04'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('songs', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('playlists', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    op.drop_column('playlists', 'version')
+    op.drop_column('songs', 'version')
@@ -0,0 +1,24 @@
+"""Add composite index on followers
+
+Revision ID: c4f2a8d91e37
+Revises: b71e0c9d4a52
+Create Date: 2026-10-19 13:48:05.112394
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f2a8d91e37'
+down_revision = 'b71e0c9d4a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_followers_follower_id_followed_id', 'followers', ['follower_id', 'followed_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_followers_follower_id_followed_id', table_name='followers')
@@ -0,0 +1,32 @@
+"""Add song_similar
+
+Revision ID: d93b6e1f0a28
+Revises: c4f2a8d91e37
+Create Date: 2026-10-19 16:12:40.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd93b6e1f0a28'
+down_revision = 'c4f2a8d91e37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('song_similar',
+    sa.Column('song_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('similar_song_id', sa.Integer(), nullable=True),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['similar_song_id'], ['songs.id'], ),
+    sa.ForeignKeyConstraint(['song_id'], ['songs.id'], ),
+    sa.PrimaryKeyConstraint('song_id', 'rank')
+    )
+
+
+def downgrade():
+    op.drop_table('song_similar')
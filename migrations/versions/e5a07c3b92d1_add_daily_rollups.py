@@ -0,0 +1,45 @@
+"""Add daily rollups
+
+Revision ID: e5a07c3b92d1
+Revises: d93b6e1f0a28
+Create Date: 2026-10-19 17:05:12.904551
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a07c3b92d1'
+down_revision = 'd93b6e1f0a28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_activity',
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('subject_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.PrimaryKeyConstraint('kind', 'day', 'subject_id')
+    )
+    op.create_table('daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('signups', sa.Integer(), nullable=False),
+    sa.Column('active_users', sa.Integer(), nullable=False),
+    sa.Column('uploads', sa.Integer(), nullable=False),
+    sa.Column('playlists_created', sa.Integer(), nullable=False),
+    sa.Column('active_playlists', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('rollup_watermarks')
+    op.drop_table('daily_rollups')
+    op.drop_table('daily_activity')
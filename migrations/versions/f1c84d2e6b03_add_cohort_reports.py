@@ -0,0 +1,32 @@
+"""Add cohort reports
+
+Revision ID: f1c84d2e6b03
+Revises: e5a07c3b92d1
+Create Date: 2026-10-19 17:48:31.276014
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c84d2e6b03'
+down_revision = 'e5a07c3b92d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cohort_reports',
+    sa.Column('start', sa.Date(), nullable=False),
+    sa.Column('end', sa.Date(), nullable=False),
+    sa.Column('report', sa.JSON(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('start', 'end')
+    )
+    op.create_index('ix_daily_activity_kind_subject_id_day', 'daily_activity', ['kind', 'subject_id', 'day'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_daily_activity_kind_subject_id_day', table_name='daily_activity')
+    op.drop_table('cohort_reports')
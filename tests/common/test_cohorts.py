@@ -0,0 +1,67 @@
+import pytest
+from datetime import date, datetime
+
+from app.common.cohorts import CohortMatrix
+
+pytest.importorskip("numpy")
+
+# Mondays
+WEEK0 = date(2022, 5, 2)
+WEEK1 = date(2022, 5, 9)
+WEEK2 = date(2022, 5, 16)
+
+
+def test_positive_cohort_matrix():
+    matrix = CohortMatrix(date(2022, 5, 4), date(2022, 5, 20))
+    users = [
+        (1, datetime(2022, 5, 3, 9), datetime(2022, 5, 17, 9)),
+        (2, datetime(2022, 5, 4, 9), None),
+        (3, datetime(2022, 5, 10, 9), datetime(2022, 5, 11, 9)),
+        (4, datetime(2022, 5, 18, 9), None),
+    ]
+    logins = [
+        (1, date(2022, 5, 10)),
+        (1, date(2022, 5, 11)),
+        (2, date(2022, 5, 17)),
+        (3, date(2022, 5, 18)),
+    ]
+    matrix.add_rows(users, logins)
+
+    assert matrix.start == WEEK0
+    assert matrix.to_dict() == {
+        "cohorts": [
+            {"week": WEEK0.isoformat(), "size": 2, "retained": [2, 1, 2]},
+            {"week": WEEK1.isoformat(), "size": 1, "retained": [1, 1]},
+            {"week": WEEK2.isoformat(), "size": 1, "retained": [1]},
+        ]
+    }
+
+
+def test_positive_cohort_matrix_chunks_add_up():
+    users = [(i, datetime(2022, 5, 2 + i % 14), None) for i in range(1, 40)]
+    logins = [(i, date(2022, 5, 2 + (i * 7) % 20)) for i in range(1, 40)]
+
+    whole = CohortMatrix(WEEK0, WEEK2)
+    whole.add_rows(users, logins)
+
+    chunked = CohortMatrix(WEEK0, WEEK2)
+    for start in range(0, len(users), 10):
+        ids = {user[0] for user in users[start : start + 10]}
+        chunked.add_rows(
+            users[start : start + 10], [login for login in logins if login[0] in ids]
+        )
+
+    assert chunked.to_dict() == whole.to_dict()
+
+
+def test_negative_cohort_matrix_ignores_out_of_range():
+    matrix = CohortMatrix(WEEK1, WEEK1)
+    matrix.add_rows(
+        [(1, datetime(2022, 5, 3), None), (2, datetime(2022, 5, 10), None)],
+        [(1, date(2022, 5, 10)), (2, date(2022, 5, 3)), (2, date(2022, 5, 30))],
+    )
+    matrix.add_rows([], [])
+
+    assert matrix.to_dict() == {
+        "cohorts": [{"week": WEEK1.isoformat(), "size": 1, "retained": [1]}]
+    }
@@ -0,0 +1,30 @@
+import pytest
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from app.common.etag import get_if_match_version, make_etag
+from app.common.exceptions import BadRequestException
+
+
+def build_request(if_match=None) -> Request:
+    headers = {} if if_match is None else {"If-Match": if_match}
+    return Request(EnvironBuilder(headers=headers).get_environ())
+
+
+def test_positive_make_etag_is_stable():
+    assert make_etag("song", 1, None) == make_etag("song", 1, None)
+    assert make_etag("song", 1, None) != make_etag("song", 2, None)
+
+
+def test_positive_get_if_match_version():
+    assert get_if_match_version(build_request('"3"')) == 3
+
+
+def test_positive_get_if_match_version_absent_or_star():
+    assert get_if_match_version(build_request()) is None
+    assert get_if_match_version(build_request("*")) is None
+
+
+def test_negative_get_if_match_version_not_a_version():
+    with pytest.raises(BadRequestException):
+        get_if_match_version(build_request('"abc"'))
@@ -0,0 +1,71 @@
+import os
+import pytest
+from datetime import date, datetime
+from sqlalchemy import types
+
+from app.common.export import (
+    UNDATED,
+    PartitionedWriter,
+    arrow_schema,
+    partition_day,
+    read_manifest,
+    write_manifest,
+)
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+COLUMNS = [
+    ("title", types.String(255)),
+    ("position", types.BigInteger()),
+    ("updated_at", types.DateTime()),
+]
+
+
+def test_positive_arrow_schema():
+    schema = arrow_schema(COLUMNS)
+
+    assert schema.names == ["title", "position", "updated_at"]
+    assert schema.types == [pa.string(), pa.int64(), pa.timestamp("us")]
+
+
+def test_positive_partition_day():
+    assert partition_day(datetime(2022, 5, 1, 23, 59)) == "2022-05-01"
+    assert partition_day(date(2022, 5, 1)) == "2022-05-01"
+    assert partition_day(None) == UNDATED
+
+
+@pytest.mark.parametrize("format_", ["parquet", "arrow"])
+def test_positive_partitioned_writer(tmp_path, format_):
+    writer = PartitionedWriter(
+        str(tmp_path), "songs", "run1", arrow_schema(COLUMNS), format_
+    )
+    writer.write("2022-05-01", [("a", 1, datetime(2022, 5, 1)), ("b", None, None)])
+    writer.write("2022-05-01", [("c", 3, datetime(2022, 5, 1))])
+    writer.write("2022-05-02", [("d", 4, datetime(2022, 5, 2))])
+    writer.close()
+
+    assert writer.rows == 4
+    assert writer.files == [
+        f"songs/date=2022-05-01/part-run1.{format_}",
+        f"songs/date=2022-05-02/part-run1.{format_}",
+    ]
+
+    path = os.path.join(tmp_path, writer.files[0])
+    if format_ == "parquet":
+        table = pa.parquet.read_table(path)
+    else:
+        table = pa.ipc.open_file(path).read_all()
+    assert table.column("title").to_pylist() == ["a", "b", "c"]
+    assert table.column("position").to_pylist() == [1, None, 3]
+
+
+def test_positive_manifest_round_trip(tmp_path):
+    assert read_manifest(str(tmp_path)) == {"tables": {}, "runs": []}
+
+    manifest = {"tables": {"users": {"id": 3}}, "runs": [{"run": "1"}]}
+    write_manifest(str(tmp_path), manifest)
+
+    assert read_manifest(str(tmp_path)) == manifest
+    assert os.listdir(tmp_path) == ["manifest.json"]
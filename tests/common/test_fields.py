@@ -0,0 +1,136 @@
+import pytest
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.common.exceptions import BadRequestException, FieldRequiredException
+from app.common.fields import (
+    embed,
+    json_object,
+    parse_date,
+    parse_datetime,
+    parse_fields,
+    parse_ids,
+    serialize_row,
+    with_id,
+)
+
+ALLOWED = ("id", "title", "created_at")
+
+
+def test_positive_parse_fields_empty():
+    assert parse_fields(None, ALLOWED) is None
+    assert parse_fields("", ALLOWED) is None
+    assert parse_fields(" , ", ALLOWED) is None
+
+
+def test_positive_parse_fields_strips_and_deduplicates():
+    assert parse_fields("title, id,title", ALLOWED) == ("title", "id")
+
+
+def test_negative_parse_fields_unknown():
+    with pytest.raises(BadRequestException) as e:
+        parse_fields("id,password,secret", ALLOWED)
+
+    assert str(e.value) == "Unknown fields: password, secret"
+
+
+def test_positive_serialize_row():
+    created_at = datetime(2022, 5, 1)
+    row = SimpleNamespace(id=1, title="test", created_at=created_at)
+
+    assert serialize_row(row, ("id", "created_at")) == {
+        "id": 1,
+        "created_at": created_at.isoformat(),
+    }
+
+
+def test_positive_json_object():
+    assert json_object(None) == {}
+    assert json_object({"a": 1}) == {"a": 1}
+
+
+@pytest.mark.parametrize("data", [[1, 2], "a", 1, True])
+def test_negative_json_object_not_object(data):
+    with pytest.raises(BadRequestException):
+        json_object(data)
+
+
+def test_positive_parse_ids_keeps_order_and_duplicates():
+    assert parse_ids("3, 1,3,") == [3, 1, 3]
+
+
+def test_negative_parse_ids_required():
+    with pytest.raises(FieldRequiredException):
+        parse_ids(None)
+
+    with pytest.raises(FieldRequiredException):
+        parse_ids(",")
+
+
+def test_negative_parse_ids_invalid():
+    with pytest.raises(BadRequestException):
+        parse_ids("1,a")
+
+
+def test_negative_parse_ids_over_limit():
+    with pytest.raises(BadRequestException):
+        parse_ids("1,2,3", limit=2)
+
+
+def test_positive_with_id():
+    assert with_id(None) is None
+    assert with_id(("id", "title")) == ("id", "title")
+    assert with_id(("title",)) == ("title", "id")
+
+
+def test_positive_with_id_custom_key():
+    assert with_id(("title",), "user_id") == ("title", "user_id")
+
+
+def test_positive_embed():
+    rows = [{"title": "a", "user_id": 1}, None, {"title": "b", "user_id": 2}]
+    users = {1: {"id": 1}}
+
+    assert embed(rows, "user_id", users, "user", keep_key=False) == [
+        {"title": "a", "user": {"id": 1}},
+        None,
+        {"title": "b", "user": None},
+    ]
+
+
+def test_positive_embed_does_not_change_rows():
+    row = {"title": "a", "user_id": 1}
+    users = {1: {"id": 1}}
+
+    embedded = embed([row, row], "user_id", users, "user", keep_key=False)
+
+    assert embedded == [{"title": "a", "user": {"id": 1}}] * 2
+    assert row == {"title": "a", "user_id": 1}
+
+
+def test_positive_parse_date():
+    default = date(2022, 5, 31)
+
+    assert parse_date(None, "from", default) == default
+    assert parse_date("2022-05-01", "from", default) == date(2022, 5, 1)
+
+
+def test_negative_parse_date_invalid():
+    with pytest.raises(BadRequestException) as e:
+        parse_date("yesterday", "to", date(2022, 5, 31))
+
+    assert str(e.value) == "to must be a date like 2022-05-31"
+
+
+def test_positive_parse_datetime():
+    assert parse_datetime(None, "before") is None
+    assert parse_datetime("2022-05-01T10:30:00", "before") == datetime(
+        2022, 5, 1, 10, 30
+    )
+
+
+def test_negative_parse_datetime_invalid():
+    with pytest.raises(BadRequestException) as e:
+        parse_datetime("yesterday", "before")
+
+    assert str(e.value) == "before must be a timestamp like 2022-05-31T18:30:00"
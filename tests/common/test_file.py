@@ -1,3 +1,5 @@
+import io
+import os
 import pytest
 from unittest import mock
 from werkzeug.datastructures import FileStorage
@@ -7,6 +9,8 @@ from app.common.file import (
     renaming_file,
     create_file_uploader,
     process_files_to_streams,
+    remove_staged_files,
+    stage_files,
 )
 
 FILENAME_TEST = "test.mp3"
@@ -110,3 +114,50 @@ def test_positive_process_files_to_streams_skip_invalid_file(mocked_base64):
     result = process_files_to_streams(files)
     assert result is not None
     assert result["song_file"] is not None
+
+
+def test_positive_stage_files(tmp_path):
+    files = {
+        "song_file": FileStorage(io.BytesIO(b"song"), FILENAME_TEST),
+        "small_thumbnail_file": FileStorage(None, ""),
+    }
+
+    result = stage_files(files, str(tmp_path / "staging"))
+
+    assert list(result) == ["song_file"]
+    staged = result["song_file"]
+    assert "stream" not in staged
+    assert staged["filename"].endswith(f"--{FILENAME_TEST}")
+    with open(staged["path"], "rb") as file:
+        assert file.read() == b"song"
+
+    remove_staged_files(result)
+    remove_staged_files(result)
+    assert not os.path.exists(staged["path"])
+
+
+@mock.patch("app.common.file.boto3")
+def test_positive_create_file_uploader_staged_file(mock_boto3, tmp_path):
+    mock_s3 = mock.MagicMock()
+    mock_boto3.client.return_value = mock_s3
+
+    config = {
+        "AWS_ACCESS_KEY": "test",
+        "AWS_ACCESS_SECRET": "test",
+        "S3_BUCKET_NAME": "test",
+        "S3_BUCKET_BASE_URL": "https://test.com",
+    }
+    mocked_app = mock.MagicMock()
+    mocked_app.config.__getitem__.side_effect = config.__getitem__
+
+    path = tmp_path / "staged"
+    path.write_bytes(b"song")
+    uploaded = []
+    mock_s3.upload_fileobj.side_effect = lambda file, *args, **kwargs: uploaded.append(
+        file.read()
+    )
+
+    uploader = create_file_uploader(mocked_app)
+    data = {"path": str(path), "filename": FILENAME_TEST, "content_type": "audio/mp3"}
+    assert uploader(data) == f"https://test.com/{FILENAME_TEST}"
+    assert uploaded == [b"song"]
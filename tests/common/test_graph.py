@@ -0,0 +1,84 @@
+import os
+import pytest
+from unittest import mock
+
+from app.common.graph import CURRENT_FILE, KEPT_SNAPSHOTS, FollowGraph, FollowGraphStore
+
+np = pytest.importorskip("numpy")
+
+EDGES = [
+    (1, 2),
+    (1, 3),
+    (2, 4),
+    (3, 4),
+    (3, 5),
+    (2, 3),
+    (4, 1),
+    (2, 4),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    app = mock.MagicMock()
+    app.config = {"FOLLOW_GRAPH_DIR": str(tmp_path)}
+    yield FollowGraphStore(app)
+
+
+def test_positive_from_edges_builds_csr():
+    graph = FollowGraph.from_edges(EDGES)
+
+    assert graph.user_ids.tolist() == [1, 2, 3, 4, 5]
+    assert graph.indptr.tolist() == [0, 2, 4, 6, 7, 7]
+    # the duplicated (2, 4) follow is kept once
+    assert graph.indices.tolist() == [1, 2, 2, 3, 3, 4, 0]
+
+
+def test_positive_suggest_counts_two_hop_paths():
+    graph = FollowGraph.from_edges(EDGES)
+
+    # 1 -> 2 -> {3, 4}, 1 -> 3 -> {4, 5}; 3 is already followed
+    assert graph.suggest(1, 10) == [(4, 2), (5, 1)]
+    assert graph.suggest(1, 1) == [(4, 2)]
+
+
+def test_positive_suggest_excludes_self():
+    graph = FollowGraph.from_edges(EDGES)
+
+    # 4 -> 1 -> {2, 3}; 2 -> 3 -> 4 never suggests 2 itself
+    assert graph.suggest(4, 10) == [(2, 1), (3, 1)]
+    assert graph.suggest(2, 10) == [(1, 1), (5, 1)]
+
+
+def test_negative_suggest_unknown_user():
+    graph = FollowGraph.from_edges(EDGES)
+
+    assert graph.suggest(99, 10) == []
+    assert graph.suggest(5, 10) == []
+    assert FollowGraph.from_edges([]).suggest(1, 10) == []
+
+
+def test_positive_store_save_load(store):
+    assert store.load() is None
+
+    name = store.save(FollowGraph.from_edges(EDGES))
+    graph = store.load()
+
+    assert isinstance(graph.indices, np.memmap)
+    assert graph.suggest(1, 10) == [(4, 2), (5, 1)]
+    assert store.load() is graph
+
+    with open(os.path.join(store.directory, CURRENT_FILE)) as file:
+        assert file.read() == name
+
+
+def test_positive_store_reloads_new_snapshot_and_prunes(store):
+    store.save(FollowGraph.from_edges(EDGES))
+    first = store.load()
+
+    for _ in range(KEPT_SNAPSHOTS + 1):
+        store.save(FollowGraph.from_edges([(1, 2), (2, 3)]))
+
+    assert store.load() is not first
+    assert store.load().suggest(1, 10) == [(3, 1)]
+    assert len(os.listdir(store.directory)) == KEPT_SNAPSHOTS + 1
@@ -0,0 +1,26 @@
+import json
+from queue import Queue
+
+from app.common.outbox import FileSink, QueueSink
+
+EVENTS = [
+    {"id": 1, "type": "followed", "payload": {"follower_id": 1, "followed_id": 2}},
+    {"id": 2, "type": "song_deleted", "payload": {"song_id": 3, "user_id": 1}},
+]
+
+
+def test_positive_file_sink_appends_ndjson(tmp_path):
+    sink = FileSink(str(tmp_path / "outbox" / "events.ndjson"))
+    sink.deliver(EVENTS[:1])
+    sink.deliver(EVENTS[1:])
+
+    with open(sink.path) as file:
+        assert [json.loads(line) for line in file] == EVENTS
+
+
+def test_positive_queue_sink_puts_in_order():
+    queue = Queue()
+    QueueSink(queue).deliver(EVENTS)
+
+    assert [queue.get_nowait() for _ in EVENTS] == EVENTS
+    assert queue.empty()
@@ -0,0 +1,56 @@
+import io
+import csv
+import gzip
+import json
+
+from app.common.report import export_report, open_report, write_report
+
+ROWS = [
+    {"id": 1, "title": "a,b", "created_at": "2022-05-01T00:00:00"},
+    {"id": 2, "title": None, "created_at": None},
+]
+FIELDS = ("id", "title", "created_at")
+
+
+def test_positive_write_report_csv():
+    stream = io.StringIO(newline="")
+    assert write_report(iter(ROWS), FIELDS, "csv", stream) == 2
+
+    stream.seek(0)
+    rows = list(csv.DictReader(stream))
+    assert rows[0] == {"id": "1", "title": "a,b", "created_at": "2022-05-01T00:00:00"}
+    assert rows[1] == {"id": "2", "title": "", "created_at": ""}
+
+
+def test_positive_write_report_csv_header_only():
+    stream = io.StringIO(newline="")
+    assert write_report(iter([]), FIELDS, "csv", stream) == 0
+    assert stream.getvalue() == "id,title,created_at\r\n"
+
+
+def test_positive_write_report_ndjson():
+    stream = io.StringIO()
+    assert write_report(iter(ROWS), FIELDS, "ndjson", stream) == 2
+
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == ROWS
+
+
+def test_positive_export_report_compression_from_extension(tmp_path):
+    path = str(tmp_path / "songs.ndjson.gz")
+    assert export_report(iter(ROWS), FIELDS, "ndjson", path) == 2
+
+    with gzip.open(path, "rt") as file:
+        assert [json.loads(line) for line in file] == ROWS
+
+
+def test_positive_export_report_explicit_compression(tmp_path):
+    path = str(tmp_path / "songs.csv")
+    export_report(iter(ROWS), FIELDS, "csv", path, "bz2")
+
+    with open_report(str(tmp_path / "plain.csv")) as file:
+        file.write("x")
+    with open(path, "rb") as file:
+        assert file.read(3) == b"BZh"
+    with open(tmp_path / "plain.csv") as file:
+        assert file.read() == "x"
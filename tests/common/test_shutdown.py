@@ -0,0 +1,40 @@
+import gc
+from flask import Flask
+from unittest import mock
+
+from app.common import shutdown as shutdown_module
+from app.common.shutdown import on_shutdown, shutdown
+
+
+def test_positive_shutdown_runs_hooks_once_last_first():
+    app = Flask(__name__)
+    calls = []
+    on_shutdown(app, lambda: calls.append("first"))
+    on_shutdown(app, lambda: calls.append("second"))
+
+    shutdown(app)
+    shutdown(app)
+
+    assert calls == ["second", "first"]
+    assert app not in shutdown_module._apps
+
+
+def test_negative_shutdown_hook_failure_does_not_stop_others():
+    app = Flask(__name__)
+    hook = mock.MagicMock()
+    on_shutdown(app, hook)
+    on_shutdown(app, mock.MagicMock(side_effect=RuntimeError))
+
+    shutdown(app)
+
+    hook.assert_called_once()
+
+
+def test_positive_exit_handler_skips_collected_apps():
+    before = len(shutdown_module._apps)
+    app = Flask(__name__)
+    on_shutdown(app, mock.MagicMock())
+    del app
+    gc.collect()
+
+    assert len(shutdown_module._apps) == before
@@ -0,0 +1,59 @@
+import pytest
+
+from app.common.similarity import similar_songs
+
+pytest.importorskip("numpy")
+
+# (playlist_id, song_id); 10 and 11 always appear together
+MEMBERSHIPS = [
+    (1, 10),
+    (1, 11),
+    (1, 12),
+    (2, 10),
+    (2, 11),
+    (3, 12),
+    (3, 13),
+    (1, 10),
+]
+
+
+def flatten(chunks):
+    return [row for rows in chunks for row in rows]
+
+
+def test_positive_similar_songs_cosine():
+    rows = flatten(similar_songs(MEMBERSHIPS))
+
+    assert rows == [
+        (10, 0, 11, 1.0),
+        (10, 1, 12, 0.5),
+        (11, 0, 10, 1.0),
+        (11, 1, 12, 0.5),
+        (12, 0, 13, pytest.approx(0.7071, abs=1e-4)),
+        (12, 1, 10, 0.5),
+        (12, 2, 11, 0.5),
+        (13, 0, 12, pytest.approx(0.7071, abs=1e-4)),
+    ]
+
+
+def test_positive_similar_songs_top_n():
+    rows = flatten(similar_songs(MEMBERSHIPS, top_n=1))
+
+    assert [(song_id, similar_id) for song_id, _, similar_id, _ in rows] == [
+        (10, 11),
+        (11, 10),
+        (12, 13),
+        (13, 12),
+    ]
+
+
+def test_positive_similar_songs_chunked_matches_unchunked():
+    chunks = list(similar_songs(MEMBERSHIPS, chunk_size=1))
+
+    assert len(chunks) == 4
+    assert flatten(chunks) == flatten(similar_songs(MEMBERSHIPS))
+
+
+def test_negative_similar_songs_empty():
+    assert flatten(similar_songs([])) == []
+    assert flatten(similar_songs([(1, 10)])) == []
@@ -0,0 +1,71 @@
+import time
+import pytest
+from threading import Event, Thread
+
+from app.common.singleflight import SingleFlight
+
+NUM_THREADS = 8
+
+
+def test_positive_do_returns_result():
+    singleflight = SingleFlight()
+
+    assert singleflight.do("key", lambda x: x * 2, 21) == 42
+    assert singleflight.in_flight() == 0
+
+
+def test_positive_do_concurrent_calls_share_execution():
+    singleflight = SingleFlight()
+    release = Event()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return {"id": 1}
+
+    def worker():
+        results.append(singleflight.do(("get_by_id", 1), compute))
+
+    leader = Thread(target=worker)
+    leader.start()
+    while singleflight.in_flight() == 0:
+        time.sleep(0.001)
+
+    followers = [Thread(target=worker) for _ in range(NUM_THREADS - 1)]
+    for thread in followers:
+        thread.start()
+
+    time.sleep(0.1)
+    release.set()
+
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"id": 1}] * NUM_THREADS
+
+
+def test_positive_do_sequential_calls_are_not_cached():
+    singleflight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert singleflight.do("key", compute) == 1
+    assert singleflight.do("key", compute) == 2
+
+
+def test_negative_do_propagates_exception():
+    singleflight = SingleFlight()
+
+    def compute():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        singleflight.do("key", compute)
+
+    assert singleflight.in_flight() == 0
@@ -0,0 +1,91 @@
+import pytest
+
+from app.common.sketch import CountMinSketch, HyperLogLog, TopK
+
+
+def test_positive_hyperloglog_count_within_error():
+    sketch = HyperLogLog()
+    for i in range(50_000):
+        sketch.add(i)
+        sketch.add(i)
+
+    assert sketch.count() == pytest.approx(50_000, rel=0.05)
+
+
+def test_positive_hyperloglog_small_counts_exact():
+    sketch = HyperLogLog()
+    for i in range(20):
+        sketch.add(i)
+
+    assert sketch.count() == 20
+
+
+def test_positive_hyperloglog_merge_is_union():
+    first, second = HyperLogLog(), HyperLogLog()
+    for i in range(20_000):
+        first.add(i)
+    for i in range(10_000, 30_000):
+        second.add(i)
+
+    merged = first.merge(HyperLogLog.from_bytes(second.to_bytes()))
+    assert merged.count() == pytest.approx(30_000, rel=0.05)
+
+
+def test_negative_hyperloglog_merge_precision_mismatch():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(10))
+
+
+def test_negative_from_bytes_wrong_kind():
+    with pytest.raises(ValueError):
+        HyperLogLog.from_bytes(CountMinSketch().to_bytes())
+
+
+def test_positive_count_min_never_underestimates():
+    sketch = CountMinSketch(width=64, depth=4)
+    for key in range(200):
+        sketch.add(key, key)
+
+    restored = CountMinSketch.from_bytes(sketch.to_bytes())
+    assert all(restored.estimate(key) >= key for key in range(200))
+    assert restored.total == sum(range(200))
+
+
+def test_positive_count_min_merge_adds():
+    first, second = CountMinSketch(), CountMinSketch()
+    first.add("a", 3)
+    second.add("a", 4)
+
+    assert first.merge(second).estimate("a") == 7
+
+
+def test_positive_top_k_heavy_hitters():
+    top_k = TopK(k=3)
+    for key, count in ((1, 50), (2, 40), (3, 30), (4, 20)):
+        for _ in range(count):
+            top_k.add(key)
+    for key in range(100, 300):
+        top_k.add(key)
+
+    assert top_k.top() == [(1, 50), (2, 40), (3, 30)]
+
+
+def test_positive_top_k_late_heavy_hitter_evicts_smallest():
+    top_k = TopK(k=2)
+    top_k.add(1, 10)
+    top_k.add(2, 5)
+    top_k.add(3, 1)
+    top_k.add(3, 9)
+
+    assert top_k.top() == [(1, 10), (3, 10)]
+
+
+def test_positive_top_k_merge_across_processes():
+    first, second = TopK(k=2), TopK(k=2)
+    first.add(1, 10)
+    first.add(2, 8)
+    second.add(3, 7)
+    second.add(2, 5)
+
+    merged = first.merge(TopK.from_bytes(second.to_bytes()))
+    assert merged.top() == [(2, 13), (1, 10)]
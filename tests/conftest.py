@@ -7,6 +7,7 @@ from flask_sqlalchemy import SQLAlchemy
 @pytest.fixture
 def app():
     from app import create_app
+    from app.common.shutdown import shutdown
 
     app_ = create_app("testing")
     app_context = app_.app_context()
@@ -15,6 +16,7 @@ def app():
     yield app_
 
     app_context.pop()
+    shutdown(app_)
 
 
 @pytest.fixture
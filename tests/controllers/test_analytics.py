@@ -0,0 +1,107 @@
+import pytest
+from flask import Request
+from unittest import mock
+from http import HTTPStatus
+from typing import Callable
+from datetime import date
+
+from app.services.analytics import AnalyticsService
+from app.controllers.analytics import AnalyticsController
+from app.common.exceptions import BadRequestException, NotFoundException
+
+
+@pytest.fixture
+def mocked_analytics_service():
+    with mock.patch(
+        "app.controllers.analytics.AnalyticsService"
+    ) as MockedAnalyticsService:
+        yield MockedAnalyticsService.return_value
+
+
+@pytest.fixture
+def mocked_jsonify():
+    with mock.patch("app.controllers.analytics.jsonify") as mocked_jsonify_:
+        yield mocked_jsonify_
+
+
+@pytest.fixture
+def mocked_request():
+    m = mock.MagicMock()
+    with mock.patch("app.controllers.analytics.request", m) as mocked_request_:
+        yield mocked_request_
+
+
+def test_positive_get_daily(
+    mocked_analytics_service: AnalyticsService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    dates = {"from": "2022-05-01", "to": "2022-05-31"}
+    mocked_request.args.get.side_effect = dates.get
+
+    analytics_controller = AnalyticsController(mocked_analytics_service)
+    _, status_code = analytics_controller.get_daily()
+
+    mocked_analytics_service.get_daily.assert_called_once_with(
+        date(2022, 5, 1), date(2022, 5, 31)
+    )
+    mocked_jsonify.assert_called_once()
+    assert status_code == HTTPStatus.OK
+
+
+def test_positive_get_daily_defaults_to_last_30_days(
+    mocked_analytics_service: AnalyticsService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_request.args.get.return_value = None
+
+    analytics_controller = AnalyticsController(mocked_analytics_service)
+    analytics_controller.get_daily()
+
+    start, end = mocked_analytics_service.get_daily.call_args[0]
+    assert (end - start).days == 29
+
+
+def test_negative_get_daily_invalid_date(
+    mocked_analytics_service: AnalyticsService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_request.args.get.side_effect = {"to": "31/05/2022"}.get
+
+    analytics_controller = AnalyticsController(mocked_analytics_service)
+    _, status_code = analytics_controller.get_daily()
+
+    mocked_analytics_service.get_daily.assert_not_called()
+    assert status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_negative_get_daily_invalid_range(
+    mocked_analytics_service: AnalyticsService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_request.args.get.return_value = None
+    mocked_analytics_service.get_daily.side_effect = BadRequestException("range")
+
+    analytics_controller = AnalyticsController(mocked_analytics_service)
+    _, status_code = analytics_controller.get_daily()
+
+    assert status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_negative_get_cohorts_not_built(
+    mocked_analytics_service: AnalyticsService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_request.args.get.return_value = None
+    mocked_analytics_service.get_cohorts.side_effect = NotFoundException("missing")
+
+    analytics_controller = AnalyticsController(mocked_analytics_service)
+    _, status_code = analytics_controller.get_cohorts()
+
+    start, end = mocked_analytics_service.get_cohorts.call_args[0]
+    assert (end - start).days == 83
+    assert status_code == HTTPStatus.NOT_FOUND
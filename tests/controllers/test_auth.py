@@ -115,7 +115,9 @@ def test_negative_login_user_not_found(
     assert mocked_jsonify.call_args_list[0] == mock.call(err.to_dict())
 
 
-def test_profile(mocked_current_user: User, mocked_jsonify: Callable):
+def test_profile(
+    mocked_current_user: User, mocked_request: Request, mocked_jsonify: Callable
+):
 
     auth_controller = AuthController(mock.MagicMock())
     _, status_code = auth_controller.profile(mocked_current_user)
@@ -123,3 +125,15 @@ def test_profile(mocked_current_user: User, mocked_jsonify: Callable):
     mocked_jsonify.assert_called_once()
     mocked_current_user.to_dict.assert_called_once()
     assert status_code == HTTPStatus.OK
+
+
+def test_profile_unknown_field(
+    mocked_current_user: User, mocked_request: Request, mocked_jsonify: Callable
+):
+    mocked_request.args.get.return_value = "id,password"
+
+    auth_controller = AuthController(mock.MagicMock())
+    _, status_code = auth_controller.profile(mocked_current_user)
+
+    mocked_current_user.to_dict.assert_not_called()
+    assert status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,85 @@
+import pytest
+from flask import Request
+from unittest import mock
+from http import HTTPStatus
+from typing import Callable
+
+from app.models.user import User
+from app.services.batch import BatchService
+from app.controllers.batch import BatchController
+from app.common.messages import BATCH_NESTED, JSON_BODY_INVALID
+from app.common.exceptions import BadRequestException
+
+
+@pytest.fixture
+def mocked_batch_service():
+    with mock.patch("app.controllers.batch.BatchService") as MockedBatchService:
+        yield MockedBatchService.return_value
+
+
+@pytest.fixture
+def mocked_jsonify():
+    with mock.patch("app.controllers.batch.jsonify") as mocked_jsonify_:
+        yield mocked_jsonify_
+
+
+@pytest.fixture
+def mocked_request():
+    m = mock.MagicMock()
+    with mock.patch("app.controllers.batch.request", m) as mocked_request_:
+        yield mocked_request_
+
+
+def test_positive_batch_execute(
+    mocked_batch_service: BatchService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    sub_requests = [{"path": "/auth/profile"}]
+    mocked_request.get_json.return_value = {"requests": sub_requests, "parallel": 1}
+    mocked_batch_service.execute.return_value = [{"status": 200}]
+
+    batch_controller = BatchController(mocked_batch_service)
+    _, status_code = batch_controller.execute(mocked_current_user)
+
+    mocked_batch_service.execute.assert_called_once_with(
+        mocked_current_user, sub_requests, True
+    )
+    mocked_jsonify.assert_called_once_with({"responses": [{"status": 200}]})
+    assert status_code == HTTPStatus.OK
+
+
+def test_negative_batch_execute_invalid(
+    mocked_batch_service: BatchService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    err = BadRequestException(BATCH_NESTED)
+    mocked_request.get_json.return_value = {"requests": [{"path": "/batch"}]}
+    mocked_batch_service.execute.side_effect = err
+
+    batch_controller = BatchController(mocked_batch_service)
+    _, status_code = batch_controller.execute(mocked_current_user)
+
+    mocked_jsonify.assert_called_once_with(err.to_dict())
+    assert status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_negative_batch_execute_body_not_object(
+    mocked_batch_service: BatchService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_request.get_json.return_value = [{"path": "/auth/profile"}]
+
+    batch_controller = BatchController(mocked_batch_service)
+    _, status_code = batch_controller.execute(mocked_current_user)
+
+    mocked_batch_service.execute.assert_not_called()
+    mocked_jsonify.assert_called_once_with(
+        BadRequestException(JSON_BODY_INVALID).to_dict()
+    )
+    assert status_code == HTTPStatus.BAD_REQUEST
@@ -8,12 +8,17 @@ from app.models.user import User
 from app.services.playlist import PlaylistService
 from app.controllers.playlist import PlaylistController
 from app.common.exceptions import (
+    BadRequestException,
+    PreconditionFailedException,
     FieldRequiredException,
     NotFoundException,
     UnauthorizedException,
 )
 from app.common.messages import (
+    VERSION_MISMATCH,
     PLAYLIST_NOT_FOUND,
+    JSON_BODY_INVALID,
+    SONG_IDS_INVALID,
     SONG_NOT_FOUND,
     UNAUTHORIZED_TO_DELETE_PLAYLIST,
     UNAUTHORIZED_TO_UPDATE_PLAYLIST,
@@ -88,6 +93,22 @@ def test_positive_update_playlist(
     assert status_code == HTTPStatus.OK
 
 
+def test_negative_update_playlist_version_mismatch(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    err = PreconditionFailedException(VERSION_MISMATCH)
+    mocked_playlist_service.update.side_effect = err
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.update(mocked_current_user, 1)
+
+    mocked_jsonify.assert_called_once_with(err.to_dict())
+    assert status_code == HTTPStatus.PRECONDITION_FAILED
+
+
 def test_negative_update_playlist_playlist_id_not_provided(
     mocked_playlist_service: PlaylistService,
     mocked_current_user: User,
@@ -211,7 +232,7 @@ def test_positive_playlist_get_all(
 
     mocked_playlist_service.get_all.assert_called_once()
     mocked_jsonify.assert_called_once()
-    assert mocked_request.args.get.call_count == 2
+    assert mocked_request.args.get.call_count == 7
     assert status_code == HTTPStatus.OK
 
 
@@ -226,7 +247,7 @@ def test_positive_playlist_get_by_id(
 
     mocked_playlist_service.get_by_id.assert_called_once()
     mocked_jsonify.assert_called_once()
-    assert mocked_request.args.get.call_count == 2
+    assert mocked_request.args.get.call_count == 5
     assert status_code == HTTPStatus.OK
 
 
@@ -264,6 +285,7 @@ def test_negative_playlist_get_by_id_not_found(
 
 def test_positive_playlist_add_song(
     mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
     mocked_current_user: User,
 ):
     playlist_controller = PlaylistController(mocked_playlist_service)
@@ -385,3 +407,173 @@ def test_negative_playlist_remove_song_song_not_found(
     mocked_jsonify.assert_called_once()
     assert status_code == HTTPStatus.NOT_FOUND
     assert mocked_jsonify.call_args_list[0] == mock.call(err.to_dict())
+
+
+def test_positive_playlist_get_by_id_not_modified(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_playlist_service.get_etag.return_value = "etag"
+    mocked_request.if_none_match = ["etag"]
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.get_by_id(mocked_current_user, 1)
+
+    mocked_playlist_service.get_by_id.assert_not_called()
+    mocked_jsonify.assert_not_called()
+    assert status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_positive_playlist_move_song(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_current_user: User,
+):
+    mocked_request.args.get.return_value = 2
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.move_song(mocked_current_user, 1, 3)
+
+    mocked_playlist_service.move_song.assert_called_once_with(
+        mocked_current_user, 1, 3, 2
+    )
+    assert status_code == HTTPStatus.OK
+
+
+def test_negative_playlist_move_song_index_required(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_request.args.get.return_value = None
+    err = FieldRequiredException("index")
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.move_song(mocked_current_user, 1, 3)
+
+    mocked_playlist_service.move_song.assert_not_called()
+    mocked_jsonify.assert_called_once_with(err.to_dict())
+    assert status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_positive_playlist_add_songs(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_request.get_json.return_value = {"song_ids": [1, 2]}
+    mocked_playlist_service.add_songs.return_value = {"added": [1], "missing": [2]}
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.add_songs(mocked_current_user, 1)
+
+    mocked_playlist_service.add_songs.assert_called_once_with(
+        mocked_current_user, 1, [1, 2]
+    )
+    mocked_jsonify.assert_called_once_with({"added": [1], "missing": [2]})
+    assert status_code == HTTPStatus.OK
+
+
+def test_negative_playlist_add_songs_invalid_ids(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    err = BadRequestException(SONG_IDS_INVALID)
+    mocked_request.get_json.return_value = {"song_ids": ["a"]}
+    mocked_playlist_service.add_songs.side_effect = err
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.add_songs(mocked_current_user, 1)
+
+    mocked_jsonify.assert_called_once_with(err.to_dict())
+    assert status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_negative_playlist_add_songs_body_not_object(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_request.get_json.return_value = [1, 2]
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.add_songs(mocked_current_user, 1)
+
+    mocked_playlist_service.add_songs.assert_not_called()
+    mocked_jsonify.assert_called_once_with(
+        BadRequestException(JSON_BODY_INVALID).to_dict()
+    )
+    assert status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_negative_playlist_remove_songs_body_not_object(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_request.get_json.return_value = "1"
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.remove_songs(mocked_current_user, 1)
+
+    mocked_playlist_service.remove_songs.assert_not_called()
+    assert status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_positive_playlist_remove_songs(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_request.get_json.return_value = {"song_ids": [1]}
+    mocked_playlist_service.remove_songs.return_value = {"removed": [1], "missing": []}
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.remove_songs(mocked_current_user, 1)
+
+    mocked_playlist_service.remove_songs.assert_called_once_with(
+        mocked_current_user, 1, [1]
+    )
+    assert status_code == HTTPStatus.OK
+
+
+def test_positive_playlist_copy(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_playlist_service.copy.return_value = {"id": 2}
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.copy(mocked_current_user, 1)
+
+    mocked_request.form.to_dict.assert_called_once()
+    mocked_playlist_service.copy.assert_called_once()
+    mocked_jsonify.assert_called_once_with({"id": 2})
+    assert status_code == HTTPStatus.CREATED
+
+
+def test_negative_playlist_copy_not_found(
+    mocked_playlist_service: PlaylistService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    err = NotFoundException(PLAYLIST_NOT_FOUND)
+    mocked_playlist_service.copy.side_effect = err
+
+    playlist_controller = PlaylistController(mocked_playlist_service)
+    _, status_code = playlist_controller.copy(mocked_current_user, 1)
+
+    mocked_jsonify.assert_called_once_with(err.to_dict())
+    assert status_code == HTTPStatus.NOT_FOUND
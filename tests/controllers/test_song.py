@@ -313,6 +313,7 @@ def test_negative_delete_song_raise_not_found(
 
 def test_positive_song_get_by_id(
     mocked_song_service: SongService,
+    mocked_request: Request,
     mocked_jsonify: Callable,
     mocked_current_user: User,
 ):
@@ -341,6 +342,7 @@ def test_negative_song_get_by_id_song_id_required(
 
 def test_negative_song_get_by_id_not_found(
     mocked_song_service: SongService,
+    mocked_request: Request,
     mocked_jsonify: Callable,
     mocked_current_user: User,
 ):
@@ -369,4 +371,103 @@ def test_positive_song_get_all(
     assert mocked_request.args.get.call_args_list == [
         mock.call("take", 10, int),
         mock.call("skip", 0, int),
+        mock.call("fields"),
+        mock.call("include"),
+        mock.call("stream"),
     ]
+
+
+def test_positive_song_get_by_id_not_modified(
+    mocked_song_service: SongService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+    mocked_current_user: User,
+):
+    mocked_song_service.get_etag.return_value = "etag"
+    mocked_request.if_none_match = ["etag"]
+
+    song_controller = SongController(mocked_song_service)
+    response, status_code = song_controller.get_by_id(mocked_current_user, 1)
+
+    mocked_song_service.get_by_id.assert_not_called()
+    mocked_jsonify.assert_not_called()
+    assert status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers["ETag"] == '"etag"'
+
+
+def test_positive_song_get_all_not_modified(
+    mocked_song_service: SongService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_song_service.get_all_etag.return_value = "etag"
+    mocked_request.if_none_match = ["etag"]
+
+    song_controller = SongController(mocked_song_service)
+    _, status_code = song_controller.get_all(mocked_request)
+
+    mocked_song_service.get_all.assert_not_called()
+    mocked_jsonify.assert_not_called()
+    assert status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_positive_get_many_song(
+    mocked_song_service: SongService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_request.args.get.side_effect = lambda key: "2,1" if key == "ids" else None
+    mocked_song_service.get_many.return_value = [None, {"id": 1}]
+
+    song_controller = SongController(mocked_song_service)
+    _, status_code = song_controller.get_many()
+
+    mocked_song_service.get_many.assert_called_once_with([2, 1], None, None)
+    mocked_jsonify.assert_called_once_with([None, {"id": 1}])
+    assert status_code == HTTPStatus.OK
+
+
+def test_negative_get_many_song_ids_required(
+    mocked_song_service: SongService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_request.args.get.return_value = None
+
+    song_controller = SongController(mocked_song_service)
+    _, status_code = song_controller.get_many()
+
+    mocked_song_service.get_many.assert_not_called()
+    assert status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_positive_get_similar_song(
+    mocked_song_service: SongService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_request.args.get.side_effect = [10, None]
+    mocked_song_service.get_similar.return_value = [{"id": 2, "score": 1.0}]
+
+    song_controller = SongController(mocked_song_service)
+    _, status_code = song_controller.get_similar(None, 1)
+
+    mocked_song_service.get_similar.assert_called_once_with(1, 10, None)
+    mocked_jsonify.assert_called_once_with({"songs": [{"id": 2, "score": 1.0}]})
+    assert status_code == HTTPStatus.OK
+
+
+def test_negative_get_similar_song_not_found(
+    mocked_song_service: SongService,
+    mocked_request: Request,
+    mocked_jsonify: Callable,
+):
+    mocked_request.args.get.side_effect = [10, None]
+    mocked_song_service.get_similar.side_effect = NotFoundException(
+        SONG_NOT_FOUND_MESSAGE
+    )
+
+    song_controller = SongController(mocked_song_service)
+    _, status_code = song_controller.get_similar(None, 1)
+
+    assert status_code == HTTPStatus.NOT_FOUND
@@ -146,11 +146,13 @@ def test_positive_get_followers(
     _, status_code = user_controller.get_followers(mocked_current_user)
 
     mocked_jsonify.assert_called_once()
-    mocked_current_user.get_followers.assert_called_once()
+    mocked_user_service.get_followers.assert_called_once()
     assert status_code == HTTPStatus.OK
     assert mocked_request.args.get.call_args_list == [
         mock.call("take", take, int),
         mock.call("skip", skip, int),
+        mock.call("fields"),
+        mock.call("stream"),
     ]
 
 
@@ -165,11 +167,13 @@ def test_positive_get_followed_users(
     _, status_code = user_controller.get_followed_users(mocked_current_user)
 
     mocked_jsonify.assert_called_once()
-    mocked_current_user.get_followed_users.assert_called_once()
+    mocked_user_service.get_followed_users.assert_called_once()
     assert status_code == HTTPStatus.OK
     assert mocked_request.args.get.call_args_list == [
         mock.call("take", take, int),
         mock.call("skip", skip, int),
+        mock.call("fields"),
+        mock.call("stream"),
     ]
 
 
@@ -189,6 +193,8 @@ def test_positive_get_songs_by_user_id(
     assert mocked_request.args.get.call_args_list == [
         mock.call("take", take, int),
         mock.call("skip", skip, int),
+        mock.call("fields"),
+        mock.call("stream"),
     ]
 
 
@@ -211,4 +217,24 @@ def test_negative_get_songs_by_user_id_user_not_found(
     assert mocked_request.args.get.call_args_list == [
         mock.call("take", take, int),
         mock.call("skip", skip, int),
+        mock.call("fields"),
+        mock.call("stream"),
+    ]
+
+
+def test_positive_get_suggestions(
+    mocked_user_service: UserService,
+    mocked_request: Request,
+    mocked_current_user: User,
+    mocked_jsonify: Callable,
+):
+    user_controller = UserController(mocked_user_service)
+    _, status_code = user_controller.get_suggestions(mocked_current_user)
+
+    mocked_jsonify.assert_called_once()
+    mocked_user_service.get_suggestions.assert_called_once()
+    assert status_code == HTTPStatus.OK
+    assert mocked_request.args.get.call_args_list == [
+        mock.call("take", 10, int),
+        mock.call("fields"),
     ]
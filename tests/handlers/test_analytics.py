@@ -0,0 +1,94 @@
+import pytest
+from datetime import datetime
+from http import HTTPStatus
+
+USER_DATA = {
+    "username": "test",
+    "email": "test@test.com",
+    "password": "test",
+}
+
+
+@pytest.fixture
+def login(client):
+    client.post("/auth/register", json=USER_DATA)
+    response = client.post("/auth/login", json=USER_DATA)
+    yield client, response.json["token"]
+
+
+def test_positive_get_daily_empty(login):
+    client, token = login
+    response = client.get(
+        "/analytics/daily?from=2022-05-01&to=2022-05-03",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["as_of"] is None
+    assert [day["signups"] for day in response.json["days"]] == [0, 0, 0]
+
+
+def test_positive_get_daily_after_rollup(app, db, login):
+    from app.models.user import User
+
+    client, token = login
+    user = User(email="old@test.com", username="old", created_at=datetime(2022, 5, 2))
+    user.set_password("test")
+    db.session.add(user)
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["analytics", "rollup"])
+    assert result.exit_code == 0
+
+    response = client.get(
+        "/analytics/daily?from=2022-05-01&to=2022-05-03",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["as_of"] is not None
+    assert [day["signups"] for day in response.json["days"]] == [0, 1, 0]
+
+
+def test_negative_get_daily_invalid_range(login):
+    client, token = login
+    response = client.get(
+        "/analytics/daily?from=2022-05-03&to=2022-05-01",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_negative_get_daily_unauthorized(client):
+    response = client.get("/analytics/daily")
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_positive_get_cohorts_after_build(app, login):
+    pytest.importorskip("numpy")
+    client, token = login
+    url = "/analytics/cohorts?from=2022-05-02&to=2022-05-15"
+
+    response = client.get(url, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+    result = app.test_cli_runner().invoke(
+        args=["analytics", "cohorts", "--from", "2022-05-02", "--to", "2022-05-15"]
+    )
+    assert result.exit_code == 0
+
+    response = client.get(url, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["from"] == "2022-05-02"
+    assert [cohort["size"] for cohort in response.json["cohorts"]] == [0, 0]
+
+
+def test_negative_build_cohorts_invalid_date(app):
+    result = app.test_cli_runner().invoke(
+        args=["analytics", "cohorts", "--from", "May"]
+    )
+
+    assert result.exit_code != 0
+    assert "from must be a date" in result.output
@@ -0,0 +1,157 @@
+import pytest
+from unittest import mock
+from http import HTTPStatus
+
+from app.common.messages import BATCH_NESTED
+from app.services.batch import MAX_BATCH_REQUESTS
+from app.repositories.user import UserRepository
+
+USER_DATA = {
+    "username": "test",
+    "email": "test@test.com",
+    "password": "test",
+}
+
+
+@pytest.fixture
+def login(client):
+    client.post("/auth/register", json=USER_DATA)
+    response = client.post("/auth/login", json=USER_DATA)
+    token = response.json["token"]
+    yield client, token
+
+
+def test_positive_batch(login):
+    client, token = login
+
+    response = client.post(
+        "/batch",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "requests": [
+                {"method": "POST", "path": "/playlist/create", "form": {"title": "a"}},
+                {"path": "/auth/profile", "params": {"fields": "username"}},
+                {"path": "/playlist/get-by-id/1", "params": {"fields": "title"}},
+                {"path": "/playlist/get-by-id/2"},
+                {"path": "/does-not-exist"},
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    created, profile, playlist, missing, unknown = response.json["responses"]
+    assert created["status"] == HTTPStatus.CREATED
+    assert profile == {"status": HTTPStatus.OK, "body": {"username": "test"}}
+    assert playlist["status"] == HTTPStatus.OK
+    assert playlist["body"] == {"title": "a", "songs": []}
+    assert "ETag" in playlist["headers"]
+    assert missing["status"] == HTTPStatus.NOT_FOUND
+    assert unknown["status"] == HTTPStatus.NOT_FOUND
+
+
+def test_positive_batch_parallel_reads(login):
+    client, token = login
+
+    client.post(
+        "/playlist/create",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"title": "a"},
+    )
+
+    requests = [
+        {"path": "/auth/profile", "params": {"fields": "id"}},
+        {"path": "/playlist/get-all", "params": {"fields": "title"}},
+        {"path": "/user/get-followers"},
+    ]
+    response = client.post(
+        "/batch",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"parallel": True, "requests": requests},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    profile, playlists, followers = response.json["responses"]
+    assert profile["body"] == {"id": 1}
+    assert playlists["body"] == [{"title": "a"}]
+    assert followers["body"] == {"followers": []}
+
+
+def test_negative_batch_requires_token(client):
+    response = client.post("/batch", json={"requests": [{"path": "/auth/profile"}]})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_negative_batch_invalid(login):
+    client, token = login
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.post("/batch", headers=headers, json={})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    response = client.post(
+        "/batch", headers=headers, json={"requests": [{"path": "/batch"}]}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json["message"] == BATCH_NESTED
+
+    response = client.post(
+        "/batch",
+        headers=headers,
+        json={"requests": [{"path": "/auth/profile"}] * (MAX_BATCH_REQUESTS + 1)},
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_negative_batch_malformed_requests_fail_alone(login):
+    client, token = login
+
+    response = client.post(
+        "/batch",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "requests": [
+                {"path": "/auth/profile?fields=id", "params": {"fields": "id"}},
+                {
+                    "method": "POST",
+                    "path": "/playlist/create",
+                    "body": {"title": "a"},
+                    "form": {"title": "a"},
+                },
+                {"path": "/auth/profile", "headers": "Accept"},
+                {"path": "/auth/profile", "headers": [1]},
+                {"path": "/auth/profile", "params": {"fields": "username"}},
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    *malformed, profile = response.json["responses"]
+    for item in malformed:
+        assert item["status"] == HTTPStatus.BAD_REQUEST
+        assert item["body"]["message"].startswith("Malformed batch request")
+    assert profile == {"status": HTTPStatus.OK, "body": {"username": "test"}}
+
+
+def test_negative_batch_failed_request_rolls_back(login):
+    client, token = login
+
+    with mock.patch(
+        "app.services.playlist.PlaylistService.get_etag",
+        side_effect=RuntimeError,
+    ), mock.patch.object(UserRepository, "rollback", autospec=True) as mocked_rollback:
+        response = client.post(
+            "/batch",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "requests": [
+                    {"path": "/playlist/get-by-id/1"},
+                    {"path": "/auth/profile", "params": {"fields": "username"}},
+                ]
+            },
+        )
+
+    failed, profile = response.json["responses"]
+    assert failed["status"] == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert profile["status"] == HTTPStatus.OK
+    mocked_rollback.assert_called_once()
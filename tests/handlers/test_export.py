@@ -0,0 +1,67 @@
+import os
+import json
+import pytest
+from datetime import datetime
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet  # noqa: E402
+
+
+def read_rows(directory, files):
+    return [
+        row
+        for path in files
+        for row in pa.parquet.read_table(os.path.join(directory, path)).to_pylist()
+    ]
+
+
+def test_positive_flask_export_incremental(app, db, tmp_path):
+    from app.models.user import User
+
+    app.config["EXPORT_DIR"] = str(tmp_path)
+    for i in range(3):
+        user = User(email=f"test{i}@test.com", username=f"test{i}")
+        user.set_password("test")
+        user.updated_at = datetime(2022, 5, 1 + i)
+        db.session.add(user)
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["export"])
+    assert result.exit_code == 0
+    assert "users: 3 rows in 3 files" in result.output
+
+    with open(os.path.join(tmp_path, "manifest.json")) as file:
+        manifest = json.load(file)
+    assert manifest["tables"]["users"]["id"] == 3
+    assert manifest["tables"]["followers"]["mode"] == "snapshot"
+    files = manifest["runs"][0]["tables"]["users"]["files"]
+    assert files[0].startswith("users/date=2022-05-01/")
+    assert [row["username"] for row in read_rows(tmp_path, files)] == [
+        "test0",
+        "test1",
+        "test2",
+    ]
+
+    user = User.query.get(1)
+    user.bio = "changed"
+    user.updated_at = datetime(2022, 5, 9)
+    db.session.commit()
+
+    result = runner.invoke(args=["export", "--table", "users"])
+    assert result.exit_code == 0
+
+    with open(os.path.join(tmp_path, "manifest.json")) as file:
+        manifest = json.load(file)
+    files = manifest["runs"][1]["tables"]["users"]["files"]
+    assert [row["bio"] for row in read_rows(tmp_path, files)] == ["changed"]
+    assert manifest["tables"]["users"]["updated_at"] == "2022-05-09T00:00:00"
+
+
+def test_negative_flask_export_unknown_table(app, tmp_path):
+    app.config["EXPORT_DIR"] = str(tmp_path)
+
+    result = app.test_cli_runner().invoke(args=["export", "--table", "secrets"])
+
+    assert result.exit_code != 0
+    assert "Unknown tables to export: secrets" in result.output
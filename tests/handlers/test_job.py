@@ -0,0 +1,20 @@
+def test_positive_flask_jobs_work(app, db):
+    jobs = app.extensions["jobs"]
+    seen = []
+    jobs.register("test.record", lambda payload: seen.append(payload["n"]))
+    jobs.register("test.fail", lambda payload: 1 / 0)
+    for n in range(3):
+        jobs.enqueue("test.record", {"n": n})
+    jobs.enqueue("test.fail", {}, max_attempts=1)
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["jobs", "work", "--burst"])
+    assert result.exit_code == 0
+    assert "Ran 4 jobs" in result.output
+    assert seen == [0, 1, 2]
+
+    result = runner.invoke(args=["jobs", "stats"])
+    assert result.output == "dead: 1\n"
+
+    result = runner.invoke(args=["jobs", "retry-dead"])
+    assert "Queued 1 dead jobs again" in result.output
@@ -0,0 +1,47 @@
+import json
+from datetime import datetime, timedelta
+
+USER_DATA = {
+    "username": "test",
+    "email": "test@test.com",
+    "password": "test",
+}
+
+
+def test_positive_flask_outbox_dispatch(app, client, db, tmp_path):
+    from app.models.outbox import OutboxEvent
+
+    path = tmp_path / "events.ndjson"
+    app.extensions["outbox"].sinks["file"].path = str(path)
+    for i in (1, 2):
+        client.post(
+            "/auth/register",
+            json={**USER_DATA, "username": f"test{i}", "email": f"test{i}@test.com"},
+        )
+    response = client.post(
+        "/auth/login",
+        json={**USER_DATA, "username": "test1", "email": "test1@test.com"},
+    )
+    client.post(
+        "/user/follow?user_id=2",
+        headers={"Authorization": f"Bearer {response.json['token']}"},
+    )
+    # Past the settle delay
+    OutboxEvent.query.update({"created_at": datetime.utcnow() - timedelta(minutes=1)})
+    db.session.commit()
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["outbox", "dispatch"])
+    assert result.exit_code == 0
+    assert "file: 1 events" in result.output
+
+    result = runner.invoke(args=["outbox", "dispatch"])
+    assert "file: 0 events" in result.output
+
+    with open(path) as file:
+        events = [json.loads(line) for line in file]
+    assert [event["type"] for event in events] == ["followed"]
+    assert events[0]["payload"] == {"follower_id": 1, "followed_id": 2}
+
+    result = runner.invoke(args=["outbox", "prune", "--days", "0"])
+    assert "Deleted 1 events" in result.output
@@ -0,0 +1,119 @@
+import pytest
+from http import HTTPStatus
+
+from app.common.messages import SONG_NOT_FOUND
+
+USER_DATA = {
+    "username": "test",
+    "email": "test@test.com",
+    "password": "test",
+}
+
+
+@pytest.fixture
+def login(client):
+    client.post("/auth/register", json=USER_DATA)
+    response = client.post("/auth/login", json=USER_DATA)
+    yield client, response.json["token"]
+
+
+@pytest.fixture
+def songs(db):
+    from app.models.song import Song
+
+    for i in range(2):
+        db.session.add(Song(title=f"test-{i}", song_url=f"test-{i}", user_id=1))
+    db.session.commit()
+
+
+def test_negative_record_play_song_not_found(login):
+    client, token = login
+    response = client.post("/play/1", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json["message"] == SONG_NOT_FOUND
+
+
+def test_positive_record_play_counts(login, songs):
+    client, token = login
+    headers = {"Authorization": f"Bearer {token}"}
+    for song_id in (1, 1, 2):
+        response = client.post(f"/play/{song_id}", headers=headers)
+        assert response.status_code == HTTPStatus.OK
+
+    response = client.get("/play/listeners/1?window=1", headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["unique_listeners"] == 1
+
+    response = client.get("/play/top", headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["songs"] == [
+        {"song_id": 1, "plays": 2},
+        {"song_id": 2, "plays": 1},
+    ]
+
+
+def test_negative_get_top_songs_window_invalid(login):
+    client, token = login
+    response = client.get(
+        "/play/top?window=0", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_positive_get_history_paginated(app, login, songs):
+    client, token = login
+    headers = {"Authorization": f"Bearer {token}"}
+    for song_id in (1, 2, 1):
+        client.post(f"/play/{song_id}", headers=headers)
+
+    response = client.get("/play/history?take=2", headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    assert [play["song_id"] for play in response.json["plays"]] == [1, 2]
+
+    before = response.json["next_before"]
+    response = client.get(f"/play/history?take=2&before={before}", headers=headers)
+    assert [play["song_id"] for play in response.json["plays"]] == [1]
+    assert response.json["next_before"] is None
+
+
+def test_negative_get_history_before_invalid(login):
+    client, token = login
+    response = client.get(
+        "/play/history?before=yesterday",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_positive_flask_play_prune_history(app, db):
+    from datetime import datetime
+    from app.repositories.play import PlayRepository
+
+    PlayRepository(db).append_history([(1, 1, datetime(2000, 1, 1))])
+
+    result = app.test_cli_runner().invoke(args=["play", "prune-history"])
+    assert result.exit_code == 0
+    assert "Dropped 1 history partitions" in result.output
+    assert "2000-01" in result.output
+
+
+def test_positive_flask_play_flush(app, db):
+    result = app.test_cli_runner().invoke(args=["play", "flush"])
+    assert result.exit_code == 0
+    assert result.output == "Flushed 0 plays\n"
+
+
+def test_positive_shutdown_writes_buffered_plays(app, db, login, songs):
+    from app.common.shutdown import shutdown
+    from app.repositories.play import PlayRepository
+
+    client, token = login
+    client.post("/play/1", headers={"Authorization": f"Bearer {token}"})
+
+    shutdown(app)
+
+    plays = PlayRepository(db).get_history(1, None, 10)
+    assert [song_id for song_id, _ in plays] == [1]
@@ -111,6 +111,51 @@ def test_positive_update_playlist(login):
     assert response.status_code == HTTPStatus.OK
 
 
+def test_positive_update_playlist_if_match(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+
+    response = client.get(
+        GET_PLAYLIST_BY_ID_URL, headers={"Authorization": f"Bearer {token}"}
+    )
+    version = response.json["version"]
+
+    response = client.put(
+        UPDATE_PLAYLIST_URL,
+        headers={"Authorization": f"Bearer {token}", "If-Match": f'"{version}"'},
+        data={"title": TEST_UPDATED_TEXT},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.put(
+        UPDATE_PLAYLIST_URL,
+        headers={"Authorization": f"Bearer {token}", "If-Match": f'"{version}"'},
+        data={"title": "stale"},
+    )
+
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+
+    response = client.get(
+        GET_PLAYLIST_BY_ID_URL, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.json["title"] == TEST_UPDATED_TEXT
+    version = response.json["version"]
+
+    client.post(
+        f"/playlist/add-song/1/{songs[0].id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    response = client.put(
+        UPDATE_PLAYLIST_URL,
+        headers={"Authorization": f"Bearer {token}", "If-Match": f'"{version}"'},
+        data={"title": "stale"},
+    )
+
+    assert response.status_code == HTTPStatus.PRECONDITION_FAILED
+
+
 def test_negative_update_playlist_unauthorized(login):
     client, token = login
 
@@ -341,3 +386,359 @@ def test_positive_playlist_get_by_id_with_songs_with_pagination(login, songs):
 
     assert response.status_code == HTTPStatus.OK
     assert len(response.json["songs"]) == 5
+
+
+def test_positive_playlist_get_by_id_not_modified(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+
+    response = client.get(
+        GET_PLAYLIST_BY_ID_URL, headers={"Authorization": f"Bearer {token}"}
+    )
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        GET_PLAYLIST_BY_ID_URL,
+        headers={"Authorization": f"Bearer {token}", "If-None-Match": etag},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.data == b""
+
+    client.post(
+        f"/playlist/add-song/1/{songs[0].id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    response = client.get(
+        GET_PLAYLIST_BY_ID_URL,
+        headers={"Authorization": f"Bearer {token}", "If-None-Match": etag},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+    assert len(response.json["songs"]) == 1
+
+
+def test_positive_playlist_get_all_not_modified(login):
+    client, token = login
+
+    create_playlist(client, token)
+
+    response = client.get(
+        "/playlist/get-all", headers={"Authorization": f"Bearer {token}"}
+    )
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "/playlist/get-all",
+        headers={"Authorization": f"Bearer {token}", "If-None-Match": etag},
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    create_playlist(client, token)
+    response = client.get(
+        "/playlist/get-all",
+        headers={"Authorization": f"Bearer {token}", "If-None-Match": etag},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json) == 2
+
+
+def test_positive_playlist_get_by_id_with_fields(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+    client.post(
+        f"/playlist/add-song/1/{songs[0].id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    response = client.get(
+        f"{GET_PLAYLIST_BY_ID_URL}?fields=id,title&song_fields=id",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {"id": 1, "title": "test", "songs": [{"id": songs[0].id}]}
+
+
+def test_negative_playlist_get_all_unknown_field(login):
+    client, token = login
+
+    response = client.get(
+        "/playlist/get-all?fields=id,secret",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json["message"] == "Unknown fields: secret"
+
+
+def test_positive_playlist_move_song(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+
+    for song in songs:
+        response = client.post(
+            f"/playlist/add-song/1/{song.id}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == HTTPStatus.OK
+
+    response = client.post(
+        f"/playlist/move-song/1/{songs[-1].id}?index=0",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+
+    response = client.get(
+        "/playlist/get-by-id/1?take=3",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert [song["id"] for song in response.json["songs"]] == [
+        songs[-1].id,
+        songs[0].id,
+        songs[1].id,
+    ]
+
+
+def test_negative_playlist_move_song_not_in_playlist(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+
+    response = client.post(
+        f"/playlist/move-song/1/{songs[0].id}?index=0",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_negative_playlist_move_song_index_required(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+
+    response = client.post(
+        f"/playlist/move-song/1/{songs[0].id}",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_positive_playlist_add_songs(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+
+    song_ids = [song.id for song in songs]
+    response = client.post(
+        "/playlist/add-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"song_ids": song_ids + [9999, song_ids[0]]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {"added": song_ids, "missing": [9999]}
+
+    response = client.post(
+        "/playlist/add-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"song_ids": song_ids[:2]},
+    )
+
+    assert response.json == {"added": [], "missing": []}
+
+    response = client.get(
+        "/playlist/get-by-id/1?take=100",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert [song["id"] for song in response.json["songs"]] == song_ids
+
+
+def test_positive_playlist_remove_songs(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+
+    song_ids = [song.id for song in songs]
+    client.post(
+        "/playlist/add-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"song_ids": song_ids},
+    )
+
+    response = client.post(
+        "/playlist/remove-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"song_ids": song_ids[:3] + [9999]},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {"removed": song_ids[:3], "missing": [9999]}
+
+
+def test_negative_playlist_add_songs_song_ids_required(login):
+    client, token = login
+
+    create_playlist(client, token)
+
+    response = client.post(
+        "/playlist/add-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_positive_playlist_get_all_with_song_count_and_preview(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+    create_playlist(client, token)
+
+    song_ids = [song.id for song in songs]
+    client.post(
+        "/playlist/add-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"song_ids": song_ids},
+    )
+
+    response = client.get(
+        "/playlist/get-all?song_count=true&preview=3&song_fields=id",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    first, second = response.json
+    assert first["song_count"] == len(songs)
+    assert first["songs"] == [{"id": id_} for id_ in song_ids[:3]]
+    assert second["song_count"] == 0
+    assert second["songs"] == []
+
+
+def test_positive_playlist_get_all_streamed_with_song_count_and_preview(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+    create_playlist(client, token)
+
+    song_ids = [song.id for song in songs]
+    client.post(
+        "/playlist/add-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"song_ids": song_ids},
+    )
+
+    response = client.get(
+        "/playlist/get-all?stream=true&fields=id&song_count=true&preview=2&song_fields=id",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.is_streamed
+    assert response.json == [
+        {
+            "id": 1,
+            "song_count": len(songs),
+            "songs": [{"id": id_} for id_ in song_ids[:2]],
+        },
+        {"id": 2, "song_count": 0, "songs": []},
+    ]
+
+
+def test_positive_playlist_copy(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+
+    song_ids = [song.id for song in songs]
+    client.post(
+        "/playlist/add-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"song_ids": song_ids},
+    )
+    client.post(
+        f"/playlist/move-song/1/{song_ids[-1]}?index=0",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    response = client.post(
+        "/playlist/copy/1",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"title": "copy"},
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    copy_id = response.json["id"]
+
+    source = client.get(
+        "/playlist/get-by-id/1?take=100",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    copy = client.get(
+        f"/playlist/get-by-id/{copy_id}?take=100",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert copy.json["title"] == "copy"
+    assert copy.json["songs"] == source.json["songs"]
+
+
+def test_negative_playlist_copy_not_found(login):
+    client, token = login
+
+    response = client.post(
+        "/playlist/copy/1",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_positive_playlist_get_many(login):
+    client, token = login
+
+    create_playlist(client, token)
+    create_playlist(client, token)
+
+    response = client.get(
+        "/playlist/get-many?ids=2,5,1",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    second, missing, first = response.json
+    assert (first["id"], second["id"], missing) == (1, 2, None)
+
+
+def test_positive_playlist_get_by_id_include_user(login, songs):
+    client, token = login
+
+    create_playlist(client, token)
+    client.post(
+        "/playlist/add-songs/1",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"song_ids": [song.id for song in songs[:2]]},
+    )
+
+    response = client.get(
+        "/playlist/get-by-id/1?song_fields=title&include=user",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    user = {"id": 1, "username": USER_DATA["username"], "avatar": None}
+    assert response.json["songs"] == [
+        {"title": songs[0].title, "user": user},
+        {"title": songs[1].title, "user": user},
+    ]
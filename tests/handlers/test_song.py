@@ -1,3 +1,4 @@
+import json
 import pytest
 from http import HTTPStatus
 
@@ -23,6 +24,20 @@ def login(register):
     yield client, token
 
 
+@pytest.fixture
+def songs(db):
+    from app.models.song import Song
+
+    songs_ = []
+    for i in range(3):
+        song = Song(title=f"test-{i}", song_url=f"test-{i}", user_id=1)
+        db.session.add(song)
+        songs_.append(song)
+
+    db.session.commit()
+    yield songs_
+
+
 def test_negative_get_song_by_id_not_found(login):
     client, token = login
     response = client.get(
@@ -35,3 +50,202 @@ def test_positive_get_all_song(login):
     client, token = login
     response = client.get("/song/get-all", headers={"Authorization": f"Bearer {token}"})
     assert response.status_code == HTTPStatus.OK
+
+
+def test_positive_get_all_song_streamed_empty(login):
+    client, token = login
+    response = client.get(
+        "/song/get-all?stream=true", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == []
+
+
+def test_negative_get_many_song_invalid_ids(login):
+    client, token = login
+    response = client.get(
+        "/song/get-many?ids=1,x", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_positive_get_song_by_id_include_user(login, songs):
+    client, token = login
+    response = client.get(
+        f"/song/get-by-id/{songs[0].id}?fields=title&include=user",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {
+        "title": "test-0",
+        "user": {"id": 1, "username": "test", "avatar": None},
+    }
+
+
+def test_positive_get_many_song_include_user(login, songs):
+    client, token = login
+    response = client.get(
+        f"/song/get-many?ids={songs[1].id},999&include=user",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    song, missing = response.json
+    assert song["user_id"] == 1
+    assert song["user"]["username"] == "test"
+    assert missing is None
+
+
+def test_positive_get_many_song_include_user_duplicate_ids(login, songs):
+    client, token = login
+    response = client.get(
+        f"/song/get-many?ids={songs[0].id},{songs[0].id}&include=user&fields=title",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    expected = {
+        "title": "test-0",
+        "user": {"id": 1, "username": "test", "avatar": None},
+    }
+    assert response.json == [expected, expected]
+
+
+def test_positive_get_all_song_streamed_include_user(login, songs):
+    client, token = login
+    response = client.get(
+        "/song/get-all?fields=title&include=user",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/x-ndjson",
+        },
+    )
+    assert response.status_code == HTTPStatus.OK
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == len(songs)
+    assert rows[0] == {
+        "title": "test-0",
+        "user": {"id": 1, "username": "test", "avatar": None},
+    }
+
+
+def test_negative_get_all_song_unknown_include(login):
+    client, token = login
+    response = client.get(
+        "/song/get-all?include=playlists", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_negative_get_similar_song_not_found(login):
+    client, token = login
+    response = client.get(
+        "/song/similar/999", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_positive_get_similar_song(app, db, login, songs):
+    pytest.importorskip("numpy")
+    from app.models.playlist import Playlist
+
+    client, token = login
+    ids = [song.id for song in songs]
+    # songs 0 and 1 share two playlists, songs 1 and 2 one
+    for members in ([0, 1], [0, 1, 2]):
+        playlist = Playlist(title="test", user_id=1)
+        db.session.add(playlist)
+        db.session.commit()
+        playlist.add_songs([ids[i] for i in members])
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["song", "rebuild-similar"])
+    assert result.exit_code == 0
+    assert "Wrote 6 similar songs" in result.output
+
+    response = client.get(
+        f"/song/similar/{ids[0]}?fields=title",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert [song["title"] for song in response.json["songs"]] == ["test-1", "test-2"]
+    assert response.json["songs"][0]["score"] == pytest.approx(1.0)
+
+    client.delete(
+        f"/song/delete/{ids[1]}", headers={"Authorization": f"Bearer {token}"}
+    )
+    response = client.get(
+        f"/song/similar/{ids[0]}?fields=title",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.json == {
+        "songs": [{"title": "test-2", "score": pytest.approx(0.7071, abs=1e-4)}]
+    }
+
+
+def seed_songs(db, count):
+    from sqlalchemy import insert
+    from app.models.song import Song
+
+    db.session.execute(
+        insert(Song),
+        [
+            {"title": f"test-{i}", "song_url": f"test-{i}", "user_id": 1}
+            for i in range(count)
+        ],
+    )
+    db.session.commit()
+
+
+def test_positive_flask_song_export(app, db, tmp_path):
+    seed_songs(db, 3)
+    path = str(tmp_path / "songs.csv.gz")
+
+    result = app.test_cli_runner().invoke(
+        args=["song", "export", "--fields", "id,title", "-o", path]
+    )
+    assert result.exit_code == 0
+    assert "Wrote 3 songs" in result.output
+
+    import csv
+    import gzip
+
+    with gzip.open(path, "rt", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert rows == [{"id": str(i + 1), "title": f"test-{i}"} for i in range(3)]
+
+
+def test_positive_flask_song_export_stdout(app, db):
+    seed_songs(db, 2)
+
+    result = app.test_cli_runner().invoke(
+        args=["song", "export", "--fields", "title", "--format", "ndjson"]
+    )
+    assert result.exit_code == 0
+    assert '{"title": "test-0"}\n{"title": "test-1"}\n' in result.output
+
+
+def test_negative_flask_song_export_unknown_field(app, db):
+    result = app.test_cli_runner().invoke(args=["song", "export", "--fields", "x"])
+    assert result.exit_code != 0
+    assert "x" in result.output
+
+
+def test_positive_flask_song_export_memory_is_flat(app, db, tmp_path):
+    import tracemalloc
+
+    def peak(count):
+        db.session.execute(db.text("DELETE FROM songs"))
+        seed_songs(db, count)
+        db.session.expire_all()
+        tracemalloc.start()
+        try:
+            result = app.test_cli_runner().invoke(
+                args=["song", "export", "-o", str(tmp_path / f"{count}.csv")]
+            )
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            assert result.exit_code == 0
+
+    small, large = peak(2_000), peak(20_000)
+    # Ten times the rows, yet the peak stays within a batch of the small run
+    assert large < small * 2
@@ -1,3 +1,4 @@
+import json
 import pytest
 from http import HTTPStatus
 
@@ -182,3 +183,170 @@ def test_positive_get_songs_by_user_id(client):
     )
 
     assert response.status_code == HTTPStatus.OK
+
+
+def test_positive_get_followers_streamed_json(client, login):
+    tokens = login
+    for token in tokens[1:]:
+        client.post(
+            f"/user/follow?user_id=1",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    response = client.get(
+        "/user/get-followers?stream=true&fields=id",
+        headers={"Authorization": f"Bearer {tokens[0]}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.is_streamed
+    assert response.json == {
+        "followers": [
+            {"id": i, "is_followed_by_me": False} for i in range(2, NUM_USERS + 1)
+        ]
+    }
+
+
+def test_positive_get_followed_users_ndjson(client, login):
+    tokens = login
+    for i in range(2, NUM_USERS + 1):
+        client.post(
+            f"/user/follow?user_id={i}",
+            headers={"Authorization": f"Bearer {tokens[0]}"},
+        )
+
+    response = client.get(
+        "/user/get-followed-users?take=3&fields=id,username",
+        headers={
+            "Authorization": f"Bearer {tokens[0]}",
+            "Accept": "application/x-ndjson",
+        },
+    )
+
+    lines = response.data.decode("utf-8").splitlines()
+    assert response.status_code == HTTPStatus.OK
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line)["id"] for line in lines] == [2, 3, 4]
+    assert all(json.loads(line)["is_followed_by_me"] for line in lines)
+
+
+def test_positive_get_many_users(client, login):
+    response = client.get(
+        "/user/get-many?ids=3,99,1&fields=username",
+        headers={"Authorization": f"Bearer {login[0]}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == [{"username": "test3"}, None, {"username": "test1"}]
+
+
+def test_positive_get_followers_is_followed_by_me(client, login):
+    tokens = login
+    for token in tokens[1:3]:
+        client.post(
+            "/user/follow?user_id=1",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    client.post(
+        "/user/follow?user_id=2",
+        headers={"Authorization": f"Bearer {tokens[0]}"},
+    )
+
+    response = client.get(
+        "/user/get-followers?fields=username",
+        headers={"Authorization": f"Bearer {tokens[0]}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json["followers"] == [
+        {"username": "test2", "is_followed_by_me": True},
+        {"username": "test3", "is_followed_by_me": False},
+    ]
+
+    response = client.get(
+        "/user/get-followed-users",
+        headers={"Authorization": f"Bearer {tokens[0]}"},
+    )
+
+    assert [user["is_followed_by_me"] for user in response.json["followed_users"]] == [
+        True
+    ]
+
+
+def test_positive_get_suggestions_without_snapshot(app, client, login, tmp_path):
+    app.config["FOLLOW_GRAPH_DIR"] = str(tmp_path)
+
+    response = client.get(
+        "/user/suggestions",
+        headers={"Authorization": f"Bearer {login[0]}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {"suggestions": []}
+
+
+def test_positive_get_suggestions(app, client, login, tmp_path):
+    pytest.importorskip("numpy")
+    app.config["FOLLOW_GRAPH_DIR"] = str(tmp_path)
+    tokens = login
+
+    # 1 follows 2 and 3, who both follow 4; 3 also follows 5
+    for follower, followed in ((1, 2), (1, 3), (2, 4), (3, 4), (3, 5), (2, 3)):
+        client.post(
+            f"/user/follow?user_id={followed}",
+            headers={"Authorization": f"Bearer {tokens[follower - 1]}"},
+        )
+
+    result = app.test_cli_runner().invoke(args=["user", "snapshot-follow-graph"])
+    assert result.exit_code == 0
+    assert "5 users, 6 follows" in result.output
+
+    # followed after the snapshot was taken, so it is filtered out
+    client.post(
+        "/user/follow?user_id=5",
+        headers={"Authorization": f"Bearer {tokens[0]}"},
+    )
+
+    response = client.get(
+        "/user/suggestions?fields=username",
+        headers={"Authorization": f"Bearer {tokens[0]}"},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json == {"suggestions": [{"username": "test4", "mutual_count": 2}]}
+
+
+def test_positive_flask_user_export_followers(app, client, login, tmp_path):
+    tokens = login
+    for token in tokens[1:4]:
+        client.post(
+            "/user/follow?user_id=1",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    path = str(tmp_path / "followers.ndjson")
+
+    result = app.test_cli_runner().invoke(
+        args=[
+            "user",
+            "export-followers",
+            "1",
+            "--fields",
+            "username",
+            "--format",
+            "ndjson",
+            "-o",
+            path,
+        ]
+    )
+    assert result.exit_code == 0
+    assert "Wrote 3 followers" in result.output
+
+    with open(path) as file:
+        usernames = sorted(json.loads(line)["username"] for line in file)
+    assert usernames == ["test2", "test3", "test4"]
+
+
+def test_negative_flask_user_export_songs_user_not_found(app, client, login):
+    result = app.test_cli_runner().invoke(args=["user", "export-songs", "999"])
+    assert result.exit_code != 0
+    assert USER_NOT_FOUND in result.output
@@ -1,10 +1,11 @@
 import pytest
 from typing import List, Tuple
+from sqlalchemy import select
 from flask_sqlalchemy import SQLAlchemy
 
 from app.models.user import User
 from app.models.song import Song
-from app.models.playlist import Playlist
+from app.models.playlist import POSITION_STEP, Playlist, playlist_songs
 
 PLAYLIST1_NAME = "Playlist 1"
 
@@ -156,3 +157,148 @@ def test_positive_remove_songs_from_playlist(
         playlist.remove_song(song)
 
     assert len(playlist.get_songs()) == 0
+
+
+def test_positive_add_song_at_index(
+    db: SQLAlchemy, playlist_with_songs: Tuple[Playlist, List[Song]]
+):
+    playlist, songs = playlist_with_songs
+
+    song = Song(
+        title="inserted",
+        song_url="test",
+        small_thumbnail_url="test",
+        large_thumbnail_url="test",
+        user_id=playlist.user_id,
+    )
+    db.session.add(song)
+    playlist.add_song(song, 1)
+
+    ids = [s.id for s in playlist.get_songs(take=20)]
+    assert ids == [songs[0].id, song.id] + [s.id for s in songs[1:]]
+
+
+def test_positive_move_song(playlist_with_songs: Tuple[Playlist, List[Song]]):
+    playlist, songs = playlist_with_songs
+
+    playlist.move_song(songs[-1].id, 0)
+    playlist.move_song(songs[1].id, 5)
+
+    ids = [s.id for s in playlist.get_songs(take=20)]
+    expected = [s.id for s in songs]
+    expected.insert(0, expected.pop())
+    expected.insert(5, expected.pop(2))
+    assert ids == expected
+
+
+def test_positive_move_song_until_gap_runs_out(
+    playlist_with_songs: Tuple[Playlist, List[Song]]
+):
+    playlist, songs = playlist_with_songs
+
+    crowded = False
+    for i in range(40):
+        crowded = playlist.move_song(songs[i % 2].id, 1) or crowded
+
+    assert crowded
+    ids = [s.id for s in playlist.get_songs(take=20)]
+    assert sorted(ids) == sorted(s.id for s in songs)
+    assert ids[:3] == [songs[0].id, songs[1].id, songs[2].id]
+
+
+def test_positive_rebalance_keeps_order(
+    playlist_with_songs: Tuple[Playlist, List[Song]]
+):
+    playlist, songs = playlist_with_songs
+    playlist.move_song(songs[-1].id, 0)
+    before = [s.id for s in playlist.get_songs(take=20)]
+
+    playlist.rebalance()
+
+    assert [s.id for s in playlist.get_songs(take=20)] == before
+    assert playlist.has_song(songs[0].id)
+
+
+def test_positive_rebalance_keeps_order_not_in_insertion_order(
+    db: SQLAlchemy, playlist_with_songs: Tuple[Playlist, List[Song]]
+):
+    playlist, songs = playlist_with_songs
+    for song, position in zip(songs, [5, 3, 100, 1, 2, 50]):
+        db.session.execute(
+            playlist_songs.update()
+            .where(playlist_songs.c.song_id == song.id)
+            .values(position=position)
+        )
+    before = [s.id for s in playlist.get_songs(take=20)]
+
+    playlist.rebalance()
+
+    assert [s.id for s in playlist.get_songs(take=20)] == before
+    positions = db.session.execute(
+        select(playlist_songs.c.position)
+        .where(playlist_songs.c.playlist_id == playlist.id)
+        .order_by(playlist_songs.c.position)
+    ).scalars()
+    assert list(positions) == [
+        (index + 1) * POSITION_STEP for index in range(len(songs))
+    ]
+
+
+def test_positive_add_songs_skips_duplicates(
+    db: SQLAlchemy, playlist_with_songs: Tuple[Playlist, List[Song]]
+):
+    playlist, songs = playlist_with_songs
+    playlist.remove_song(songs[3])
+
+    added = playlist.add_songs([songs[3].id, songs[0].id, songs[3].id])
+    db.session.commit()
+
+    assert added == [songs[3].id]
+    ids = [s.id for s in playlist.get_songs(take=20)]
+    assert ids[-1] == songs[3].id
+    assert len(ids) == len(songs)
+
+
+def test_positive_remove_songs(
+    db: SQLAlchemy, playlist_with_songs: Tuple[Playlist, List[Song]]
+):
+    playlist, songs = playlist_with_songs
+
+    removed = playlist.remove_songs([songs[2].id, songs[5].id, 9999])
+    db.session.commit()
+
+    assert removed == [songs[2].id, songs[5].id]
+    ids = [s.id for s in playlist.get_songs(take=20)]
+    assert songs[2].id not in ids
+    assert songs[5].id not in ids
+    assert len(ids) == len(songs) - 2
+
+
+def test_positive_copy_songs_from(
+    db: SQLAlchemy, playlist_with_songs: Tuple[Playlist, List[Song]]
+):
+    playlist, songs = playlist_with_songs
+    playlist.move_song(songs[-1].id, 0)
+    db.session.commit()
+
+    copy = Playlist(title="copy", user_id=playlist.user_id)
+    db.session.add(copy)
+    copy.copy_songs_from(playlist.id)
+    db.session.commit()
+
+    assert [s.id for s in copy.get_songs(take=20)] == [
+        s.id for s in playlist.get_songs(take=20)
+    ]
+
+
+def test_positive_compare_and_swap(initialize: Tuple[SQLAlchemy, User, Playlist]):
+    db, _, playlist = initialize
+    version = playlist.version
+
+    assert Playlist.compare_and_swap(playlist.id, version, {"title": "first"})
+    assert not Playlist.compare_and_swap(playlist.id, version, {"title": "second"})
+    db.session.commit()
+
+    db.session.refresh(playlist)
+    assert playlist.title == "first"
+    assert playlist.version == version + 1
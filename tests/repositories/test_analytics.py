@@ -0,0 +1,137 @@
+from datetime import date, datetime
+
+from app.models.analytics import DailyRollup
+from app.repositories.analytics import AnalyticsRepository
+
+DAY1 = datetime(2022, 5, 1, 10)
+DAY2 = datetime(2022, 5, 2, 10)
+
+
+def create_user(db, i: int, created_at: datetime, last_login=None):
+    from app.models.user import User
+
+    user = User(
+        email=f"test{i}@test.com",
+        username=f"test{i}",
+        created_at=created_at,
+        last_login=last_login,
+    )
+    user.set_password("test")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def rollups(db):
+    return {
+        rollup.day: DailyRollup.row_to_dict(rollup)
+        for rollup in DailyRollup.query.all()
+    }
+
+
+def test_positive_rollup_counts_by_day(db):
+    from app.models.song import Song
+    from app.models.playlist import Playlist
+
+    user = create_user(db, 1, DAY1, DAY1)
+    create_user(db, 2, DAY1, DAY2)
+    create_user(db, 3, DAY2)
+    db.session.add(Song(title="a", song_url="a", user_id=user.id, created_at=DAY2))
+    db.session.add(
+        Playlist(title="a", user_id=user.id, created_at=DAY1, updated_at=DAY2)
+    )
+    db.session.commit()
+
+    repository = AnalyticsRepository(db)
+    days = repository.rollup("daily", datetime.min, datetime(2022, 5, 3))
+
+    assert days == [date(2022, 5, 1), date(2022, 5, 2)]
+    assert rollups(db) == {
+        date(2022, 5, 1): {
+            "day": "2022-05-01",
+            "signups": 2,
+            "active_users": 1,
+            "uploads": 0,
+            "playlists_created": 1,
+            "active_playlists": 0,
+        },
+        date(2022, 5, 2): {
+            "day": "2022-05-02",
+            "signups": 1,
+            "active_users": 1,
+            "uploads": 1,
+            "playlists_created": 0,
+            "active_playlists": 1,
+        },
+    }
+    assert repository.get_watermark("daily") == datetime(2022, 5, 3)
+
+
+def test_positive_rollup_is_incremental(db):
+    user = create_user(db, 1, DAY1, DAY1)
+    repository = AnalyticsRepository(db)
+    repository.rollup("daily", datetime.min, datetime(2022, 5, 1, 12))
+
+    # a second login the same day must not count the user twice, and only
+    # signups after the watermark are added
+    user.last_login = datetime(2022, 5, 1, 18)
+    create_user(db, 2, datetime(2022, 5, 1, 20))
+    db.session.commit()
+    days = repository.rollup("daily", datetime(2022, 5, 1, 12), datetime(2022, 5, 2))
+
+    assert days == [date(2022, 5, 1)]
+    assert rollups(db)[date(2022, 5, 1)]["signups"] == 2
+    assert rollups(db)[date(2022, 5, 1)]["active_users"] == 1
+    assert repository.get_watermark("daily") == datetime(2022, 5, 2)
+
+
+def test_positive_get_daily_rows(db):
+    create_user(db, 1, DAY1)
+    repository = AnalyticsRepository(db)
+    repository.rollup("daily", datetime.min, DAY2)
+
+    assert list(repository.get_daily_rows(date(2022, 5, 1), date(2022, 5, 1))) == [
+        date(2022, 5, 1)
+    ]
+    assert repository.get_daily_rows(date(2022, 5, 2), date(2022, 5, 9)) == {}
+
+
+def test_positive_iter_signup_chunks(db):
+    for i in range(5):
+        create_user(db, i, datetime(2022, 5, 1 + i), DAY2)
+
+    repository = AnalyticsRepository(db)
+    chunks = list(
+        repository.iter_signup_chunks(datetime(2022, 5, 2), datetime(2022, 5, 5), 2)
+    )
+
+    assert [[user[0] for user in users] for users in chunks] == [[2, 3], [4]]
+    assert chunks[0][0][1:] == (datetime(2022, 5, 2), DAY2)
+
+
+def test_positive_get_login_days(db):
+    for i in range(1, 4):
+        create_user(db, i, DAY1, DAY1)
+
+    repository = AnalyticsRepository(db)
+    repository.rollup("daily", datetime.min, DAY2)
+
+    assert sorted(
+        repository.get_login_days(2, 3, date(2022, 5, 1), date(2022, 5, 2))
+    ) == [(2, date(2022, 5, 1)), (3, date(2022, 5, 1))]
+    assert repository.get_login_days(1, 3, date(2022, 5, 2), date(2022, 5, 9)) == []
+
+
+def test_positive_save_cohort_report(db):
+    repository = AnalyticsRepository(db)
+    start, end = date(2022, 5, 2), date(2022, 5, 29)
+
+    assert repository.get_cohort_report(start, end) is None
+
+    repository.save_cohort_report(start, end, {"cohorts": []})
+    repository.save_cohort_report(start, end, {"cohorts": [{"size": 1}]})
+
+    report = repository.get_cohort_report(start, end)
+    assert report["cohorts"] == [{"size": 1}]
+    assert "computed_at" in report
+    assert repository.get_cohort_report(start, date(2022, 5, 30)) is None
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+from app.repositories.export import ExportRepository
+
+DAY1 = datetime(2022, 5, 1, 10)
+DAY2 = datetime(2022, 5, 2, 10)
+UNTIL = datetime(2022, 5, 3)
+
+
+def create_users(db, *updated_ats):
+    from app.models.user import User
+
+    users = []
+    for i, updated_at in enumerate(updated_ats):
+        user = User(email=f"test{i}@test.com", username=f"test{i}")
+        user.set_password("test")
+        user.updated_at = updated_at
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+    return users
+
+
+def exported(repository, table, watermark, batch_size=10):
+    return [
+        row
+        for rows in repository.iter_batches(table, watermark, UNTIL, batch_size)
+        for row in rows
+    ]
+
+
+def test_positive_columns_end_with_watermark():
+    repository = ExportRepository(None)
+
+    names = [name for name, _ in repository.columns("users")]
+    assert names[-2:] == ["updated_at", "id"]
+    assert "password" not in names
+    assert [name for name, _ in repository.columns("playlist_songs")] == [
+        "song_id",
+        "position",
+        "playlist_updated_at",
+        "playlist_id",
+    ]
+
+
+def test_positive_iter_batches_after_watermark(db):
+    create_users(db, DAY2, DAY1, DAY1, datetime(2022, 5, 4))
+    repository = ExportRepository(db)
+
+    rows = exported(repository, "users", None, batch_size=2)
+    assert [(row.updated_at, row.id) for row in rows] == [
+        (DAY1, 2),
+        (DAY1, 3),
+        (DAY2, 1),
+    ]
+
+    # ties on updated_at are broken by id
+    rows = exported(repository, "users", (DAY1, 2))
+    assert [row.id for row in rows] == [3, 1]
+
+
+def test_positive_iter_batches_playlist_songs_follow_playlist(db):
+    from app.models.song import Song
+    from app.models.playlist import Playlist
+
+    user = create_users(db, DAY1)[0]
+    song = Song(title="a", song_url="a", user_id=user.id)
+    playlists = [Playlist(title=f"p{i}", user_id=user.id) for i in range(2)]
+    db.session.add_all([song, *playlists])
+    db.session.commit()
+    for playlist in playlists:
+        playlist.add_songs([song.id])
+    playlists[0].updated_at, playlists[1].updated_at = DAY1, DAY2
+    db.session.commit()
+
+    repository = ExportRepository(db)
+    rows = exported(repository, "playlist_songs", (DAY1, playlists[0].id))
+
+    assert [(row.playlist_id, row.song_id) for row in rows] == [
+        (playlists[1].id, song.id)
+    ]
+
+
+def test_positive_iter_batches_followers_snapshot(db):
+    users = create_users(db, DAY1, DAY1)
+    users[0].follow(users[1])
+    db.session.commit()
+
+    repository = ExportRepository(db)
+
+    assert not repository.is_incremental("followers")
+    assert exported(repository, "followers", (UNTIL, 99)) == [(1, 2)]
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+from app.models.job import JOB_DEAD, JOB_QUEUED, JOB_RUNNING
+from app.repositories.job import JobRepository
+
+NOW = datetime(2022, 5, 1, 10)
+VISIBILITY = timedelta(minutes=5)
+
+
+def test_positive_claim_due_jobs_in_order(db):
+    repository = JobRepository(db)
+    later = repository.enqueue("b", {}, 3, NOW + timedelta(minutes=1))
+    first = repository.enqueue("a", {"x": 1}, 3, NOW - timedelta(minutes=1))
+    second = repository.enqueue("a", {}, 3, NOW)
+
+    job = repository.claim(NOW, VISIBILITY)
+    assert job["id"] == first
+    assert job["payload"] == {"x": 1}
+    assert job["attempts"] == 1
+    assert repository.claim(NOW, VISIBILITY)["id"] == second
+    assert repository.claim(NOW, VISIBILITY) is None
+    assert repository.claim(NOW + timedelta(minutes=1), VISIBILITY)["id"] == later
+
+
+def test_positive_claim_again_after_visibility_timeout(db):
+    repository = JobRepository(db)
+    repository.enqueue("a", {}, 3, NOW)
+    job = repository.claim(NOW, VISIBILITY)
+
+    assert repository.claim(NOW + VISIBILITY - timedelta(seconds=1), VISIBILITY) is None
+    reclaimed = repository.claim(NOW + VISIBILITY, VISIBILITY)
+    assert reclaimed["attempts"] == 2
+
+    # The first lease is gone, its worker can no longer finish the job
+    assert not repository.complete(job["id"], job["lease"])
+    assert repository.complete(reclaimed["id"], reclaimed["lease"])
+    assert repository.count_by_status() == {}
+
+
+def test_positive_claim_by_id(db):
+    repository = JobRepository(db)
+    repository.enqueue("a", {}, 3, NOW)
+    second = repository.enqueue("a", {}, 3, NOW)
+
+    assert repository.claim(NOW, VISIBILITY, second)["id"] == second
+    assert repository.claim(NOW, VISIBILITY, second) is None
+
+
+def test_positive_fail_retries_then_dead_letters(db):
+    repository = JobRepository(db)
+    repository.enqueue("a", {}, 2, NOW)
+
+    job = repository.claim(NOW, VISIBILITY)
+    assert repository.fail(job["id"], job["lease"], "boom", NOW + timedelta(hours=1))
+    assert repository.count_by_status() == {JOB_QUEUED: 1}
+    assert repository.claim(NOW, VISIBILITY) is None
+
+    job = repository.claim(NOW + timedelta(hours=1), VISIBILITY)
+    assert repository.count_by_status() == {JOB_RUNNING: 1}
+    assert repository.fail(job["id"], job["lease"], "boom", None)
+    assert repository.count_by_status() == {JOB_DEAD: 1}
+    assert repository.claim(NOW + timedelta(days=1), VISIBILITY) is None
+
+    assert repository.retry_dead(NOW) == 1
+    assert repository.claim(NOW, VISIBILITY)["attempts"] == 1
+
+
+def test_positive_release_gives_job_back_uncounted(db):
+    repository = JobRepository(db)
+    repository.enqueue("a", {}, 3, NOW)
+    job = repository.claim(NOW, VISIBILITY)
+
+    assert repository.release(job["id"], job["lease"], NOW)
+    assert not repository.release(job["id"], job["lease"], NOW)
+    assert not repository.complete(job["id"], job["lease"])
+    assert repository.claim(NOW, VISIBILITY)["attempts"] == 1
+
+
+def test_positive_extend_keeps_job_invisible(db):
+    repository = JobRepository(db)
+    repository.enqueue("a", {}, 3, NOW)
+    job = repository.claim(NOW, VISIBILITY)
+
+    assert repository.extend(job["id"], job["lease"], NOW + 2 * VISIBILITY)
+    assert repository.claim(NOW + VISIBILITY, VISIBILITY) is None
+    reclaimed = repository.claim(NOW + 2 * VISIBILITY, VISIBILITY)
+
+    # Once claimed again the first lease can no longer be extended
+    assert not repository.extend(job["id"], job["lease"], NOW + 3 * VISIBILITY)
+    assert repository.extend(reclaimed["id"], reclaimed["lease"], NOW)
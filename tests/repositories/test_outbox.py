@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+from app.models.outbox import FOLLOWED, PLAYLIST_SONG_ADDED, SONG_CREATED
+from app.repositories.outbox import OutboxRepository
+
+LATER = datetime(9999, 1, 1)
+
+
+def create_user(db, i):
+    from app.models.user import User
+
+    user = User(email=f"test{i}@test.com", username=f"test{i}")
+    user.set_password("test")
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def test_positive_events_written_with_changes(db):
+    from app.models.playlist import Playlist
+    from app.repositories.song import SongRepository
+    from app.repositories.user import UserRepository
+    from app.repositories.playlist import PlaylistRepository
+
+    first, second = create_user(db, 1), create_user(db, 2)
+    UserRepository(db).follow(first, second)
+    UserRepository(db).follow(first, second)
+    SongRepository(db).create({"title": "a", "song_url": "a", "user_id": first.id})
+    playlist = Playlist(title="p", user_id=first.id)
+    db.session.add(playlist)
+    db.session.commit()
+    PlaylistRepository(db).add_songs(playlist, [1])
+
+    events = OutboxRepository(db).get_events(0, LATER, 10)
+    assert [(event["id"], event["type"]) for event in events] == [
+        (1, FOLLOWED),
+        (2, SONG_CREATED),
+        (3, PLAYLIST_SONG_ADDED),
+    ]
+    assert events[0]["payload"] == {"follower_id": 1, "followed_id": 2}
+    assert events[2]["payload"] == {"playlist_id": 1, "song_id": 1}
+
+
+def test_negative_event_rolled_back_with_change(db):
+    from app.repositories.song import SongRepository
+
+    with pytest.raises(IntegrityError):
+        SongRepository(db).create({"title": "a", "user_id": 1})
+    db.session.rollback()
+
+    assert OutboxRepository(db).get_events(0, LATER, 10) == []
+
+
+def test_positive_get_events_after_watermark_until(db):
+    from app.models.outbox import add_event
+
+    repository = OutboxRepository(db)
+    for i in range(5):
+        add_event(db.session, FOLLOWED, follower_id=i, followed_id=0)
+    db.session.commit()
+
+    assert [event["id"] for event in repository.get_events(2, LATER, 2)] == [3, 4]
+    assert repository.get_events(0, datetime(2000, 1, 1), 10) == []
+
+
+def test_positive_watermarks_and_delete(db):
+    from app.models.outbox import add_event
+
+    repository = OutboxRepository(db)
+    for i in range(3):
+        add_event(db.session, FOLLOWED, follower_id=i, followed_id=0)
+    db.session.commit()
+
+    assert repository.get_watermark("file") == 0
+    repository.save_watermark("file", 2)
+    repository.save_watermark("queue", 3)
+    assert repository.get_watermark("file") == 2
+    assert repository.get_min_watermark(["file", "queue"]) == 2
+    assert repository.get_min_watermark(["file", "other"]) == 0
+
+    assert repository.delete_events(2, LATER) == 2
+    assert [event["id"] for event in repository.get_events(0, LATER, 10)] == [3]
@@ -0,0 +1,114 @@
+from datetime import date, datetime
+
+from app.common.sketch import HyperLogLog
+from app.models.play import SKETCH_LISTENERS
+from app.repositories.play import PlayRepository
+
+BUCKET = datetime(2022, 5, 1, 10)
+
+
+def listeners(*user_ids):
+    sketch = HyperLogLog()
+    for user_id in user_ids:
+        sketch.add(user_id)
+    return sketch
+
+
+def test_positive_merge_sketches_inserts_then_merges(db):
+    repository = PlayRepository(db)
+    key = (SKETCH_LISTENERS, 1, BUCKET)
+
+    repository.merge_sketches({key: listeners(1, 2)})
+    repository.merge_sketches({key: listeners(2, 3)})
+
+    rows = repository.get_sketches(SKETCH_LISTENERS, 1, BUCKET)
+    assert len(rows) == 1
+    assert HyperLogLog.from_bytes(rows[0]).count() == 3
+
+
+def test_positive_get_sketches_since(db):
+    repository = PlayRepository(db)
+    repository.merge_sketches(
+        {
+            (SKETCH_LISTENERS, 1, datetime(2022, 5, 1, 9)): listeners(1),
+            (SKETCH_LISTENERS, 1, BUCKET): listeners(2),
+            (SKETCH_LISTENERS, 2, BUCKET): listeners(3),
+        }
+    )
+
+    assert len(repository.get_sketches(SKETCH_LISTENERS, 1, BUCKET)) == 1
+    assert repository.delete_sketches_before(BUCKET) == 1
+
+
+def test_positive_append_history_routes_by_month(db):
+    repository = PlayRepository(db)
+    repository.append_history(
+        [
+            (1, 10, datetime(2022, 5, 31, 23)),
+            (1, 11, datetime(2022, 6, 1, 1)),
+            (2, 12, datetime(2022, 6, 2)),
+        ]
+    )
+    repository.append_history([(1, 13, datetime(2022, 6, 3))])
+
+    assert repository.get_history_partitions() == [
+        datetime(2022, 5, 1),
+        datetime(2022, 6, 1),
+    ]
+    assert repository.get_history(1, None, 10) == [
+        (13, datetime(2022, 6, 3)),
+        (11, datetime(2022, 6, 1, 1)),
+        (10, datetime(2022, 5, 31, 23)),
+    ]
+
+
+def test_positive_get_history_keyset_across_partitions(db):
+    repository = PlayRepository(db)
+    repository.append_history(
+        [
+            (1, song_id, datetime(2022, month, 15))
+            for song_id, month in enumerate((4, 5, 6))
+        ]
+    )
+
+    page = repository.get_history(1, datetime(2022, 6, 15), 1)
+    assert page == [(1, datetime(2022, 5, 15))]
+    assert repository.get_history(1, page[-1][1], 5) == [(0, datetime(2022, 4, 15))]
+
+
+def test_positive_get_play_days_across_partitions(db):
+    repository = PlayRepository(db)
+    repository.append_history(
+        [
+            (1, 10, datetime(2022, 5, 31, 9)),
+            (1, 11, datetime(2022, 5, 31, 23)),
+            (1, 12, datetime(2022, 6, 1, 1)),
+            (2, 10, datetime(2022, 6, 2)),
+            (3, 10, datetime(2022, 6, 2)),
+            (1, 13, datetime(2022, 7, 1)),
+        ]
+    )
+
+    days = repository.get_play_days(1, 2, date(2022, 5, 31), date(2022, 6, 30))
+
+    assert days == [
+        (1, date(2022, 5, 31)),
+        (1, date(2022, 6, 1)),
+        (2, date(2022, 6, 2)),
+    ]
+
+
+def test_positive_drop_history_before(db):
+    repository = PlayRepository(db)
+    repository.append_history([(1, 1, datetime(2022, month, 1)) for month in (3, 4, 5)])
+
+    assert repository.drop_history_before(datetime(2022, 5, 1)) == [
+        datetime(2022, 3, 1),
+        datetime(2022, 4, 1),
+    ]
+    assert repository.get_history_partitions() == [datetime(2022, 5, 1)]
+    assert repository.get_history(1, None, 10) == [(1, datetime(2022, 5, 1))]
+
+    # A partition dropped is made again when plays for its month come in
+    repository.append_history([(1, 2, datetime(2022, 4, 2))])
+    assert len(repository.get_history(1, None, 10)) == 2
@@ -143,3 +143,119 @@ def test_positive_remove_song_from_playlist(
 
     playlist.remove_song.assert_called_once()
     mocked_db.session.commit.assert_called_once()
+
+
+def test_positive_get_song_rows_matches_to_dict(db: SQLAlchemy):
+    from app.models.user import User
+    from app.models.song import Song
+    from app.models.playlist import Playlist as PlaylistModel
+
+    user = User(email="test@test.com", username="test")
+    user.set_password("test")
+    db.session.add(user)
+    db.session.commit()
+
+    playlist = PlaylistModel(title="test", user_id=user.id)
+    db.session.add(playlist)
+    for i in range(5):
+        song = Song(title=f"test-{i}", song_url="test", user_id=user.id)
+        db.session.add(song)
+        playlist.add_song(song)
+    db.session.commit()
+
+    playlist_repository = PlaylistRepository(db)
+
+    assert playlist_repository.get_song_rows(playlist.id, 3, 1) == [
+        song.to_dict() for song in playlist.get_songs(3, 1)
+    ]
+    assert playlist_repository.get_all_rows() == [playlist.to_dict()]
+
+
+def test_positive_get_song_counts_and_previews(db: SQLAlchemy):
+    from app.models.user import User
+    from app.models.song import Song
+    from app.models.playlist import Playlist as PlaylistModel
+
+    user = User(email="test@test.com", username="test")
+    user.set_password("test")
+    db.session.add(user)
+    db.session.commit()
+
+    songs = [
+        Song(title=f"test-{i}", song_url="test", user_id=user.id) for i in range(4)
+    ]
+    full = PlaylistModel(title="full", user_id=user.id)
+    single = PlaylistModel(title="single", user_id=user.id)
+    empty = PlaylistModel(title="empty", user_id=user.id)
+    db.session.add_all([*songs, full, single, empty])
+    db.session.flush()
+    for song in songs:
+        full.add_song(song)
+    full.move_song(songs[3].id, 0)
+    single.add_song(songs[1])
+    db.session.commit()
+
+    playlist_repository = PlaylistRepository(db)
+    playlist_ids = [full.id, single.id, empty.id]
+
+    assert playlist_repository.get_song_counts(playlist_ids) == {
+        full.id: 4,
+        single.id: 1,
+    }
+
+    previews = playlist_repository.get_song_previews(playlist_ids, 2, ("id", "title"))
+    assert previews == {
+        full.id: [
+            {"id": songs[3].id, "title": "test-3"},
+            {"id": songs[0].id, "title": "test-0"},
+        ],
+        single.id: [{"id": songs[1].id, "title": "test-1"}],
+    }
+
+
+def test_positive_rebalance_checks_version(db: SQLAlchemy):
+    from app.models.user import User
+    from app.models.song import Song
+    from app.models.playlist import POSITION_STEP, playlist_songs
+    from app.models.playlist import Playlist as PlaylistModel
+
+    user = User(email="test@test.com", username="test")
+    user.set_password("test")
+    db.session.add(user)
+    db.session.commit()
+
+    songs = [
+        Song(title=f"test-{i}", song_url="test", user_id=user.id) for i in range(3)
+    ]
+    playlist = PlaylistModel(title="test", user_id=user.id)
+    db.session.add_all([*songs, playlist])
+    db.session.flush()
+    for song in songs:
+        playlist.add_song(song)
+    playlist.move_song(songs[2].id, 0)
+    db.session.commit()
+    playlist_id = playlist.id
+
+    def positions():
+        statement = (
+            playlist_songs.select()
+            .with_only_columns(playlist_songs.c.song_id, playlist_songs.c.position)
+            .where(playlist_songs.c.playlist_id == playlist_id)
+            .order_by(playlist_songs.c.position)
+        )
+        return db.session.execute(statement).all()
+
+    before = positions()
+    playlist_repository = PlaylistRepository(db)
+
+    # A write landing in between leaves the positions alone
+    with mock.patch.object(PlaylistModel, "has_version", return_value=False):
+        assert not playlist_repository.rebalance(playlist_id)
+    assert positions() == before
+
+    assert playlist_repository.rebalance(playlist_id)
+    assert positions() == [
+        (song_id, (index + 1) * POSITION_STEP)
+        for index, (song_id, _) in enumerate(before)
+    ]
+    assert playlist_repository.rebalance(0)
@@ -120,3 +120,22 @@ def test_positive_get_all_songs_with_take_skip(mocked_db: SQLAlchemy, MockedSong
     song_repository.get_all(take=5, skip=1)
 
     MockedSong.paginate.assert_called_once_with(5, 1)
+
+
+def test_positive_get_all_rows_matches_to_dict(db: SQLAlchemy):
+    from app.models.user import User
+    from app.models.song import Song as SongModel
+
+    user = User(email="test@test.com", username="test")
+    user.set_password("test")
+    db.session.add(user)
+    db.session.commit()
+
+    for i in range(5):
+        db.session.add(SongModel(title=f"test-{i}", song_url="test", user_id=user.id))
+    db.session.commit()
+
+    song_repository = SongRepository(db)
+    rows = song_repository.get_all_rows(take=3, skip=1)
+
+    assert rows == [song.to_dict() for song in SongModel.paginate(3, 1)]
@@ -139,3 +139,52 @@ def test_positive_unfollow_user(auth_repository_db_user):
     user.follow.assert_called_once_with(user1)
     user.unfollow.assert_called_once_with(user1)
     assert mocked_db.session.commit.call_count == 2
+
+
+def test_positive_follower_rows_match_to_dict(db):
+    from app.models.user import User
+
+    users = []
+    for i in range(4):
+        user = User(email=f"test{i}@test.com", username=f"test{i}")
+        user.set_password("test")
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+
+    for user in users[1:]:
+        user.follow(users[0])
+    users[0].follow(users[1])
+    db.session.commit()
+
+    user_repository = UserRepository(db)
+
+    assert user_repository.get_follower_rows(users[0].id) == [
+        user.to_dict() for user in users[0].get_followers()
+    ]
+    assert user_repository.get_followed_user_rows(users[0].id) == [users[1].to_dict()]
+    assert user_repository.get_song_rows(users[0].id) == []
+    assert user_repository.get_followed_ids(
+        users[0].id, [user.id for user in users]
+    ) == {users[1].id}
+    assert user_repository.get_followed_ids(users[0].id, []) == set()
+
+
+def test_positive_iter_follow_edges(db):
+    from app.models.user import User
+
+    users = []
+    for i in range(3):
+        user = User(email=f"test{i}@test.com", username=f"test{i}")
+        user.set_password("test")
+        db.session.add(user)
+        users.append(user)
+    db.session.commit()
+
+    users[0].follow(users[1])
+    users[1].follow(users[2])
+    db.session.commit()
+
+    edges = list(UserRepository(db).iter_follow_edges())
+
+    assert sorted(edges) == [(users[0].id, users[1].id), (users[1].id, users[2].id)]
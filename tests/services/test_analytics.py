@@ -0,0 +1,135 @@
+import pytest
+from unittest import mock
+from datetime import date, datetime, timedelta
+
+from app.common.exceptions import BadRequestException, NotFoundException
+from app.services.analytics import (
+    COHORT_CHUNK_SIZE,
+    DAILY_ROLLUP,
+    MAX_DAILY_RANGE,
+    ROLLUP_SETTLE,
+    AnalyticsService,
+)
+
+
+@pytest.fixture
+def mocked_analytics_repository():
+    with mock.patch(
+        "app.services.analytics.AnalyticsRepository"
+    ) as MockedAnalyticsRepository:
+        yield MockedAnalyticsRepository.return_value
+
+
+def test_positive_rollup_from_watermark(mocked_analytics_repository):
+    watermark = datetime(2022, 5, 1)
+    now = datetime(2022, 5, 2)
+    mocked_analytics_repository.get_watermark.return_value = watermark
+    mocked_analytics_repository.rollup.return_value = [date(2022, 5, 1)]
+
+    analytics_service = AnalyticsService(mocked_analytics_repository)
+    result = analytics_service.rollup(now)
+
+    mocked_analytics_repository.rollup.assert_called_once_with(
+        DAILY_ROLLUP, watermark, now - ROLLUP_SETTLE
+    )
+    assert result["days"] == [date(2022, 5, 1)]
+
+
+def test_positive_rollup_first_run(mocked_analytics_repository):
+    mocked_analytics_repository.get_watermark.return_value = None
+
+    analytics_service = AnalyticsService(mocked_analytics_repository)
+    analytics_service.rollup(datetime(2022, 5, 2))
+
+    assert mocked_analytics_repository.rollup.call_args[0][1] == datetime.min
+
+
+def test_positive_rollup_nothing_new(mocked_analytics_repository):
+    now = datetime(2022, 5, 2)
+    mocked_analytics_repository.get_watermark.return_value = now
+
+    analytics_service = AnalyticsService(mocked_analytics_repository)
+
+    assert analytics_service.rollup(now)["days"] == []
+    mocked_analytics_repository.rollup.assert_not_called()
+
+
+def test_positive_get_daily_fills_missing_days(mocked_analytics_repository):
+    row = {"day": "2022-05-02", "signups": 3}
+    mocked_analytics_repository.get_daily_rows.return_value = {date(2022, 5, 2): row}
+    mocked_analytics_repository.get_watermark.return_value = datetime(2022, 5, 3)
+
+    analytics_service = AnalyticsService(mocked_analytics_repository)
+    result = analytics_service.get_daily(date(2022, 5, 1), date(2022, 5, 3))
+
+    assert [day["day"] for day in result["days"]] == [
+        "2022-05-01",
+        "2022-05-02",
+        "2022-05-03",
+    ]
+    assert result["days"][1] is row
+    assert result["days"][0]["signups"] == 0
+    assert result["as_of"] == "2022-05-03T00:00:00"
+
+
+def test_negative_get_daily_invalid_range(mocked_analytics_repository):
+    analytics_service = AnalyticsService(mocked_analytics_repository)
+
+    with pytest.raises(BadRequestException):
+        analytics_service.get_daily(date(2022, 5, 2), date(2022, 5, 1))
+
+    with pytest.raises(BadRequestException):
+        analytics_service.get_daily(
+            date(2021, 1, 1), date(2021, 1, 1) + timedelta(days=MAX_DAILY_RANGE)
+        )
+
+    mocked_analytics_repository.get_daily_rows.assert_not_called()
+
+
+def test_positive_build_cohorts(mocked_analytics_repository):
+    pytest.importorskip("numpy")
+    users = [(1, datetime(2022, 5, 2), None), (2, datetime(2022, 5, 9), None)]
+    mocked_analytics_repository.iter_signup_chunks.return_value = iter([users])
+    mocked_analytics_repository.get_login_days.return_value = [(1, date(2022, 5, 10))]
+
+    analytics_service = AnalyticsService(mocked_analytics_repository)
+    report = analytics_service.build_cohorts(date(2022, 5, 4), date(2022, 5, 15))
+
+    mocked_analytics_repository.iter_signup_chunks.assert_called_once_with(
+        datetime(2022, 5, 2), datetime(2022, 5, 16), COHORT_CHUNK_SIZE
+    )
+    mocked_analytics_repository.get_login_days.assert_called_once_with(
+        1, 2, date(2022, 5, 2), date(2022, 5, 15)
+    )
+    assert [cohort["retained"] for cohort in report["cohorts"]] == [[1, 1], [1]]
+    mocked_analytics_repository.save_cohort_report.assert_called_once_with(
+        date(2022, 5, 4), date(2022, 5, 15), report
+    )
+
+
+def test_positive_build_cohorts_counts_plays(mocked_analytics_repository):
+    pytest.importorskip("numpy")
+    users = [(1, datetime(2022, 5, 2), None), (2, datetime(2022, 5, 9), None)]
+    mocked_analytics_repository.iter_signup_chunks.return_value = iter([users])
+    mocked_analytics_repository.get_login_days.return_value = []
+    mocked_play_repository = mock.MagicMock()
+    mocked_play_repository.get_play_days.return_value = [(1, date(2022, 5, 10))]
+
+    analytics_service = AnalyticsService(
+        mocked_analytics_repository, mocked_play_repository
+    )
+    report = analytics_service.build_cohorts(date(2022, 5, 4), date(2022, 5, 15))
+
+    mocked_play_repository.get_play_days.assert_called_once_with(
+        1, 2, date(2022, 5, 2), date(2022, 5, 15)
+    )
+    assert [cohort["retained"] for cohort in report["cohorts"]] == [[1, 1], [1]]
+
+
+def test_negative_get_cohorts_not_built(mocked_analytics_repository):
+    mocked_analytics_repository.get_cohort_report.return_value = None
+
+    analytics_service = AnalyticsService(mocked_analytics_repository)
+
+    with pytest.raises(NotFoundException):
+        analytics_service.get_cohorts(date(2022, 5, 2), date(2022, 5, 29))
@@ -0,0 +1,72 @@
+import pytest
+from unittest import mock
+from datetime import datetime
+from sqlalchemy import types
+
+from app.services.export import EXPORT_SETTLE, ExportService
+from app.common.exceptions import BadRequestException
+
+NOW = datetime(2022, 5, 3)
+
+
+@pytest.fixture
+def mocked_app(tmp_path):
+    mocked_app_ = mock.MagicMock()
+    mocked_app_.config = {"EXPORT_DIR": str(tmp_path)}
+    yield mocked_app_
+
+
+@pytest.fixture
+def mocked_export_repository():
+    with mock.patch("app.services.export.ExportRepository") as MockedExportRepository:
+        repository = MockedExportRepository.return_value
+        repository.columns.return_value = [
+            ("title", types.String()),
+            ("updated_at", types.DateTime()),
+            ("id", types.Integer()),
+        ]
+        repository.is_incremental.return_value = True
+        yield repository
+
+
+def test_negative_export_unknown_table(mocked_app, mocked_export_repository):
+    export_service = ExportService(mocked_app, mocked_export_repository)
+
+    with pytest.raises(BadRequestException):
+        export_service.export(["users", "passwords"])
+
+    mocked_export_repository.iter_batches.assert_not_called()
+
+
+def test_negative_export_unknown_format(mocked_app, mocked_export_repository):
+    export_service = ExportService(mocked_app, mocked_export_repository)
+
+    with pytest.raises(BadRequestException):
+        export_service.export(["users"], "csv")
+
+
+def test_positive_export_advances_watermark(mocked_app, mocked_export_repository):
+    pytest.importorskip("pyarrow")
+    mocked_export_repository.iter_batches.return_value = iter(
+        [
+            [("a", datetime(2022, 5, 1, 9), 2), ("b", datetime(2022, 5, 1, 9), 5)],
+            [("c", datetime(2022, 5, 2, 9), 1)],
+        ]
+    )
+
+    export_service = ExportService(mocked_app, mocked_export_repository)
+    run = export_service.export(["songs"], now=NOW)
+
+    mocked_export_repository.iter_batches.assert_called_once_with(
+        "songs", None, NOW - EXPORT_SETTLE, mock.ANY
+    )
+    assert run["tables"]["songs"]["rows"] == 3
+    assert len(run["tables"]["songs"]["files"]) == 2
+
+    mocked_export_repository.iter_batches.return_value = iter([])
+    export_service.export(["songs"], now=NOW)
+
+    assert mocked_export_repository.iter_batches.call_args[0][1] == (
+        datetime(2022, 5, 2, 9),
+        1,
+    )
@@ -0,0 +1,280 @@
+import pytest
+from threading import Event, Thread, Timer
+from unittest import mock
+from datetime import datetime
+
+from app.services.job import (
+    JOB_VISIBILITY_TIMEOUT,
+    MAX_RETRY_BACKOFF,
+    RETRY_BACKOFF,
+    JobService,
+    LeaseLostError,
+    retry_backoff,
+)
+
+NOW = datetime(2022, 5, 1, 10)
+
+
+@pytest.fixture
+def mocked_job_repository():
+    with mock.patch("app.services.job.JobRepository") as MockedJobRepository:
+        yield MockedJobRepository.return_value
+
+
+@pytest.fixture
+def job_service(app, mocked_job_repository):
+    return JobService(app, mocked_job_repository)
+
+
+def claimed(attempts=1, max_attempts=3, type_="test"):
+    return {
+        "id": 7,
+        "type": type_,
+        "payload": {"x": 1},
+        "attempts": attempts,
+        "max_attempts": max_attempts,
+        "lease": "lease",
+    }
+
+
+def test_positive_retry_backoff_doubles_up_to_cap():
+    assert retry_backoff(1) == RETRY_BACKOFF
+    assert retry_backoff(3) == RETRY_BACKOFF * 4
+    assert retry_backoff(30) == MAX_RETRY_BACKOFF
+
+
+def test_negative_enqueue_unknown_type(job_service):
+    with pytest.raises(ValueError):
+        job_service.enqueue("test", {})
+
+
+def test_negative_register_twice(job_service):
+    job_service.register("test", mock.MagicMock())
+
+    with pytest.raises(ValueError):
+        job_service.register("test", mock.MagicMock())
+
+
+def test_positive_run_one_nothing_due(job_service, mocked_job_repository):
+    mocked_job_repository.claim.return_value = None
+
+    assert job_service.run_one(now=NOW) is None
+    mocked_job_repository.claim.assert_called_once_with(
+        NOW, JOB_VISIBILITY_TIMEOUT, None
+    )
+
+
+def test_positive_run_one_completes(job_service, mocked_job_repository):
+    handler = mock.MagicMock()
+    job_service.register("test", handler)
+    mocked_job_repository.claim.return_value = claimed()
+
+    assert job_service.run_one(7, NOW) is True
+    handler.assert_called_once_with({"x": 1})
+    mocked_job_repository.complete.assert_called_once_with(7, "lease")
+
+
+def test_positive_run_one_cleans_up_once_completed(job_service, mocked_job_repository):
+    cleanup = mock.MagicMock()
+    job_service.register("test", mock.MagicMock(), cleanup)
+    mocked_job_repository.claim.return_value = claimed()
+
+    mocked_job_repository.complete.return_value = False
+    assert job_service.run_one(7, NOW) is True
+    cleanup.assert_not_called()
+
+    mocked_job_repository.complete.return_value = True
+    assert job_service.run_one(7, NOW) is True
+    cleanup.assert_called_once_with({"x": 1})
+
+
+def test_positive_heartbeat_extends_running_job(job_service, mocked_job_repository):
+    extended = []
+
+    def handler(payload):
+        assert job_service.current_job_id() == 7
+        job_service.heartbeat()
+        extended.append(mocked_job_repository.extend.call_args[0])
+
+    job_service.register("test", handler)
+    mocked_job_repository.claim.return_value = claimed()
+    mocked_job_repository.extend.return_value = True
+
+    assert job_service.run_one(7, NOW) is True
+    job_id, lease, locked_until = extended[0]
+    assert (job_id, lease) == (7, "lease")
+    assert locked_until - datetime.utcnow() <= JOB_VISIBILITY_TIMEOUT
+    assert job_service.current_job_id() is None
+
+    # Outside of a job there is nothing to extend
+    job_service.heartbeat()
+    mocked_job_repository.extend.assert_called_once()
+
+
+def test_negative_heartbeat_lease_lost(job_service, mocked_job_repository):
+    cleanup = mock.MagicMock()
+    raised = []
+
+    def handler(payload):
+        try:
+            job_service.heartbeat()
+        except LeaseLostError as e:
+            raised.append(e)
+            raise
+
+    job_service.register("test", handler, cleanup)
+    mocked_job_repository.claim.return_value = claimed()
+    mocked_job_repository.extend.return_value = False
+
+    assert job_service.run_one(7, NOW) is False
+    assert len(raised) == 1
+    mocked_job_repository.fail.assert_not_called()
+    mocked_job_repository.complete.assert_not_called()
+    cleanup.assert_not_called()
+
+
+def test_negative_run_one_failure_retried_later(job_service, mocked_job_repository):
+    job_service.register("test", mock.MagicMock(side_effect=OSError("down")))
+    mocked_job_repository.claim.return_value = claimed(attempts=2)
+
+    assert job_service.run_one(now=NOW) is False
+
+    job_id, lease, error, retry_at = mocked_job_repository.fail.call_args[0]
+    assert (job_id, lease, error) == (7, "lease", "OSError: down")
+    assert retry_at - datetime.utcnow() <= retry_backoff(2)
+    assert retry_at - datetime.utcnow() > retry_backoff(1)
+    mocked_job_repository.complete.assert_not_called()
+
+
+def test_negative_run_one_last_attempt_dead_letters(job_service, mocked_job_repository):
+    cleanup = mock.MagicMock()
+    job_service.register("test", mock.MagicMock(side_effect=OSError), cleanup)
+    mocked_job_repository.claim.return_value = claimed(attempts=3)
+    mocked_job_repository.fail.return_value = True
+
+    job_service.run_one(now=NOW)
+
+    assert mocked_job_repository.fail.call_args[0][3] is None
+    cleanup.assert_called_once_with({"x": 1})
+
+
+def test_negative_run_one_retried_failure_keeps_cleanup(
+    job_service, mocked_job_repository
+):
+    cleanup = mock.MagicMock()
+    job_service.register("test", mock.MagicMock(side_effect=OSError), cleanup)
+    mocked_job_repository.claim.return_value = claimed(attempts=2)
+    mocked_job_repository.fail.return_value = True
+
+    job_service.run_one(now=NOW)
+
+    cleanup.assert_not_called()
+
+
+def test_negative_run_one_unknown_type_fails(job_service, mocked_job_repository):
+    mocked_job_repository.claim.return_value = claimed(type_="gone")
+
+    assert job_service.run_one(now=NOW) is False
+    mocked_job_repository.fail.assert_called_once()
+
+
+def test_negative_run_one_timed_out_too_often(job_service, mocked_job_repository):
+    handler = mock.MagicMock()
+    cleanup = mock.MagicMock()
+    job_service.register("test", handler, cleanup)
+    mocked_job_repository.claim.return_value = claimed(attempts=4)
+    mocked_job_repository.fail.return_value = True
+
+    assert job_service.run_one(now=NOW) is False
+    handler.assert_not_called()
+    mocked_job_repository.fail.assert_called_once_with(7, "lease", "Timed out", None)
+    cleanup.assert_called_once_with({"x": 1})
+
+
+def test_positive_work_burst(job_service, mocked_job_repository):
+    handler = mock.MagicMock()
+    job_service.register("test", handler)
+    mocked_job_repository.claim.side_effect = [claimed(), claimed(), None]
+
+    assert job_service.work(concurrency=1, burst=True) == 2
+    assert handler.call_count == 2
+
+
+def test_positive_start_runs_job_on_thread(job_service, mocked_job_repository):
+    job_service.register("test", mock.MagicMock())
+    mocked_job_repository.enqueue.return_value = 7
+
+    with mock.patch("app.services.job.Thread") as MockedThread:
+        assert job_service.start("test", {"x": 1}) == 7
+    MockedThread.assert_called_once_with(
+        target=job_service._run_in_context, args=(7,), daemon=True
+    )
+    MockedThread.return_value.start.assert_called_once()
+
+    job_service.shutdown(0)
+    with mock.patch("app.services.job.Thread") as MockedThread:
+        assert job_service.start("test", {"x": 1}) == 7
+    MockedThread.assert_not_called()
+    assert mocked_job_repository.enqueue.call_count == 2
+
+
+def test_positive_run_one_nothing_claimed_once_shut_down(
+    job_service, mocked_job_repository
+):
+    assert job_service.shutdown(0) == {"drained": 0, "released": 0, "seconds": 0.0}
+    assert job_service.run_one() is None
+    mocked_job_repository.claim.assert_not_called()
+
+
+def run_blocking_job(job_service, mocked_job_repository, release: Event) -> Thread:
+    started = Event()
+
+    def handler(payload):
+        started.set()
+        release.wait(5)
+
+    job_service.register("test", handler)
+    mocked_job_repository.claim.return_value = claimed()
+    thread = Thread(target=job_service.run_one)
+    thread.start()
+    assert started.wait(5)
+    return thread
+
+
+def test_positive_shutdown_waits_for_running_job(job_service, mocked_job_repository):
+    release = Event()
+    thread = run_blocking_job(job_service, mocked_job_repository, release)
+
+    Timer(0.1, release.set).start()
+    report = job_service.shutdown(5)
+    thread.join()
+
+    assert report["drained"] == 1
+    assert report["released"] == 0
+    assert report["seconds"] < 5
+    mocked_job_repository.complete.assert_called_once_with(7, "lease")
+    mocked_job_repository.release.assert_not_called()
+
+
+def test_negative_shutdown_releases_unfinished_job(job_service, mocked_job_repository):
+    mocked_job_repository.release.return_value = True
+    release = Event()
+    thread = run_blocking_job(job_service, mocked_job_repository, release)
+
+    report = job_service.shutdown(0.05)
+    release.set()
+    thread.join()
+
+    assert report["drained"] == 0
+    assert report["released"] == 1
+    assert mocked_job_repository.release.call_args[0][:2] == (7, "lease")
+
+
+def test_positive_shutdown_stops_consumers(job_service, mocked_job_repository):
+    mocked_job_repository.claim.return_value = None
+    worker = Thread(target=job_service.work, kwargs={"concurrency": 2})
+    worker.start()
+
+    job_service.shutdown(1)
+    worker.join(5)
+    assert not worker.is_alive()
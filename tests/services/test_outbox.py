@@ -0,0 +1,82 @@
+import pytest
+from unittest import mock
+from datetime import datetime, timedelta
+
+from app.common.outbox import QueueSink
+from app.services.outbox import OUTBOX_SETTLE, OutboxService
+
+NOW = datetime(2022, 5, 1, 10)
+
+
+@pytest.fixture
+def mocked_outbox_repository():
+    with mock.patch("app.services.outbox.OutboxRepository") as MockedOutboxRepository:
+        yield MockedOutboxRepository.return_value
+
+
+@pytest.fixture
+def outbox_service(app, mocked_outbox_repository, tmp_path):
+    app.config["OUTBOX_FILE"] = str(tmp_path / "events.ndjson")
+    return OutboxService(app, mocked_outbox_repository)
+
+
+def events(*ids):
+    return [{"id": id_, "type": "followed", "payload": {}} for id_ in ids]
+
+
+def test_positive_dispatch_batches_from_watermark(
+    outbox_service, mocked_outbox_repository
+):
+    del outbox_service.sinks["file"]
+    sink = QueueSink()
+    outbox_service.register_sink(sink)
+    mocked_outbox_repository.get_watermark.return_value = 4
+    mocked_outbox_repository.get_events.side_effect = [events(5, 6), events(7)]
+
+    assert outbox_service.dispatch(2, NOW) == {"queue": 3}
+
+    until = NOW - OUTBOX_SETTLE
+    assert mocked_outbox_repository.get_events.call_args_list == [
+        mock.call(4, until, 2),
+        mock.call(6, until, 2),
+    ]
+    assert mocked_outbox_repository.save_watermark.call_args_list == [
+        mock.call("queue", 6),
+        mock.call("queue", 7),
+    ]
+    assert sink.queue.qsize() == 3
+
+
+def test_negative_dispatch_failing_sink_holds_back_no_other(
+    outbox_service, mocked_outbox_repository
+):
+    failing = mock.MagicMock()
+    failing.name = "failing"
+    failing.deliver.side_effect = OSError
+    outbox_service.sinks = {}
+    outbox_service.register_sink(failing)
+    outbox_service.register_sink(QueueSink())
+    mocked_outbox_repository.get_watermark.return_value = 0
+    mocked_outbox_repository.get_events.return_value = events(1)
+
+    assert outbox_service.dispatch(10, NOW) == {"failing": 0, "queue": 1}
+    mocked_outbox_repository.save_watermark.assert_called_once_with("queue", 1)
+
+
+def test_negative_register_sink_duplicate_name(outbox_service):
+    with pytest.raises(ValueError):
+        outbox_service.register_sink(QueueSink(name="file"))
+
+
+def test_positive_prune_up_to_every_sink(outbox_service, mocked_outbox_repository):
+    outbox_service.register_sink(QueueSink())
+    mocked_outbox_repository.get_min_watermark.return_value = 9
+
+    outbox_service.prune(7, NOW)
+
+    mocked_outbox_repository.get_min_watermark.assert_called_once_with(
+        ["file", "queue"]
+    )
+    mocked_outbox_repository.delete_events.assert_called_once_with(
+        9, NOW - timedelta(days=7)
+    )
@@ -0,0 +1,252 @@
+import pytest
+from unittest import mock
+from datetime import datetime
+
+from app.common.sketch import HyperLogLog, TopK
+from app.common.exceptions import BadRequestException, NotFoundException
+from app.models.play import SKETCH_LISTENERS, SKETCH_TOP_SONGS
+from app.services.play import (
+    MAX_WINDOW_HOURS,
+    SKETCH_FLUSH_INTERVAL,
+    SKETCH_FLUSH_PLAYS,
+    PlayService,
+)
+
+NOW = datetime(2022, 5, 1, 10, 30)
+BUCKET = datetime(2022, 5, 1, 10)
+
+
+@pytest.fixture
+def mocked_play_repository():
+    with mock.patch("app.services.play.PlayRepository") as MockedPlayRepository:
+        yield MockedPlayRepository.return_value
+
+
+@pytest.fixture
+def mocked_song_repository():
+    with mock.patch("app.services.play.SongRepository") as MockedSongRepository:
+        MockedSongRepository.return_value.get_existing_ids.return_value = {1, 2}
+        yield MockedSongRepository.return_value
+
+
+@pytest.fixture
+def mocked_thread():
+    with mock.patch("app.services.play.Thread") as MockedThread:
+        yield MockedThread
+
+
+@pytest.fixture
+def play_service(mocked_play_repository, mocked_song_repository, mocked_thread):
+    with mock.patch("app.services.play.datetime") as mocked_datetime:
+        mocked_datetime.utcnow.return_value = NOW
+        service = PlayService(
+            mock.MagicMock(), mocked_play_repository, mocked_song_repository
+        )
+    mocked_play_repository.get_sketches.return_value = []
+    return service
+
+
+def user(user_id):
+    return mock.MagicMock(id=user_id)
+
+
+def test_negative_record_song_not_found(play_service, mocked_song_repository):
+    mocked_song_repository.get_existing_ids.return_value = set()
+
+    with pytest.raises(NotFoundException):
+        play_service.record(user(1), 3, NOW)
+
+
+def test_positive_record_buffers_until_due(play_service, mocked_play_repository):
+    for user_id in range(1, 4):
+        play_service.record(user(user_id), 1, NOW)
+
+    mocked_play_repository.merge_sketches.assert_not_called()
+    listeners = play_service.get_unique_listeners(1, 1, NOW)
+    assert listeners["unique_listeners"] == 3
+
+
+def test_positive_record_flushes_after_interval(play_service, mocked_play_repository):
+    play_service.record(user(1), 1, NOW)
+    play_service.record(user(1), 2, NOW + SKETCH_FLUSH_INTERVAL)
+
+    pending = mocked_play_repository.merge_sketches.call_args[0][0]
+    assert set(pending) == {
+        (SKETCH_LISTENERS, 1, BUCKET),
+        (SKETCH_LISTENERS, 2, BUCKET),
+        (SKETCH_TOP_SONGS, 0, BUCKET),
+    }
+    assert pending[(SKETCH_TOP_SONGS, 0, BUCKET)].top() == [(1, 1), (2, 1)]
+
+
+def test_positive_record_flushes_after_plays(play_service, mocked_play_repository):
+    for _ in range(SKETCH_FLUSH_PLAYS):
+        play_service.record(user(1), 1, NOW)
+
+    mocked_play_repository.merge_sketches.assert_called_once()
+
+
+def test_negative_flush_failure_keeps_sketches(play_service, mocked_play_repository):
+    play_service.record(user(1), 1, NOW)
+    mocked_play_repository.merge_sketches.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        play_service.flush(NOW)
+
+    play_service.record(user(2), 1, NOW)
+    mocked_play_repository.merge_sketches.side_effect = None
+    play_service.flush(NOW)
+
+    pending = mocked_play_repository.merge_sketches.call_args[0][0]
+    assert pending[(SKETCH_LISTENERS, 1, BUCKET)].count() == 2
+
+
+def test_positive_get_unique_listeners_merges_window(
+    play_service, mocked_play_repository
+):
+    stored = HyperLogLog()
+    for user_id in (1, 2):
+        stored.add(user_id)
+    mocked_play_repository.get_sketches.return_value = [stored.to_bytes()]
+    play_service.record(user(3), 1, NOW)
+
+    listeners = play_service.get_unique_listeners(1, 24, NOW)
+
+    mocked_play_repository.get_sketches.assert_called_once_with(
+        SKETCH_LISTENERS, 1, datetime(2022, 4, 30, 11)
+    )
+    assert listeners == {"song_id": 1, "window_hours": 24, "unique_listeners": 3}
+
+
+def test_negative_get_unique_listeners_window_invalid(play_service):
+    with pytest.raises(BadRequestException):
+        play_service.get_unique_listeners(1, MAX_WINDOW_HOURS + 1, NOW)
+
+
+def test_positive_get_top_songs(play_service, mocked_play_repository):
+    stored = TopK()
+    stored.add(2, 5)
+    stored.add(1, 3)
+    mocked_play_repository.get_sketches.return_value = [stored.to_bytes()]
+    play_service.record(user(1), 1, NOW)
+
+    top_songs = play_service.get_top_songs(24, 1, NOW)
+
+    assert top_songs == {"window_hours": 24, "songs": [{"song_id": 2, "plays": 5}]}
+
+
+def test_positive_flush_appends_history(play_service, mocked_play_repository):
+    play_service.record(user(1), 1, NOW)
+    play_service.record(user(2), 2, NOW)
+
+    assert play_service.flush(NOW) == 2
+    mocked_play_repository.append_history.assert_called_once_with(
+        [(1, 1, NOW), (2, 2, NOW)]
+    )
+
+
+def test_negative_flush_history_failure_keeps_plays(
+    play_service, mocked_play_repository
+):
+    play_service.record(user(1), 1, NOW)
+    mocked_play_repository.append_history.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        play_service.flush(NOW)
+
+    mocked_play_repository.merge_sketches.assert_not_called()
+    mocked_play_repository.append_history.side_effect = None
+    play_service.flush(NOW)
+    mocked_play_repository.append_history.assert_called_with([(1, 1, NOW)])
+
+
+def test_positive_get_history_includes_unflushed(play_service, mocked_play_repository):
+    earlier = datetime(2022, 5, 1, 9)
+    mocked_play_repository.get_history.return_value = [(2, earlier)]
+    play_service.record(user(1), 1, NOW)
+    play_service.record(user(2), 2, NOW)
+
+    history = play_service.get_history(user(1), None, 2)
+
+    mocked_play_repository.get_history.assert_called_once_with(1, None, 2)
+    assert history == {
+        "plays": [
+            {"song_id": 1, "played_at": NOW.isoformat()},
+            {"song_id": 2, "played_at": earlier.isoformat()},
+        ],
+        "next_before": earlier.isoformat(),
+    }
+
+
+def test_positive_get_history_last_page(play_service, mocked_play_repository):
+    mocked_play_repository.get_history.return_value = []
+
+    history = play_service.get_history(user(1), NOW, 20)
+
+    assert history == {"plays": [], "next_before": None}
+
+
+@pytest.mark.parametrize(
+    "months, cutoff",
+    [(12, datetime(2021, 6, 1)), (1, datetime(2022, 5, 1)), (5, datetime(2022, 1, 1))],
+)
+def test_positive_prune_history_cutoff(
+    play_service, mocked_play_repository, months, cutoff
+):
+    play_service.prune_history(months, NOW)
+
+    mocked_play_repository.drop_history_before.assert_called_once_with(cutoff)
+
+
+def test_positive_record_starts_flusher_once(play_service, mocked_thread):
+    play_service.record(user(1), 1, NOW)
+    play_service.record(user(2), 1, NOW)
+
+    mocked_thread.assert_called_once_with(
+        target=play_service._flush_periodically, name="play-flusher", daemon=True
+    )
+    mocked_thread.return_value.start.assert_called_once()
+
+
+def test_positive_flush_periodically_until_stopped(
+    play_service, mocked_play_repository
+):
+    play_service.record(user(1), 1, NOW)
+    play_service._stop = mock.MagicMock()
+    play_service._stop.wait.side_effect = [False, False, True]
+
+    play_service._flush_periodically()
+
+    # The second round finds nothing buffered
+    mocked_play_repository.append_history.assert_called_once()
+    play_service._stop.wait.assert_called_with(SKETCH_FLUSH_INTERVAL.total_seconds())
+
+
+def test_negative_flush_periodically_survives_failures(
+    play_service, mocked_play_repository
+):
+    play_service.record(user(1), 1, NOW)
+    mocked_play_repository.append_history.side_effect = OSError
+    play_service._stop = mock.MagicMock()
+    play_service._stop.wait.side_effect = [False, False, True]
+
+    play_service._flush_periodically()
+
+    assert mocked_play_repository.append_history.call_count == 2
+    play_service.app.logger.exception.assert_called()
+
+
+def test_positive_shutdown_flushes_buffered_plays(
+    play_service, mocked_play_repository, mocked_thread
+):
+    play_service.record(user(1), 1, NOW)
+    play_service.record(user(2), 1, NOW)
+
+    assert play_service.shutdown() == 2
+    mocked_thread.return_value.join.assert_called_once()
+    mocked_play_repository.append_history.assert_called_once()
+
+    # Nothing buffered and no flusher started once shut down
+    assert play_service.shutdown() == 0
+    play_service.record(user(3), 1, NOW)
+    assert mocked_thread.call_count == 1
@@ -2,11 +2,15 @@ import pytest
 from unittest import mock
 
 from app.repositories.song import SongRepository
-from app.services.playlist import PlaylistService
+from app.services.playlist import REBALANCE_PLAYLIST_JOB, PlaylistService
+from app.common.streaming import STREAM_BATCH_SIZE
 from app.repositories.playlist import PlaylistRepository
 from app.common.exceptions import (
+    BadRequestException,
+    ConflictException,
     FieldRequiredException,
     NotFoundException,
+    PreconditionFailedException,
     UnauthorizedException,
 )
 
@@ -76,6 +80,49 @@ def test_positive_update_playlist(
     mocked_playlist_repository.update.assert_called_once()
 
 
+def test_negative_update_playlist_version_mismatch(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist.version = 3
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_current_user.id = 1
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    with pytest.raises(PreconditionFailedException):
+        playlist_service.update(mocked_current_user, 1, {"title": "test"}, 2)
+
+    mocked_playlist_repository.update.assert_not_called()
+
+
+def test_negative_update_playlist_concurrent_write(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist.version = 3
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_playlist_repository.update.return_value = False
+    mocked_current_user.id = 1
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    with pytest.raises(ConflictException):
+        playlist_service.update(mocked_current_user, 1, {"title": "test"}, 3)
+
+    mocked_playlist_repository.update.assert_called_once_with(
+        mocked_playlist, {"title": "test"}, 3
+    )
+
+
 def test_negative_update_playlist_not_found(
     mocked_playlist_repository: PlaylistRepository,
     mocked_song_repository: SongRepository,
@@ -175,23 +222,24 @@ def test_positive_playlist_get_by_id(
     mocked_playlist_repository: PlaylistRepository,
     mocked_song_repository: SongRepository,
 ):
-    mocked_playlist = mock.MagicMock()
-    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_playlist_repository.get_row.return_value = {"id": 1}
+    mocked_playlist_repository.get_song_rows.return_value = []
 
     playlist_service = PlaylistService(
         mocked_playlist_repository, mocked_song_repository
     )
-    playlist_service.get_by_id(1)
+    playlist = playlist_service.get_by_id(1)
 
-    mocked_playlist_repository.get_by_id.assert_called_once_with(1)
-    mocked_playlist.to_dict.assert_called_once()
+    mocked_playlist_repository.get_row.assert_called_once_with(1, None)
+    mocked_playlist_repository.get_song_rows.assert_called_once_with(1, 10, 0, None)
+    assert playlist == {"id": 1, "songs": []}
 
 
 def test_negative_playlist_get_by_id_not_found(
     mocked_playlist_repository: PlaylistRepository,
     mocked_song_repository: SongRepository,
 ):
-    mocked_playlist_repository.get_by_id.return_value = None
+    mocked_playlist_repository.get_row.return_value = None
 
     playlist_service = PlaylistService(
         mocked_playlist_repository, mocked_song_repository
@@ -199,39 +247,95 @@ def test_negative_playlist_get_by_id_not_found(
     with pytest.raises(NotFoundException):
         playlist_service.get_by_id(1)
 
-    mocked_playlist_repository.get_by_id.assert_called_once_with(1)
+    mocked_playlist_repository.get_row.assert_called_once_with(1, None)
+    mocked_playlist_repository.get_song_rows.assert_not_called()
 
 
 def test_positive_playlist_get_all_default(
     mocked_playlist_repository: PlaylistRepository,
     mocked_song_repository: SongRepository,
 ):
-    mocked_playlist = mock.MagicMock()
-    mocked_playlist_repository.get_all.return_value = [mocked_playlist]
+    mocked_playlist_repository.get_all_rows.return_value = [{}]
 
     playlist_service = PlaylistService(
         mocked_playlist_repository, mocked_song_repository
     )
-    playlist_service.get_all()
+    playlists = playlist_service.get_all()
 
-    mocked_playlist_repository.get_all.assert_called_once()
-    mocked_playlist.to_dict.assert_called_once()
+    mocked_playlist_repository.get_all_rows.assert_called_once_with(10, 0, None)
+    assert playlists == [{}]
 
 
 def test_positive_playlist_get_all_with_take_skip(
     mocked_playlist_repository: PlaylistRepository,
     mocked_song_repository: SongRepository,
 ):
-    mocked_playlist = mock.MagicMock()
-    mocked_playlist_repository.get_all.return_value = [mocked_playlist]
+    mocked_playlist_repository.get_all_rows.return_value = [{}]
 
     playlist_service = PlaylistService(
         mocked_playlist_repository, mocked_song_repository
     )
     playlist_service.get_all(take=1, skip=1)
 
-    mocked_playlist_repository.get_all.assert_called_once_with(1, 1)
-    mocked_playlist.to_dict.assert_called_once()
+    mocked_playlist_repository.get_all_rows.assert_called_once_with(1, 1, None)
+
+
+def test_positive_playlist_get_all_with_song_count_and_preview(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+):
+    mocked_playlist_repository.get_all_rows.return_value = [
+        {"title": "a", "id": 1},
+        {"title": "b", "id": 2},
+    ]
+    mocked_playlist_repository.get_song_counts.return_value = {1: 3}
+    mocked_playlist_repository.get_song_previews.return_value = {1: [{"id": 5}]}
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    playlists = playlist_service.get_all(fields=("title",), song_count=True, preview=50)
+
+    mocked_playlist_repository.get_all_rows.assert_called_once_with(
+        10, 0, ("title", "id")
+    )
+    mocked_playlist_repository.get_song_counts.assert_called_once_with([1, 2])
+    mocked_playlist_repository.get_song_previews.assert_called_once_with(
+        [1, 2], 10, None
+    )
+    assert playlists == [
+        {"title": "a", "song_count": 3, "songs": [{"id": 5}]},
+        {"title": "b", "song_count": 0, "songs": []},
+    ]
+
+
+def test_positive_playlist_iter_all_with_song_count_per_batch(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+):
+    rows = [{"title": str(i), "id": i} for i in range(STREAM_BATCH_SIZE + 1)]
+    mocked_playlist_repository.iter_all_rows.return_value = iter(rows)
+    mocked_playlist_repository.get_song_counts.return_value = {0: 3}
+    mocked_playlist_repository.get_song_previews.return_value = {}
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    playlists = list(
+        playlist_service.iter_all(None, 0, ("title",), song_count=True, preview=2)
+    )
+
+    mocked_playlist_repository.iter_all_rows.assert_called_once_with(
+        None, 0, ("title", "id")
+    )
+    calls = mocked_playlist_repository.get_song_counts.call_args_list
+    assert [len(call[0][0]) for call in calls] == [STREAM_BATCH_SIZE, 1]
+    assert playlists[0] == {"title": "0", "song_count": 3, "songs": []}
+    assert playlists[-1] == {
+        "title": str(STREAM_BATCH_SIZE),
+        "song_count": 0,
+        "songs": [],
+    }
 
 
 def test_positive_playlist_add_song(
@@ -404,3 +508,265 @@ def test_negative_playlist_remove_song_unauthorized(
     mocked_playlist_repository.get_by_id.assert_called_once_with(1)
     mocked_song_repository.get_by_id.assert_not_called()
     mocked_playlist_repository.remove_song.assert_not_called()
+
+
+def test_positive_playlist_get_by_id_with_fields(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+):
+    mocked_playlist_repository.get_row.return_value = {"title": "test"}
+    mocked_playlist_repository.get_song_rows.return_value = []
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    playlist_service.get_by_id(1, fields=("title",), song_fields=("id",))
+
+    mocked_playlist_repository.get_row.assert_called_once_with(1, ("title",))
+    mocked_playlist_repository.get_song_rows.assert_called_once_with(1, 10, 0, ("id",))
+
+
+def test_positive_playlist_move_song(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_playlist_repository.has_song.return_value = True
+    mocked_playlist_repository.move_song.return_value = False
+    mocked_current_user.id = 1
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    playlist_service.move_song(mocked_current_user, 1, 2, 0)
+
+    mocked_playlist_repository.move_song.assert_called_once_with(mocked_playlist, 2, 0)
+    mocked_playlist_repository.rebalance.assert_not_called()
+
+
+def test_positive_playlist_move_song_crowded_rebalances(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_playlist_repository.has_song.return_value = True
+    mocked_playlist_repository.move_song.return_value = True
+    mocked_current_user.id = 1
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    playlist_service.move_song(mocked_current_user, 1, 2, 0)
+
+    mocked_playlist_repository.rebalance.assert_called_once_with(1)
+
+
+def test_positive_playlist_move_song_crowded_rebalances_through_job(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_playlist_repository.has_song.return_value = True
+    mocked_playlist_repository.move_song.return_value = True
+    mocked_current_user.id = 1
+    mocked_jobs = mock.MagicMock()
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository, mocked_jobs
+    )
+    playlist_service.move_song(mocked_current_user, 1, 2, 0)
+
+    mocked_jobs.register.assert_called_once_with(
+        REBALANCE_PLAYLIST_JOB, playlist_service._run_rebalance_job
+    )
+    mocked_jobs.start.assert_called_once_with(
+        REBALANCE_PLAYLIST_JOB, {"playlist_id": 1}
+    )
+    mocked_playlist_repository.rebalance.assert_not_called()
+
+
+def test_negative_playlist_rebalance_job_retried_after_concurrent_write(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+):
+    mocked_playlist_repository.rebalance.return_value = False
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository, mock.MagicMock()
+    )
+
+    with pytest.raises(ConflictException):
+        playlist_service._run_rebalance_job({"playlist_id": 1})
+    mocked_playlist_repository.rebalance.assert_called_once_with(1)
+
+
+def test_negative_playlist_move_song_not_in_playlist(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_playlist_repository.has_song.return_value = False
+    mocked_current_user.id = 1
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    with pytest.raises(NotFoundException):
+        playlist_service.move_song(mocked_current_user, 1, 2, 0)
+
+    mocked_playlist_repository.move_song.assert_not_called()
+
+
+def test_negative_playlist_move_song_unauthorized(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_current_user.id = 2
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    with pytest.raises(UnauthorizedException):
+        playlist_service.move_song(mocked_current_user, 1, 2, 0)
+
+    mocked_playlist_repository.move_song.assert_not_called()
+
+
+def test_positive_playlist_add_songs(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_song_repository.get_existing_ids.return_value = {1, 3}
+    mocked_playlist_repository.add_songs.return_value = [3]
+    mocked_current_user.id = 1
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    result = playlist_service.add_songs(mocked_current_user, 1, [1, 2, 3, 1])
+
+    mocked_song_repository.get_existing_ids.assert_called_once_with([1, 2, 3])
+    mocked_playlist_repository.add_songs.assert_called_once_with(
+        mocked_playlist, [1, 3]
+    )
+    assert result == {"added": [3], "missing": [2]}
+
+
+def test_negative_playlist_add_songs_invalid_ids(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+
+    with pytest.raises(FieldRequiredException):
+        playlist_service.add_songs(mocked_current_user, 1, None)
+
+    with pytest.raises(BadRequestException):
+        playlist_service.add_songs(mocked_current_user, 1, [1, "2"])
+
+    with pytest.raises(BadRequestException):
+        playlist_service.add_songs(mocked_current_user, 1, list(range(501)))
+
+    mocked_playlist_repository.get_by_id.assert_not_called()
+
+
+def test_negative_playlist_add_songs_unauthorized(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_current_user.id = 2
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    with pytest.raises(UnauthorizedException):
+        playlist_service.add_songs(mocked_current_user, 1, [1])
+
+    mocked_playlist_repository.add_songs.assert_not_called()
+
+
+def test_positive_playlist_remove_songs(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist = mock.MagicMock()
+    mocked_playlist.user_id = 1
+    mocked_playlist_repository.get_by_id.return_value = mocked_playlist
+    mocked_playlist_repository.remove_songs.return_value = [2]
+    mocked_current_user.id = 1
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    result = playlist_service.remove_songs(mocked_current_user, 1, [2, 4])
+
+    mocked_playlist_repository.remove_songs.assert_called_once_with(
+        mocked_playlist, [2, 4]
+    )
+    assert result == {"removed": [2], "missing": [4]}
+
+
+def test_positive_playlist_copy(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_source = mock.MagicMock()
+    mocked_source.title = "source"
+    mocked_playlist_repository.get_by_id.return_value = mocked_source
+    mocked_playlist_repository.copy.return_value.id = 2
+    mocked_current_user.id = 3
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    result = playlist_service.copy(mocked_current_user, 1, {})
+
+    mocked_playlist_repository.copy.assert_called_once_with(
+        mocked_source, {"title": "source", "user_id": 3}
+    )
+    assert result == {"id": 2}
+
+
+def test_negative_playlist_copy_not_found(
+    mocked_playlist_repository: PlaylistRepository,
+    mocked_song_repository: SongRepository,
+    mocked_current_user,
+):
+    mocked_playlist_repository.get_by_id.return_value = None
+
+    playlist_service = PlaylistService(
+        mocked_playlist_repository, mocked_song_repository
+    )
+    with pytest.raises(NotFoundException):
+        playlist_service.copy(mocked_current_user, 1, {"title": "copy"})
+
+    mocked_playlist_repository.copy.assert_not_called()
@@ -6,7 +6,13 @@ from threading import Thread
 from werkzeug.datastructures import FileStorage
 
 from app.models.user import User
-from app.services.song import SongService
+from app.common.pagination import MAX_TAKE
+from app.services.song import (
+    CREATE_SONG_JOB,
+    UPDATE_ATTEMPTS,
+    UPDATE_SONG_JOB,
+    SongService,
+)
 from app.repositories.song import SongRepository
 from app.common.messages import (
     UNAUTHORIZED_TO_DELETE_SONG,
@@ -16,6 +22,7 @@ from app.common.exceptions import (
     NotFoundException,
     UnauthorizedException,
     FieldRequiredException,
+    PreconditionFailedException,
 )
 
 
@@ -79,6 +86,112 @@ def test_positive_create_song(
     mocked_thread.start.assert_called_once()
 
 
+@pytest.fixture
+def mocked_stage_files():
+    with mock.patch("app.services.song.stage_files") as mocked_stage_files_:
+        yield mocked_stage_files_
+
+
+def test_positive_create_song_through_job_queue(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_process_files_to_streams: Callable,
+    mocked_stage_files: Callable,
+    mocked_upload_file: Callable,
+    mocked_thread: Thread,
+):
+    mocked_jobs = mock.MagicMock()
+    mocked_app.config = {"UPLOAD_STAGING_DIR": "/staging"}
+    mocked_stage_files.return_value = {"song_file": {"path": "/staging/a"}}
+    files = {"song_file": mock.MagicMock()}
+
+    song_service = SongService(
+        mocked_app, mocked_song_repository, mocked_upload_file, mocked_jobs
+    )
+    song_service.create(files, {"title": "test"})
+
+    mocked_stage_files.assert_called_once_with(files, "/staging")
+    mocked_process_files_to_streams.assert_not_called()
+    mocked_jobs.start.assert_called_once_with(
+        CREATE_SONG_JOB,
+        {
+            "files": {"song_file": {"path": "/staging/a"}},
+            "song_data": {"title": "test"},
+        },
+    )
+    mocked_thread.start.assert_not_called()
+
+
+def test_positive_song_jobs_registered(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    mocked_jobs = mock.MagicMock()
+
+    song_service = SongService(
+        mocked_app, mocked_song_repository, mocked_upload_file, mocked_jobs
+    )
+    registered = {
+        call[0][0]: call[0][1:] for call in mocked_jobs.register.call_args_list
+    }
+    assert set(registered) == {CREATE_SONG_JOB, UPDATE_SONG_JOB}
+
+    handler, cleanup = registered[UPDATE_SONG_JOB]
+    files = {"song_file": {"path": "/staging/a"}}
+    payload = {"song_id": 1, "files": files, "song_data": {"title": "x"}, "version": 2}
+    with mock.patch.object(song_service, "_update") as mocked_update, mock.patch(
+        "app.services.song.remove_staged_files"
+    ) as mocked_remove_staged_files:
+        handler(payload)
+        mocked_remove_staged_files.assert_not_called()
+        cleanup(payload)
+    mocked_update.assert_called_once_with(1, files, {"title": "x"}, 2)
+    mocked_remove_staged_files.assert_called_once_with(files)
+
+
+def test_positive_create_song_job_records_job_id(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    mocked_jobs = mock.MagicMock()
+    mocked_jobs.current_job_id.return_value = 7
+    mocked_song_repository.get_by_job_id.return_value = None
+    mocked_upload_file.return_value = "url"
+    song_service = SongService(
+        mocked_app, mocked_song_repository, mocked_upload_file, mocked_jobs
+    )
+
+    song_service._run_create_job(
+        {"files": {"song_file": {"path": "/staging/a"}}, "song_data": {"title": "x"}}
+    )
+
+    mocked_song_repository.get_by_job_id.assert_called_once_with(7)
+    mocked_song_repository.create.assert_called_once_with(
+        {"title": "x", "job_id": 7, "song_url": "url"}
+    )
+    mocked_jobs.heartbeat.assert_called_once()
+
+
+def test_positive_create_song_job_rerun_creates_nothing(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    song_service = SongService(
+        mocked_app, mocked_song_repository, mocked_upload_file, mock.MagicMock()
+    )
+    mocked_song_repository.get_by_job_id.return_value = mock.MagicMock()
+
+    song_service._run_create_job(
+        {"files": {"song_file": {"path": "/staging/a"}}, "song_data": {"title": "x"}}
+    )
+
+    mocked_upload_file.assert_not_called()
+    mocked_song_repository.create.assert_not_called()
+
+
 def test_positive_create_song_skip_optional_fields(
     mocked_app: Flask,
     mocked_song_repository: SongRepository,
@@ -325,7 +438,7 @@ def test_positive_song_get_by_id(
 
     song_service.get_by_id(1)
 
-    mocked_song_repository.get_by_id.assert_called_once_with(1)
+    mocked_song_repository.get_row.assert_called_once_with(1, None)
 
 
 def test_negative_song_get_by_id_not_found(
@@ -333,14 +446,14 @@ def test_negative_song_get_by_id_not_found(
     mocked_song_repository: SongRepository,
     mocked_upload_file: Callable,
 ):
-    mocked_song_repository.get_by_id.return_value = None
+    mocked_song_repository.get_row.return_value = None
 
     song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
 
     with pytest.raises(NotFoundException):
         song_service.get_by_id(1)
 
-    mocked_song_repository.get_by_id.assert_called_once()
+    mocked_song_repository.get_row.assert_called_once()
 
 
 def test_positive_get_all(
@@ -352,7 +465,7 @@ def test_positive_get_all(
 
     song_service.get_all()
 
-    mocked_song_repository.get_all.assert_called_once()
+    mocked_song_repository.get_all_rows.assert_called_once_with(10, 0, None)
 
 
 def test_positive_get_all_with_take_skip(
@@ -364,7 +477,7 @@ def test_positive_get_all_with_take_skip(
 
     song_service.get_all(10, 10)
 
-    mocked_song_repository.get_all.assert_called_once_with(10, 10)
+    mocked_song_repository.get_all_rows.assert_called_once_with(10, 10, None)
 
 
 def test_positive_private_create(
@@ -406,8 +519,182 @@ def test_positive_private_update(
 
     song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
 
-    song_service._update(1, files, data)
+    song_service._update(1, files, data, 1)
 
     mocked_app.app_context.assert_called_once()
-    mocked_song_repository.update.assert_called_once()
+    mocked_song_repository.update.assert_called_once_with(
+        mocked_song_repository.get_by_id.return_value, data, 1
+    )
     assert mocked_upload_file.call_count == 3
+
+
+def test_negative_private_update_version_conflict(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    mocked_song_repository.update.return_value = False
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+
+    song_service._update(1, {}, {"title": "test"}, 1)
+
+    mocked_app.logger.warning.assert_called_once()
+
+
+def test_positive_private_update_without_version_retries(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    mocked_song_repository.update.side_effect = [False, True]
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+
+    song_service._update(1, {}, {"title": "test"}, None)
+
+    assert mocked_song_repository.get_by_id.call_count == 2
+    mocked_song_repository.update.assert_called_with(
+        mocked_song_repository.get_by_id.return_value, {"title": "test"}, None
+    )
+    mocked_app.logger.warning.assert_not_called()
+
+
+def test_negative_private_update_without_version_gives_up(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    mocked_song_repository.update.return_value = False
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+
+    song_service._update(1, {}, {"title": "test"}, None)
+
+    assert mocked_song_repository.update.call_count == UPDATE_ATTEMPTS
+    mocked_app.logger.warning.assert_called_once()
+
+
+def test_negative_update_song_version_mismatch(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+    mocked_process_files_to_streams: Callable,
+    mocked_thread: Thread,
+    mocked_current_user: User,
+):
+    mocked_current_user.id = 1
+    mocked_song_repository.get_by_id.return_value.user_id = 1
+    mocked_song_repository.get_by_id.return_value.version = 3
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+
+    with pytest.raises(PreconditionFailedException):
+        song_service.update(mocked_current_user, 1, {}, {"title": "test"}, 2)
+
+    mocked_thread.start.assert_not_called()
+
+
+def test_positive_get_all_take_capped(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+
+    song_service.get_all(MAX_TAKE * 10, 0)
+
+    mocked_song_repository.get_all_rows.assert_called_once_with(MAX_TAKE, 0, None)
+
+
+def test_positive_iter_all_not_capped(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+
+    song_service.iter_all()
+
+    mocked_song_repository.iter_all_rows.assert_called_once_with(None, 0, None)
+
+
+def test_positive_get_many_preserves_order(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    mocked_song_repository.get_rows_by_ids.return_value = {
+        1: {"id": 1},
+        3: {"id": 3},
+    }
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+    songs = song_service.get_many([3, 2, 1, 3])
+
+    mocked_song_repository.get_rows_by_ids.assert_called_once_with([3, 2, 1], None)
+    assert songs == [{"id": 3}, None, {"id": 1}, {"id": 3}]
+
+
+def test_positive_get_all_include_user(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    rows = [{"title": "a", "user_id": 1}]
+    mocked_song_repository.get_all_rows.return_value = rows
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+    song_service.get_all(10, 0, ("title",), ("user",))
+
+    mocked_song_repository.get_all_rows.assert_called_once_with(
+        10, 0, ("title", "user_id")
+    )
+    mocked_song_repository.embed_users.assert_called_once_with(rows, False)
+
+
+def test_positive_get_all_etag_include_user_tracks_users(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    mocked_song_repository.get_all_revision.return_value = (None, 0)
+    mocked_song_repository.get_user_revision.return_value = (None, 1)
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+    plain = song_service.get_all_etag()
+    with_user = song_service.get_all_etag(include=("user",))
+
+    mocked_song_repository.get_user_revision.assert_called_once()
+    assert plain != with_user
+
+
+def test_positive_get_similar(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    rows = [{"id": 2, "score": 1.0}]
+    mocked_song_repository.get_similar_rows.return_value = rows
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+
+    assert song_service.get_similar(1, MAX_TAKE + 1) == rows
+    mocked_song_repository.get_similar_rows.assert_called_once_with(1, MAX_TAKE, None)
+    mocked_song_repository.get_existing_ids.assert_not_called()
+
+
+def test_negative_get_similar_song_not_found(
+    mocked_app: Flask,
+    mocked_song_repository: SongRepository,
+    mocked_upload_file: Callable,
+):
+    mocked_song_repository.get_similar_rows.return_value = []
+    mocked_song_repository.get_existing_ids.return_value = set()
+
+    song_service = SongService(mocked_app, mocked_song_repository, mocked_upload_file)
+
+    with pytest.raises(NotFoundException):
+        song_service.get_similar(1)
+
+    mocked_song_repository.get_existing_ids.assert_called_once_with([1])
@@ -3,6 +3,7 @@ from unittest import mock
 
 from app.services.user import UserService
 from app.common.messages import USER_NOT_FOUND
+from app.common.streaming import STREAM_BATCH_SIZE
 from app.common.exceptions import NotFoundException
 
 
@@ -57,8 +58,8 @@ def test_negative_unfollow_users_not_found(MockedUserRepository):
 @mock.patch("app.services.user.UserRepository")
 def test_positive_get_followers(MockedUserRepository):
     MockedUserRepository.return_value.get_by_id.return_value = mock.MagicMock()
-    MockedUserRepository.return_value.get_by_id.return_value.get_followers.return_value = [
-        mock.MagicMock() for _ in range(3)
+    MockedUserRepository.return_value.get_follower_rows.return_value = [
+        {} for _ in range(3)
     ]
 
     user_service = UserService(MockedUserRepository.return_value)
@@ -67,14 +68,14 @@ def test_positive_get_followers(MockedUserRepository):
 
     assert len(followers) == 3
     MockedUserRepository.return_value.get_by_id.assert_called_once_with(1)
-    MockedUserRepository.return_value.get_by_id.return_value.get_followers.assert_called_once()
+    MockedUserRepository.return_value.get_follower_rows.assert_called_once()
 
 
 @mock.patch("app.services.user.UserRepository")
 def test_positive_get_followers_with_take_skip(MockedUserRepository):
     MockedUserRepository.return_value.get_by_id.return_value = mock.MagicMock()
-    MockedUserRepository.return_value.get_by_id.return_value.get_followers.return_value = [
-        mock.MagicMock() for _ in range(10)
+    MockedUserRepository.return_value.get_follower_rows.return_value = [
+        {} for _ in range(10)
     ]
 
     user_service = UserService(MockedUserRepository.return_value)
@@ -83,11 +84,56 @@ def test_positive_get_followers_with_take_skip(MockedUserRepository):
 
     assert len(followers) == 10
     MockedUserRepository.return_value.get_by_id.assert_called_once_with(1)
-    MockedUserRepository.return_value.get_by_id.return_value.get_followers.assert_called_once_with(
-        10, 10
+    MockedUserRepository.return_value.get_follower_rows.assert_called_once_with(
+        1, 10, 10, None
     )
 
 
+@mock.patch("app.services.user.UserRepository")
+def test_positive_get_followers_is_followed_by_me(MockedUserRepository):
+    MockedUserRepository.return_value.get_by_id.return_value = mock.MagicMock()
+    MockedUserRepository.return_value.get_follower_rows.return_value = [
+        {"username": "a", "id": 2},
+        {"username": "b", "id": 3},
+    ]
+    MockedUserRepository.return_value.get_followed_ids.return_value = {3}
+
+    user_service = UserService(MockedUserRepository.return_value)
+
+    followers = user_service.get_followers(1, 10, 0, ("username",), 1)
+
+    MockedUserRepository.return_value.get_follower_rows.assert_called_once_with(
+        1, 10, 0, ("username", "id")
+    )
+    MockedUserRepository.return_value.get_followed_ids.assert_called_once_with(
+        1, [2, 3]
+    )
+    assert followers == [
+        {"username": "a", "is_followed_by_me": False},
+        {"username": "b", "is_followed_by_me": True},
+    ]
+
+
+@mock.patch("app.services.user.UserRepository")
+def test_positive_iter_followers_flagged_per_batch(MockedUserRepository):
+    rows = [{"username": str(i), "id": i} for i in range(STREAM_BATCH_SIZE + 1)]
+    MockedUserRepository.return_value.iter_follower_rows.return_value = iter(rows)
+    MockedUserRepository.return_value.get_followed_ids.return_value = {0}
+
+    user_service = UserService(MockedUserRepository.return_value)
+
+    followers = list(user_service.iter_followers(1, None, 0, ("username",), 1))
+
+    MockedUserRepository.return_value.iter_follower_rows.assert_called_once_with(
+        1, None, 0, ("username", "id")
+    )
+    calls = MockedUserRepository.return_value.get_followed_ids.call_args_list
+    assert [len(call[0][1]) for call in calls] == [STREAM_BATCH_SIZE, 1]
+    assert followers[0] == {"username": "0", "is_followed_by_me": True}
+    assert len(followers) == STREAM_BATCH_SIZE + 1
+    assert not any(follower["is_followed_by_me"] for follower in followers[1:])
+
+
 @mock.patch("app.services.user.UserRepository")
 def test_negative_get_followers_user_not_found(MockedUserRepository):
     MockedUserRepository.return_value.get_by_id.return_value = None
@@ -104,8 +150,8 @@ def test_negative_get_followers_user_not_found(MockedUserRepository):
 @mock.patch("app.services.user.UserRepository")
 def test_positive_get_followed_users(MockedUserRepository):
     MockedUserRepository.return_value.get_by_id.return_value = mock.MagicMock()
-    MockedUserRepository.return_value.get_by_id.return_value.get_followed_users.return_value = [
-        mock.MagicMock() for _ in range(3)
+    MockedUserRepository.return_value.get_followed_user_rows.return_value = [
+        {} for _ in range(3)
     ]
 
     user_service = UserService(MockedUserRepository.return_value)
@@ -114,14 +160,14 @@ def test_positive_get_followed_users(MockedUserRepository):
 
     assert len(followed_users) == 3
     MockedUserRepository.return_value.get_by_id.assert_called_once_with(1)
-    MockedUserRepository.return_value.get_by_id.return_value.get_followed_users.assert_called_once()
+    MockedUserRepository.return_value.get_followed_user_rows.assert_called_once()
 
 
 @mock.patch("app.services.user.UserRepository")
 def test_positive_get_followed_users_with_take_skip(MockedUserRepository):
     MockedUserRepository.return_value.get_by_id.return_value = mock.MagicMock()
-    MockedUserRepository.return_value.get_by_id.return_value.get_followed_users.return_value = [
-        mock.MagicMock() for _ in range(10)
+    MockedUserRepository.return_value.get_followed_user_rows.return_value = [
+        {} for _ in range(10)
     ]
 
     user_service = UserService(MockedUserRepository.return_value)
@@ -130,8 +176,8 @@ def test_positive_get_followed_users_with_take_skip(MockedUserRepository):
 
     assert len(followed_users) == 10
     MockedUserRepository.return_value.get_by_id.assert_called_once_with(1)
-    MockedUserRepository.return_value.get_by_id.return_value.get_followed_users.assert_called_once_with(
-        10, 10
+    MockedUserRepository.return_value.get_followed_user_rows.assert_called_once_with(
+        1, 10, 10, None
     )
 
 
@@ -151,8 +197,8 @@ def test_negative_get_followed_users_user_not_found(MockedUserRepository):
 @mock.patch("app.services.user.UserRepository")
 def test_positive_get_songs_by_user_id(MockedUserRepository):
     MockedUserRepository.return_value.get_by_id.return_value = mock.MagicMock()
-    MockedUserRepository.return_value.get_by_id.return_value.get_songs.return_value = [
-        mock.MagicMock() for _ in range(3)
+    MockedUserRepository.return_value.get_song_rows.return_value = [
+        {} for _ in range(3)
     ]
 
     user_service = UserService(MockedUserRepository.return_value)
@@ -161,7 +207,7 @@ def test_positive_get_songs_by_user_id(MockedUserRepository):
 
     assert len(songs) == 3
     MockedUserRepository.return_value.get_by_id.assert_called_once_with(1)
-    MockedUserRepository.return_value.get_by_id.return_value.get_songs.assert_called_once()
+    MockedUserRepository.return_value.get_song_rows.assert_called_once()
 
 
 @mock.patch("app.services.user.UserRepository")
@@ -175,3 +221,40 @@ def test_negative_get_songs_by_user_id_user_not_found(MockedUserRepository):
     assert str(e.value) == USER_NOT_FOUND
 
     MockedUserRepository.return_value.get_by_id.assert_called_once_with(1)
+
+
+@mock.patch("app.services.user.UserRepository")
+def test_positive_get_suggestions(MockedUserRepository):
+    follow_graph = mock.MagicMock()
+    follow_graph.load.return_value.suggest.return_value = [(4, 3), (5, 2), (6, 1)]
+    MockedUserRepository.return_value.get_followed_ids.return_value = {5}
+    MockedUserRepository.return_value.get_rows_by_ids.return_value = {
+        4: {"username": "test4"},
+        6: {"username": "test6"},
+    }
+
+    user_service = UserService(MockedUserRepository.return_value, follow_graph)
+    users = user_service.get_suggestions(1, 10, ("username",))
+
+    follow_graph.load.return_value.suggest.assert_called_once_with(1, 20)
+    MockedUserRepository.return_value.get_followed_ids.assert_called_once_with(
+        1, [4, 5, 6]
+    )
+    MockedUserRepository.return_value.get_rows_by_ids.assert_called_once_with(
+        [4, 6], ("username",)
+    )
+    assert users == [
+        {"username": "test4", "mutual_count": 3},
+        {"username": "test6", "mutual_count": 1},
+    ]
+
+
+@mock.patch("app.services.user.UserRepository")
+def test_positive_get_suggestions_without_snapshot(MockedUserRepository):
+    follow_graph = mock.MagicMock()
+    follow_graph.load.return_value = None
+
+    user_service = UserService(MockedUserRepository.return_value, follow_graph)
+
+    assert user_service.get_suggestions(1) == []
+    MockedUserRepository.return_value.get_rows_by_ids.assert_not_called()